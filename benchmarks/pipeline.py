@@ -0,0 +1,383 @@
+"""
+Uçtan uca performans ölçümü (sentetik veri)
+
+Her (motor, kategori sayısı) ayrı bir süreçte çalışır; böylece tepe bellek (peak RSS)
+ölçümleri birbirini etkilemez. Aşamalar ayrı ayrı ölçülür:
+ingest (Excel soğuk/sıcak, CSV), prepare, fit, predict, postprocess, summarize,
+compare, export. Yönlendirmeli motor (auto) forecaster'ın train_all_categories yolundan
+tek 'fit' aşaması olarak ölçülür (alt aşamalar ve rota sayıları kayıtta). Sonuç commit
+bilgisiyle JSON'a yazılır; iki sonuç dosyası --compare ile karşılaştırılabilir.
+
+Kullanım:
+    python benchmarks/pipeline.py
+    python benchmarks/pipeline.py --sizes 10 1000 --engines seasonal_naive
+    python benchmarks/pipeline.py --sizes 1000 --engines auto
+    python benchmarks/pipeline.py --compare eski.json yeni.json --threshold 1.2
+"""
+import os
+import sys
+import json
+import time
+import signal
+import platform
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+
+from ml_budget_stats import peak_rss_mb, current_rss_mb
+
+DEFAULT_SIZES = [10, 1000, 50000]
+DEFAULT_ENGINES = ['seasonal_naive', 'global', 'prophet']
+
+# Prophet kategori başına ~saniyeler sürer; büyük boyutlarda atlanır
+DEFAULT_PROPHET_LIMIT = 10
+
+DEFAULT_STAGE_TIMEOUT = 900
+
+STAGES = [
+    'ingest_xlsx_cold', 'ingest_xlsx_warm', 'ingest_csv', 'prepare', 'fit', 'predict',
+    'postprocess', 'summarize', 'compare', 'export'
+]
+
+
+class StageTimeout(Exception):
+    pass
+
+
+def _on_alarm(signum, frame):
+    raise StageTimeout()
+
+
+def git_info():
+    def run(*args):
+        try:
+            return subprocess.run(['git', *args], cwd=REPO_ROOT, capture_output=True,
+                                  text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    status = run('status', '--porcelain', '--untracked-files=no')
+    return {
+        'commit': run('rev-parse', 'HEAD'),
+        'subject': run('log', '-1', '--format=%s'),
+        'dirty': bool(status) if status is not None else None,
+    }
+
+
+class StageRecorder:
+    """
+    Aşama süresi ve bellek kaydı; zaman aşımı olan aşama 'timeout' olarak işaretlenir
+    """
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.stages = {}
+
+    def run(self, name, func, *args, **kwargs):
+        entry = {'status': 'ok', 'seconds': None}
+        if self.timeout:
+            signal.signal(signal.SIGALRM, _on_alarm)
+            signal.alarm(self.timeout)
+
+        start = time.perf_counter()
+        result = None
+        try:
+            result = func(*args, **kwargs)
+        except StageTimeout:
+            entry['status'] = 'timeout'
+        except Exception as e:
+            entry['status'] = 'error'
+            entry['error'] = f"{type(e).__name__}: {e}"
+        finally:
+            if self.timeout:
+                signal.alarm(0)
+
+        entry['seconds'] = round(time.perf_counter() - start, 4)
+        entry['rss_mb'] = current_rss_mb()
+        entry['peak_rss_mb'] = round(peak_rss_mb(), 1)
+        self.stages[name] = entry
+
+        mark = '✅' if entry['status'] == 'ok' else '❌'
+        print(f"   {mark} {name:18s} {entry['seconds']:>10.3f}s  peak {entry['peak_rss_mb']:>8.1f} MB"
+              f"{'' if entry['status'] == 'ok' else '  ' + entry['status']}", file=sys.stderr)
+        return result if entry['status'] == 'ok' else None
+
+    def skip(self, name, reason):
+        self.stages[name] = {'status': 'skipped', 'reason': reason}
+
+
+def _fit_all(engine, all_series, params):
+    return {category: engine.fit(data, params) for category, data in all_series.items()}
+
+
+def _predict_all(forecaster, models):
+    return {category: forecaster.forecast_2026(model) for category, model in models.items()}
+
+
+def _postprocess(forecaster, raw):
+    from ml_budget_forecaster import FORECAST_MONTHS
+    from ml_budget_store import ForecastStore
+
+    forecaster.forecasts = ForecastStore.from_rows(
+        list(raw), forecaster.get_2026_rows(list(raw.values())), FORECAST_MONTHS
+    )
+    return forecaster.forecasts
+
+
+def _train_routed(forecaster, df):
+    """
+    Yönlendirmeli motor forecaster'ın kendi yolundan (profil + rota + toplu/Prophet fit) ölçülür;
+    aşama ayrıntısı RunStats'tan
+    """
+    forecaster.train_all_categories(df)
+    return forecaster.forecasts
+
+
+def _export(out_dir, summary, comparison, forecasts):
+    from ml_budget_export import export_forecasts
+
+    summary.to_csv(os.path.join(out_dir, 'summary.csv'), index=False)
+    comparison.to_csv(os.path.join(out_dir, 'comparison.csv'), index=False)
+    export_forecasts(forecasts, os.path.join(out_dir, 'detailed.csv'))
+    return sum(os.path.getsize(os.path.join(out_dir, f)) for f in os.listdir(out_dir))
+
+
+def run_case(n_categories, engine_name, workdir, seed, timeout):
+    """
+    Tek (kategori sayısı, motor) ölçümü; ayrı süreçte çağrılır
+    """
+    from synthetic_data import ensure_dataset
+    from ml_budget_data import load_workbook
+    from ml_budget_forecaster import MLBudgetForecaster, FORECAST_PERIODS
+
+    xlsx_path, csv_path = ensure_dataset(n_categories, workdir, seed=seed)
+    baseline_peak = round(peak_rss_mb(), 1)
+    recorder = StageRecorder(timeout)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        ingest_cache = os.path.join(scratch, 'ingest')
+        df = recorder.run('ingest_xlsx_cold', load_workbook, xlsx_path, cache_dir=ingest_cache)
+        recorder.run('ingest_xlsx_warm', load_workbook, xlsx_path, cache_dir=ingest_cache)
+        csv_df = recorder.run('ingest_csv', load_workbook, csv_path, cache_dir=os.path.join(scratch, 'csv'))
+        if df is None:
+            df = csv_df
+        if df is None:
+            for stage in STAGES[3:]:
+                recorder.skip(stage, 'veri okunamadı')
+            return baseline_peak, recorder.stages
+
+        forecaster = MLBudgetForecaster(engine=engine_name)
+        engine = forecaster.engine
+
+        if engine.routed:
+            # prepare..postprocess tek çağrıda; alt aşamalar fit kaydının 'stages' alanında
+            for stage in ('prepare', 'predict', 'postprocess'):
+                recorder.skip(stage, 'train_all_categories (fit) aşamasına dahil')
+            forecasts = recorder.run('fit', _train_routed, forecaster, df)
+            if forecasts is not None:
+                recorder.stages['fit']['stages'] = {
+                    name: round(seconds, 4) for name, seconds in forecaster.last_stats.stages.items()
+                }
+                recorder.stages['fit']['routes'] = forecaster.last_stats.route_counts()
+            return baseline_peak, _finish_case(recorder, forecaster, df, forecasts, scratch)
+
+        all_series = recorder.run('prepare', forecaster.prepare_all_categories, df)
+
+        raw = None
+        if all_series is not None:
+            if engine.batched:
+                raw = recorder.run('fit', engine.fit_predict_all, all_series, forecaster.model_params,
+                                   FORECAST_PERIODS)
+                if raw is not None:
+                    raw = {category: forecast for category, (model, forecast) in raw.items()}
+                recorder.skip('predict', 'toplu motor: fit aşamasına dahil')
+            else:
+                models = recorder.run('fit', _fit_all, engine, all_series, forecaster.model_params)
+                if models is not None:
+                    raw = recorder.run('predict', _predict_all, forecaster, models)
+                else:
+                    recorder.skip('predict', 'fit tamamlanmadı')
+        else:
+            recorder.skip('fit', 'prepare tamamlanmadı')
+            recorder.skip('predict', 'prepare tamamlanmadı')
+
+        forecasts = recorder.run('postprocess', _postprocess, forecaster, raw) if raw is not None else None
+        return baseline_peak, _finish_case(recorder, forecaster, df, forecasts, scratch)
+
+
+def _finish_case(recorder, forecaster, df, forecasts, scratch):
+    """
+    Tahminlerden sonraki aşamalar: summarize, compare, export
+    """
+    if forecasts is None:
+        for stage in ('postprocess', 'summarize', 'compare', 'export'):
+            if stage not in recorder.stages:
+                recorder.skip(stage, 'tahmin yok')
+        return recorder.stages
+
+    summary = recorder.run('summarize', forecaster.get_summary)
+    comparison = recorder.run('compare', forecaster.compare_with_actuals, df)
+    if summary is None or comparison is None:
+        recorder.skip('export', 'özet tamamlanmadı')
+    else:
+        out_dir = os.path.join(scratch, 'export')
+        os.makedirs(out_dir)
+        size = recorder.run('export', _export, out_dir, summary, comparison, forecasts)
+        if size is not None:
+            recorder.stages['export']['bytes'] = size
+    return recorder.stages
+
+
+def run_isolated(n_categories, engine_name, args):
+    """
+    Ölçümü temiz bir alt süreçte çalıştır, sonucu JSON olarak al
+    """
+    with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
+        result_path = f.name
+    try:
+        cmd = [sys.executable, os.path.abspath(__file__), '--worker',
+               '--categories', str(n_categories), '--engine', engine_name,
+               '--workdir', args.workdir, '--seed', str(args.seed),
+               '--stage-timeout', str(args.stage_timeout), '--worker-output', result_path]
+        proc = subprocess.run(cmd, cwd=REPO_ROOT, stdout=subprocess.DEVNULL)
+        if proc.returncode != 0:
+            return {'status': 'error', 'error': f"alt süreç çıkış kodu {proc.returncode}"}
+        with open(result_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    finally:
+        os.remove(result_path)
+
+
+def compare_results(base_path, new_path, threshold):
+    """
+    İki sonuç dosyasını aşama bazında karşılaştır
+    Dönüş: threshold oranını aşan yavaşlama/bellek artışı varsa 1
+    """
+    with open(base_path, 'r', encoding='utf-8') as f:
+        base = json.load(f)
+    with open(new_path, 'r', encoding='utf-8') as f:
+        new = json.load(f)
+
+    def index(report):
+        return {(case['engine'], case['categories']): case for case in report['cases']}
+
+    base_cases, new_cases = index(base), index(new)
+    print(f"Baz : {(base['git'].get('commit') or '?')[:10]} {base['git'].get('subject') or ''}")
+    print(f"Yeni: {(new['git'].get('commit') or '?')[:10]} {new['git'].get('subject') or ''}\n")
+    print(f"{'Motor':16s} {'Kategori':>9s} {'Aşama':18s} {'Baz':>10s} {'Yeni':>10s} {'Oran':>7s}")
+
+    regressions = []
+    for key in sorted(set(base_cases) & set(new_cases)):
+        old_stages = base_cases[key].get('stages', {})
+        new_stages = new_cases[key].get('stages', {})
+        for stage in STAGES:
+            old, cur = old_stages.get(stage, {}), new_stages.get(stage, {})
+            if old.get('status') != 'ok' or cur.get('status') != 'ok':
+                if old.get('status') or cur.get('status'):
+                    print(f"{key[0]:16s} {key[1]:>9d} {stage:18s} {old.get('status', '-'):>10s} {cur.get('status', '-'):>10s}")
+                continue
+            ratio = cur['seconds'] / old['seconds'] if old['seconds'] > 0 else 1.0
+            mark = '  ⚠️' if ratio > threshold else ''
+            print(f"{key[0]:16s} {key[1]:>9d} {stage:18s} {old['seconds']:>9.3f}s {cur['seconds']:>9.3f}s {ratio:>6.2f}x{mark}")
+            # Çok kısa aşamalarda gürültü yüzünden alarm verme
+            if ratio > threshold and cur['seconds'] - old['seconds'] > 0.05:
+                regressions.append(f"{key[0]}/{key[1]}/{stage}: {ratio:.2f}x")
+
+        old_peak = base_cases[key].get('peak_rss_mb')
+        new_peak = new_cases[key].get('peak_rss_mb')
+        if old_peak and new_peak:
+            ratio = new_peak / old_peak
+            print(f"{key[0]:16s} {key[1]:>9d} {'peak_rss_mb':18s} {old_peak:>9.1f}M {new_peak:>9.1f}M {ratio:>6.2f}x")
+            if ratio > threshold:
+                regressions.append(f"{key[0]}/{key[1]}/peak_rss: {ratio:.2f}x")
+
+    if regressions:
+        print("\n❌ Regresyon:")
+        for regression in regressions:
+            print(f"   - {regression}")
+        return 1
+
+    print("\n✅ Regresyon yok")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sentetik veriyle aşama bazlı performans ölçümü")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--engines', nargs='+', default=DEFAULT_ENGINES)
+    parser.add_argument('--prophet-limit', type=int, default=DEFAULT_PROPHET_LIMIT,
+                        help="Prophet bu kategori sayısından büyük boyutlarda atlanır")
+    parser.add_argument('--stage-timeout', type=int, default=DEFAULT_STAGE_TIMEOUT,
+                        help="Aşama başına süre sınırı (saniye, 0: sınırsız)")
+    parser.add_argument('--workdir', default=os.path.join(REPO_ROOT, '.ml_budget_cache', 'bench'),
+                        help="Sentetik veri dosyalarının klasörü (tekrar kullanılır)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Sonuç JSON dosyası (varsayılan: benchmarks/results/<zaman>-<commit>.json)")
+    parser.add_argument('--compare', nargs=2, metavar=('BAZ', 'YENI'), help="İki sonuç dosyasını karşılaştır")
+    parser.add_argument('--threshold', type=float, default=1.2, help="--compare için izin verilen oran")
+    # Alt süreç (tek ölçüm) parametreleri
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--categories', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--engine', help=argparse.SUPPRESS)
+    parser.add_argument('--worker-output', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return compare_results(*args.compare, threshold=args.threshold)
+
+    if args.worker:
+        sys.path.insert(0, BENCH_DIR)
+        baseline_peak, stages = run_case(args.categories, args.engine, args.workdir, args.seed, args.stage_timeout)
+        with open(args.worker_output, 'w', encoding='utf-8') as f:
+            json.dump({'status': 'ok', 'baseline_peak_rss_mb': baseline_peak,
+                       'peak_rss_mb': round(peak_rss_mb(), 1), 'stages': stages}, f)
+        return 0
+
+    import numpy as np
+    import pandas as pd
+
+    report = {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'git': git_info(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'seed': args.seed,
+        'cases': [],
+    }
+
+    for n_categories in args.sizes:
+        for engine_name in args.engines:
+            case = {'engine': engine_name, 'categories': n_categories}
+            if engine_name == 'prophet' and n_categories > args.prophet_limit:
+                print(f"⏭️  {engine_name} / {n_categories} kategori atlandı (--prophet-limit {args.prophet_limit})")
+                case['status'] = 'skipped'
+                report['cases'].append(case)
+                continue
+
+            print(f"⏱️  {engine_name} / {n_categories} kategori")
+            case.update(run_isolated(n_categories, engine_name, args))
+            report['cases'].append(case)
+
+    output = args.output
+    if not output:
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        commit = (report['git'].get('commit') or 'nogit')[:10]
+        output = os.path.join(BENCH_DIR, 'results', f"{stamp}-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"\n💾 Sonuçlar: {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Başlangıç süresi kontrolü (python -X importtime)
+
+Kütüphane modüllerinin import maliyetini ölçer ve hedefi aşarsa hata kodu döner.
+Uygulama dışındaki tüm ml_budget_* modülleri ölçülür. Ağır bağımlılıklar (Prophet,
+cmdstanpy, Plotly, scipy, openpyxl, pyarrow) modül seviyesinde yüklenmemeli.
+
+Kullanım:
+    python benchmarks/startup_time.py
+    python benchmarks/startup_time.py --budget-ms 150 --repeat 5
+"""
+import os
+import sys
+import ast
+import glob
+import argparse
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Streamlit uygulaması import edilemez (script çalıştırır), statik kontrol edilir
+APP_FILE = 'ml_budget_app.py'
+
+# import maliyeti ölçülen modüller: uygulama dışındaki tüm ml_budget_* modülleri
+# (yeni modül eklendiğinde listeye elle eklemek gerekmez)
+MODULES = sorted(
+    os.path.splitext(os.path.basename(path))[0]
+    for path in glob.glob(os.path.join(REPO_ROOT, 'ml_budget_*.py'))
+    if os.path.basename(path) != APP_FILE
+)
+
+# Her durumda gereken, hedefe dahil edilmeyen bağımlılıklar
+BASELINE_PACKAGES = {'pandas', 'numpy'}
+
+# Modül seviyesinde import edilmemesi gereken ağır paketler
+# (scipy: sadece hiyerarşi, openpyxl: sadece Excel okunurken/yazılırken)
+HEAVY_PACKAGES = {'prophet', 'cmdstanpy', 'plotly', 'scipy', 'openpyxl'}
+
+DEFAULT_BUDGET_MS = 150
+
+
+def parse_importtime(stderr):
+    """
+    -X importtime çıktısı -> [(self_us, cumulative_us, derinlik, modül)]
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line.split(':', 1)[1].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        entries.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return entries
+
+
+def measure_module(module):
+    """
+    Modülü temiz bir süreçte import et
+    Dönüş: (toplam_us, baseline_us, yüklenen ağır paketler)
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    entries = parse_importtime(result.stderr)
+
+    # Hedef modül en üst seviyede; çocukları ondan önce gelen bir alt seviye kayıtlar
+    target_index = max(i for i, e in enumerate(entries) if e[2] == 0 and e[3] == module)
+    total_us = entries[target_index][1]
+
+    # pandas/numpy hangi derinlikte ilk yüklendiyse (ör. başka bir ml_budget modülü içinden)
+    # oradaki toplam süresi düşülür; içindeki alt importlar ikinci kez sayılmaz
+    baseline_us = 0
+    baseline_depth = None
+    loaded = set()
+    for self_us, cumulative_us, depth, name in reversed(entries[:target_index]):
+        if depth == 0:
+            break
+        root = name.split('.')[0]
+        loaded.add(root)
+        if baseline_depth is not None and depth > baseline_depth:
+            continue
+        baseline_depth = None
+        if root in BASELINE_PACKAGES:
+            baseline_us += cumulative_us
+            baseline_depth = depth
+
+    return total_us, baseline_us, sorted(loaded & HEAVY_PACKAGES)
+
+
+def heavy_app_imports(path):
+    """
+    Uygulamanın modül seviyesindeki (koşulsuz) ağır importları
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+
+    found = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            names = [node.module]
+        else:
+            continue
+        found.extend(name for name in names if name.split('.')[0] in HEAVY_PACKAGES)
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import süresi regresyon kontrolü")
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                        help="pandas/numpy hariç modül başına izin verilen import süresi")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="Her modül için ölçüm sayısı (en iyisi alınır)")
+    args = parser.parse_args(argv)
+
+    failures = []
+
+    print(f"{'Modül':25s} {'Toplam':>10s} {'pandas/numpy':>13s} {'Kendi':>10s}")
+    for module in MODULES:
+        runs = [measure_module(module) for _ in range(args.repeat)]
+        total_us, baseline_us, heavy = min(runs, key=lambda r: r[0] - r[1])
+        own_ms = (total_us - baseline_us) / 1000
+
+        status = '✅' if own_ms <= args.budget_ms and not heavy else '❌'
+        print(f"{module:25s} {total_us / 1000:>8.1f}ms {baseline_us / 1000:>11.1f}ms {own_ms:>8.1f}ms {status}")
+
+        if own_ms > args.budget_ms:
+            failures.append(f"{module}: {own_ms:.1f}ms > {args.budget_ms:.0f}ms hedefi")
+        if heavy:
+            failures.append(f"{module}: ağır paket yüklendi ({', '.join(heavy)})")
+
+    app_heavy = heavy_app_imports(os.path.join(REPO_ROOT, APP_FILE))
+    if app_heavy:
+        failures.append(f"{APP_FILE}: modül seviyesinde ağır import ({', '.join(app_heavy)})")
+
+    if failures:
+        print("\n❌ Başlangıç süresi regresyonu:")
+        for failure in failures:
+            print(f"   - {failure}")
+        return 1
+
+    print("\n✅ Başlangıç süresi hedef içinde")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Sentetik perakende verisi üretici
+
+Uygulamanın Sayfa1 düzeninde (2 başlık satırı; kolon 0: ay, 1: ana grup,
+4: 2024 satış, 13: 2025 satış) Excel ve temiz CSV düzeninde veri yazar.
+
+Kullanım:
+    python benchmarks/synthetic_data.py 1000 --xlsx data.xlsx --csv data.csv
+"""
+import os
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+
+WORKBOOK_WIDTH = 16
+
+
+def synthetic_frame(n_categories, months_2025=9, seed=0, flat_share=0.1, zero_share=0.05):
+    """
+    Temiz düzende sentetik veri: Month, MainGroupDesc, Sales_2024, Sales_2025
+    Seviye log-normal, yıllık sezonsellik, kategoriye özel büyüme ve gürültü
+    flat_share/zero_share: Sabit ve sıfır satışlı kategori oranı (seyrek seri örneği)
+    """
+    rng = np.random.default_rng(seed)
+    months = np.tile(np.arange(1, 13), n_categories)
+    codes = np.repeat(np.arange(n_categories), 12)
+
+    level = rng.lognormal(mean=0.0, sigma=1.0, size=n_categories)
+    amplitude = rng.uniform(0.0, 0.5, size=n_categories)
+    phase = rng.uniform(0, 2 * np.pi, size=n_categories)
+    growth = rng.normal(1.05, 0.15, size=n_categories).clip(0.3, 2.0)
+
+    season = 1 + amplitude[codes] * np.sin(2 * np.pi * months / 12 + phase[codes])
+    noise_2024 = rng.normal(1.0, 0.05, size=len(codes))
+    noise_2025 = rng.normal(1.0, 0.05, size=len(codes))
+
+    sales_2024 = level[codes] * season * noise_2024
+    sales_2025 = level[codes] * growth[codes] * season * noise_2025
+
+    # Seyrek seriler: sabit ve sıfır satışlı kategoriler
+    kind = rng.random(n_categories)
+    flat = kind < flat_share
+    zero = (kind >= flat_share) & (kind < flat_share + zero_share)
+    sales_2024 = np.where(flat[codes], level[codes], sales_2024)
+    sales_2025 = np.where(flat[codes], level[codes], sales_2025)
+    sales_2024 = np.where(zero[codes], 0.0, sales_2024)
+    sales_2025 = np.where(zero[codes], 0.0, sales_2025)
+
+    sales_2025 = np.where(months <= months_2025, sales_2025, np.nan)
+
+    width = len(str(n_categories))
+    names = np.array([f"Grup {i:0{width}d}" for i in range(n_categories)])
+
+    return pd.DataFrame({
+        'Month': months,
+        'MainGroupDesc': names[codes],
+        'Sales_2024': sales_2024.round(4),
+        'Sales_2025': sales_2025.round(4),
+    })
+
+
+def write_workbook(df, path):
+    """
+    Sayfa1 düzeninde Excel (openpyxl write-only, sabit bellek)
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Sayfa1')
+    ws.append(['Bütçe Verisi'])
+    ws.append(['Ay', 'Ana Grup'] + [f'Kolon {i}' for i in range(2, WORKBOOK_WIDTH)])
+
+    row = [None] * WORKBOOK_WIDTH
+    for month, group, s24, s25 in df[['Month', 'MainGroupDesc', 'Sales_2024', 'Sales_2025']].itertuples(index=False):
+        row[0] = int(month)
+        row[1] = group
+        row[4] = None if pd.isna(s24) else float(s24)
+        row[13] = None if pd.isna(s25) else float(s25)
+        ws.append(row)
+
+    wb.save(path)
+
+
+def write_csv(df, path):
+    """
+    Temiz CSV düzeni (CLI girdisi)
+    """
+    df.to_csv(path, index=False)
+
+
+def ensure_dataset(n_categories, workdir, seed=0):
+    """
+    Çalışma klasöründe veri setini oluştur (varsa tekrar üretme)
+    Dönüş: (xlsx_yolu, csv_yolu)
+    """
+    os.makedirs(workdir, exist_ok=True)
+    xlsx_path = os.path.join(workdir, f"synthetic_{n_categories}_{seed}.xlsx")
+    csv_path = os.path.join(workdir, f"synthetic_{n_categories}_{seed}.csv")
+
+    if not (os.path.exists(xlsx_path) and os.path.exists(csv_path)):
+        df = synthetic_frame(n_categories, seed=seed)
+        write_csv(df, csv_path)
+        write_workbook(df, xlsx_path)
+
+    return xlsx_path, csv_path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Sentetik bütçe verisi üret")
+    parser.add_argument('categories', type=int)
+    parser.add_argument('--xlsx')
+    parser.add_argument('--csv')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    frame = synthetic_frame(args.categories, seed=args.seed)
+    if args.csv:
+        write_csv(frame, args.csv)
+    if args.xlsx:
+        write_workbook(frame, args.xlsx)
+    if not (args.csv or args.xlsx):
+        frame.to_csv(sys.stdout, index=False)
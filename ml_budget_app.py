@@ -1,9 +1,11 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import plotly.graph_objects as go
-import plotly.express as px
-from prophet import Prophet
+import os
+import threading
+from ml_budget_forecaster import MLBudgetForecaster
+from ml_budget_cache import ForecastCache
+from ml_budget_data import load_workbook, file_fingerprint
+from ml_budget_views import ComparisonView, FigureCache, DEFAULT_TOP_N, DEFAULT_PAGE_SIZE, MAX_OPTIONS
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -29,6 +31,20 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Tahmin motoru seçenekleri
+ENGINE_OPTIONS = {
+    "Prophet": "prophet",
+    "Hızlı (NumPy)": "seasonal_naive",
+    "Global (NumPy)": "global",
+    "Otomatik (seri bazlı)": "auto",
+}
+
+# Ayarlıysa eğitim bu süreçte değil tahmin servisinde yapılır (bkz. ml_budget_service.py)
+SERVICE_URL = os.environ.get('ML_BUDGET_SERVICE_URL')
+
+# Kategori bazlı ayarlanmış parametreler (python ml_budget_tuning.py çıktısı)
+TUNED_PARAMS_PATH = os.environ.get('ML_BUDGET_TUNED_PARAMS', 'tuned_params.json')
+
 # Başlık
 st.title("🤖 AI Destekli Bütçe Tahmin Sistemi")
 st.markdown("**Machine Learning ile Otomatik Tahmin + Manuel Ayarlama**")
@@ -43,12 +59,26 @@ with st.sidebar:
         help="ML: Geçmiş verilere göre otomatik tahmin\nManuel: Kendi parametrelerinizi girin\nHibrit: ML tahminini manuel ayarlayın"
     )
     
+    engine_label = st.selectbox(
+        "🧠 Tahmin Motoru",
+        list(ENGINE_OPTIONS),
+        help="Prophet: Hassas ama yavaş\nHızlı: Trendli seasonal-naive, tüm kategoriler tek seferde (NumPy)\nGlobal: Ortak sezonlu tek doğrusal model, tüm kategoriler tek çözümde (NumPy)\nOtomatik: Her seriye profiline göre sıfır, ortalama, seasonal-naive veya Prophet"
+    )
+    forecast_engine = ENGINE_OPTIONS[engine_label]
+    
+    interval_samples = st.select_slider(
+        "📏 Güven Aralığı Simülasyonu",
+        options=[0, 100, 300, 1000],
+        value=1000,
+        help="Güven aralıkları seçili kategori için eğitilmiş modelden hesaplanır, değiştirmek yeniden eğitim yapmaz\n0: Sadece nokta tahmini (en hızlı)"
+    )
+    
     st.divider()
     
     uploaded_file = st.file_uploader(
         "📊 Veri Dosyası Yükle",
-        type=['xlsx', 'csv'],
-        help="2024 ve 2025 satış verilerinizi yükleyin"
+        type=['xlsx', 'csv', 'parquet'],
+        help="Sayfa1 düzeni (2024 ve 2025 satış kolonları) veya çok yıllı uzun düzen (seri, tarih, değer)"
     )
 
 # Ana içerik
@@ -60,144 +90,162 @@ if uploaded_file is None:
 @st.cache_data
 def load_data(file):
     try:
-        df = pd.read_excel(file, sheet_name='Sayfa1', header=None)
-        
-        # Veriyi temizle
-        data = df.iloc[2:].copy()
-        data.columns = range(len(data.columns))
-        
-        data['Month'] = data[0]
-        data['MainGroupDesc'] = data[1]
-        data['Sales_2024'] = pd.to_numeric(data[4], errors='coerce')
-        data['Sales_2025'] = pd.to_numeric(data[13], errors='coerce')
-        
-        clean_data = data[['Month', 'MainGroupDesc', 'Sales_2024', 'Sales_2025']].copy()
-        clean_data = clean_data.dropna(subset=['Month', 'MainGroupDesc'])
-        
-        return clean_data
+        # Sadece kullanılan kolonlar, kompakt tipler; aynı dosya Arrow cache'ten gelir
+        # İçerik hash'i, eğitilmiş forecaster'ın cache anahtarı olarak kullanılır
+        return load_workbook(file), file_fingerprint(file)
     except Exception as e:
         st.error(f"Veri yükleme hatası: {e}")
-        return None
+        return None, None
 
-df = load_data(uploaded_file)
+df, data_key = load_data(uploaded_file)
 
 if df is None:
     st.stop()
 
-# ML Forecaster sınıfı
-class MLForecaster:
-    def __init__(self):
-        self.models = {}
-        
-    def prepare_prophet_data(self, df, category):
-        cat_df = df[df['MainGroupDesc'] == category].copy()
-        
-        data_2024 = cat_df[cat_df['Sales_2024'].notna()][['Month', 'Sales_2024']].copy()
-        data_2024['Year'] = 2024
-        data_2024.rename(columns={'Sales_2024': 'Sales'}, inplace=True)
-        
-        data_2025 = cat_df[cat_df['Sales_2025'].notna()][['Month', 'Sales_2025']].copy()
-        data_2025['Year'] = 2025
-        data_2025.rename(columns={'Sales_2025': 'Sales'}, inplace=True)
-        
-        combined = pd.concat([data_2024, data_2025], ignore_index=True)
-        combined['Month'] = combined['Month'].astype(int)
-        combined['ds'] = pd.to_datetime(
-            combined['Year'].astype(str) + '-' + 
-            combined['Month'].astype(str).str.zfill(2) + '-01'
-        )
-        combined['y'] = combined['Sales']
-        
-        return combined[['ds', 'y']].sort_values('ds')
+# Ayarlanmış parametreler: dosya içeriği değişince yeni eğitim (anahtar: içerik hash'i)
+@st.cache_data(show_spinner=False)
+def load_category_params(path, tuned_key):
+    from ml_budget_tuning import load_tuned_params
+    return load_tuned_params(path)
+
+tuned_key = file_fingerprint(TUNED_PARAMS_PATH) if os.path.exists(TUNED_PARAMS_PATH) else None
+category_params = load_category_params(TUNED_PARAMS_PATH, tuned_key)
+
+# Eğitilmiş forecaster: aynı veri + motor için rerun'lar ve oturumlar arasında paylaşılır
+# _df hash'lenmez; anahtar dosya içeriğinin hash'i (data_key)
+# Eğitim sadece nokta tahmini üretir: simülasyon sayısı anahtarda yok, aralıklar tahmin anında
+# Ayarlanmış parametreler tuned_key ile anahtarda
+@st.cache_resource(max_entries=8, show_spinner=False)
+def get_forecaster(data_key, _df, engine='prophet', tuned_key=None, _category_params=None, _source=None):
+    if SERVICE_URL:
+        return get_remote_forecaster(_source, engine)
     
-    def forecast_category(self, df, category):
-        prophet_data = self.prepare_prophet_data(df, category)
-        
-        if len(prophet_data) < 2:
-            return None
-        
-        model = Prophet(
-            yearly_seasonality=True,
-            weekly_seasonality=False,
-            daily_seasonality=False,
-            seasonality_mode='multiplicative',
-            changepoint_prior_scale=0.05,
+    # Önbellekte 8 forecaster'a kadar durabilir: modeller sıkıştırılmış saklanır,
+    # güven aralığı istendiğinde ilgili model açılır
+    forecaster = MLBudgetForecaster(
+        engine=engine,
+        cache=ForecastCache(),
+        uncertainty_samples=0,
+        category_params=_category_params,
+        model_retention='compact'
+    )
+    
+    with st.spinner('🤖 ML modelleri eğitiliyor...'):
+        progress_bar = st.progress(0)
+        forecaster.train_all_categories(
+            _df,
+            progress=lambda done, total: progress_bar.progress(done / total)
         )
-        
-        model.fit(prophet_data)
-        future = model.make_future_dataframe(periods=12, freq='MS')
-        forecast = model.predict(future)
-        
-        forecast_2026 = forecast[forecast['ds'].dt.year == 2026].copy()
-        forecast_2026['Month'] = forecast_2026['ds'].dt.month
-        
-        return forecast_2026[['Month', 'yhat', 'yhat_lower', 'yhat_upper']]
+        progress_bar.empty()
+    
+    return forecaster
 
-# ML tahminlerini hesapla
-@st.cache_data
-def get_ml_forecasts(_df):
-    forecaster = MLForecaster()
-    categories = _df['MainGroupDesc'].unique()
+# Servis modu: aynı veri + ayarlarla çalışan iş varsa yeni eğitim başlamaz, ona bağlanılır
+def get_remote_forecaster(source, engine):
+    from ml_budget_service import ServiceClient
     
-    all_forecasts = {}
-    with st.spinner('🤖 ML modelleri eğitiliyor...'):
+    client = ServiceClient(SERVICE_URL)
+    with st.spinner('🤖 ML modelleri tahmin servisinde eğitiliyor...'):
         progress_bar = st.progress(0)
-        
-        for i, category in enumerate(categories):
-            forecast = forecaster.forecast_category(_df, category)
-            if forecast is not None:
-                all_forecasts[category] = forecast
-            progress_bar.progress((i + 1) / len(categories))
-        
+        job = client.submit(source, engine=engine, uncertainty_samples=0)
+        client.wait(job['id'], progress=lambda done, total: progress_bar.progress(done / total))
         progress_bar.empty()
     
-    return all_forecasts
+    return client.forecaster(job['id'])
+
+# Paylaşılan forecaster'da aralık hesabı aynı anda tek oturumdan yapılır
+@st.cache_resource
+def get_interval_lock():
+    return threading.Lock()
+
+# Seçili kategori için güven aralıkları: eğitilmiş modelden sadece tahmin
+@st.cache_data(show_spinner=False)
+def get_category_intervals(_forecaster, data_key, engine, tuned_key, category, uncertainty_samples):
+    with st.spinner(f'📏 {category} için güven aralıkları hesaplanıyor...'):
+        with get_interval_lock():
+            return _forecaster.forecast_intervals(category, uncertainty_samples)
+
+# Karşılaştırma görünümü: tahmin başına bir kez hesaplanır, istemciye sadece görünen kısım gider
+@st.cache_resource(max_entries=8, show_spinner=False)
+def get_comparison_view(data_key, engine, tuned_key, _forecaster, _df):
+    return ComparisonView.from_forecaster(_forecaster, _df)
+
+# Figür JSON'ları tüm oturumlar arasında ortak (anahtar: tahmin sürümü + görünüm)
+@st.cache_resource
+def get_figure_cache():
+    return FigureCache()
+
+# Çok kategoride seçim kutusuna tüm liste değil arama sonucu gönderilir
+def category_picker(label, view, key):
+    if len(view) <= MAX_OPTIONS:
+        return st.selectbox(label, sorted(view.table['Kategori']), key=key)
+    query = st.text_input(f"🔎 Kategori ara ({len(view):,} kategori)", key=f"{key}_query")
+    options = view.options(query)
+    if not options:
+        st.warning("Eşleşen kategori yok")
+        return None
+    return st.selectbox(f"{label} (en büyük {len(options)} eşleşme)", options, key=key)
 
 # Mode'a göre işle
 if forecast_mode == "🤖 ML Otomatik":
+    # Plotly sadece grafik çizilen modlarda yüklenir
+    import plotly.graph_objects as go
+    
     st.header("🤖 Machine Learning Otomatik Tahmin")
     
-    ml_forecasts = get_ml_forecasts(df)
+    forecaster = get_forecaster(
+        data_key, df, forecast_engine, tuned_key, _category_params=category_params, _source=uploaded_file
+    )
+    ml_forecasts = forecaster.forecasts
+    comparison_view = get_comparison_view(data_key, forecast_engine, tuned_key, forecaster, df)
     
     # Özet metrikler
-    col1, col2, col3, col4 = st.columns(4)
+    col1, col2, col3, col4, col5 = st.columns(5)
     
-    total_2024 = df['Sales_2024'].sum()
-    total_2025 = df['Sales_2025'].sum() * (12/9)  # Tam yıl tahmini
-    total_2026_ml = sum([f['yhat'].sum() for f in ml_forecasts.values()])
+    # Son yıl, gözlenen ay sayısına göre tam yıla çevrilir; büyüme yıllık tahmin üzerinden
+    totals = forecaster.portfolio_totals(df)
+    last_year = totals['last_year']
+    window_label = totals['window']
     
     with col1:
-        st.metric("2024 Gerçek", f"{total_2024:.2f}")
+        st.metric(f"{last_year - 1} Gerçek", f"{totals['sales_prev']:.2f}")
     with col2:
-        st.metric("2025 Tahmin", f"{total_2025:.2f}")
+        st.metric(f"{last_year} Tahmin", f"{totals['sales_last_estimated']:.2f}")
     with col3:
-        st.metric("2026 ML Tahmin", f"{total_2026_ml:.2f}")
+        st.metric(f"{window_label} ML Tahmin", f"{totals['forecast']:.2f}")
     with col4:
-        growth = ((total_2026_ml - total_2025) / total_2025 * 100)
-        st.metric("Büyüme %", f"{growth:.1f}%")
+        st.metric(
+            f"{window_label} ML (yıllık)", f"{totals['forecast_annualized']:.2f}",
+            help="Tahminli ay sayısına göre 12 aya çevrilmiş tahmin; büyüme bu değerden hesaplanır"
+        )
+    with col5:
+        st.metric("Büyüme %", f"{totals['growth']:.1f}%")
     
     st.divider()
     
     # Kategori seçimi
-    selected_category = st.selectbox(
-        "📂 Kategori Seçin",
-        sorted(ml_forecasts.keys())
-    )
+    selected_category = category_picker("📂 Kategori Seçin", comparison_view, key='ml_category')
     
     if selected_category:
         forecast_data = ml_forecasts[selected_category]
         
+        # Aralıklar sadece seçili kategori için
+        if interval_samples > 0:
+            forecast_data = get_category_intervals(
+                forecaster, data_key, forecast_engine, tuned_key, selected_category, interval_samples
+            )
+        
         col1, col2 = st.columns([2, 1])
         
         with col1:
-            st.subheader(f"📈 {selected_category} - 2026 Aylık Tahmin")
+            st.subheader(f"📈 {selected_category} - {window_label} Aylık Tahmin")
             
             # Grafik
             fig = go.Figure()
             
             fig.add_trace(go.Scatter(
                 x=forecast_data['Month'],
-                y=forecast_data['yhat'],
+                y=forecast_data['Forecast'],
                 mode='lines+markers',
                 name='ML Tahmin',
                 line=dict(color='#667eea', width=3),
@@ -206,7 +254,7 @@ if forecast_mode == "🤖 ML Otomatik":
             
             fig.add_trace(go.Scatter(
                 x=forecast_data['Month'],
-                y=forecast_data['yhat_upper'],
+                y=forecast_data['Upper_Bound'],
                 mode='lines',
                 name='Üst Sınır',
                 line=dict(color='rgba(102, 126, 234, 0.3)', dash='dash'),
@@ -215,7 +263,7 @@ if forecast_mode == "🤖 ML Otomatik":
             
             fig.add_trace(go.Scatter(
                 x=forecast_data['Month'],
-                y=forecast_data['yhat_lower'],
+                y=forecast_data['Lower_Bound'],
                 mode='lines',
                 name='Alt Sınır',
                 line=dict(color='rgba(102, 126, 234, 0.3)', dash='dash'),
@@ -229,6 +277,9 @@ if forecast_mode == "🤖 ML Otomatik":
                 yaxis_title="Satış Tahmini",
                 hovermode='x unified'
             )
+            # Takvim yılı dışındaki pencerelerde ay etiketi YYYYMM: eksen sayısal değil sıralı
+            if not forecaster.window.calendar_year:
+                fig.update_xaxes(type='category')
             
             st.plotly_chart(fig, use_container_width=True)
         
@@ -247,94 +298,183 @@ if forecast_mode == "🤖 ML Otomatik":
     st.divider()
     st.subheader("🔍 Kategori Karşılaştırma")
     
-    comparison_data = []
-    for category, forecast in ml_forecasts.items():
-        cat_data = df[df['MainGroupDesc'] == category]
-        sales_2024 = cat_data['Sales_2024'].sum()
-        sales_2025 = cat_data['Sales_2025'].sum() * (12/9)
-        forecast_2026 = forecast['yhat'].sum()
-        
-        comparison_data.append({
-            'Kategori': category,
-            '2024': sales_2024,
-            '2025': sales_2025,
-            '2026 ML': forecast_2026,
-            'Büyüme %': ((forecast_2026 - sales_2025) / sales_2025 * 100) if sales_2025 > 0 else 0
-        })
-    
-    comparison_df = pd.DataFrame(comparison_data).sort_values('2026 ML', ascending=False)
-    
-    # Grafikte göster
-    fig = px.bar(
-        comparison_df,
-        x='Kategori',
-        y=['2024', '2025', '2026 ML'],
-        title="Kategori Bazında Yıllık Karşılaştırma",
-        barmode='group',
-        height=500
-    )
+    # Grafik: ilk N kategori + "Diğer"; figür JSON'u tahmin sürümüne göre cache'ten
+    col_n, col_by = st.columns(2)
+    with col_n:
+        top_n = st.select_slider(
+            "Grafikte kategori",
+            options=[10, 20, 50, 100],
+            value=DEFAULT_TOP_N,
+            help="Kalan kategoriler tek 'Diğer' çubuğunda toplanır"
+        )
+    with col_by:
+        sort_by = st.selectbox("Sıralama", comparison_view.sort_columns, index=len(comparison_view.value_columns) - 1)
     
+    fig = comparison_view.figure(top_n, sort_by, cache=get_figure_cache())
     st.plotly_chart(fig, use_container_width=True)
     
-    # Tablo
-    st.dataframe(comparison_df, use_container_width=True)
+    # Tablo: sadece seçili sayfa gönderilir
+    col_q, col_size, col_page = st.columns([2, 1, 1])
+    with col_q:
+        table_query = st.text_input("🔎 Tabloda ara", key='comparison_query')
+    with col_size:
+        page_size = st.selectbox("Satır / sayfa", [25, 50, 100, 250], index=[25, 50, 100, 250].index(DEFAULT_PAGE_SIZE))
+    n_pages = comparison_view.pages(page_size, table_query)
+    with col_page:
+        page_number = st.number_input("Sayfa", min_value=1, max_value=n_pages, value=1, step=1)
+    
+    st.dataframe(
+        comparison_view.page(page_number, page_size, sort_by, query=table_query),
+        use_container_width=True,
+        hide_index=True
+    )
+    st.caption(f"{comparison_view.count(table_query):,} kategori · sayfa {min(page_number, n_pages)}/{n_pages}")
 
 elif forecast_mode == "✋ Manuel Ayarlama":
     st.header("✋ Manuel Bütçe Ayarlama")
     st.info("Bu modu geliştirmek ister misin? Mevcut manuel modülünü buraya entegre edebiliriz.")
 
 else:  # Hibrit mod
+    import plotly.graph_objects as go
+    from ml_budget_scenario import ScenarioEngine
+    
     st.header("🔀 Hibrit Mod: ML + Manuel Ayarlama")
     
-    ml_forecasts = get_ml_forecasts(df)
+    forecaster = get_forecaster(
+        data_key, df, forecast_engine, tuned_key, _category_params=category_params, _source=uploaded_file
+    )
+    ml_forecasts = forecaster.forecasts
+    comparison_view = get_comparison_view(data_key, forecast_engine, tuned_key, forecaster, df)
     
     st.info("💡 ML tahminini temel alıp, kendi parametrelerinizle ayarlayabilirsiniz")
     
-    # Kategori seçimi
-    selected_category = st.selectbox(
-        "📂 Kategori Seçin",
-        sorted(ml_forecasts.keys())
+    # Senaryolar oturumda tutulur: çarpanlar (kategori x ay) dizilerde,
+    # portföy toplamları her ayarda sadece değişen kategoriler kadar güncellenir
+    scenario_engines = st.session_state.setdefault('scenario_engines', {})
+    scenario_key = (data_key, forecast_engine, tuned_key)
+    if scenario_key not in scenario_engines:
+        scenario_engines[scenario_key] = ScenarioEngine(ml_forecasts)
+    scenarios = scenario_engines[scenario_key]
+    
+    col_s1, col_s2 = st.columns([2, 1])
+    
+    # Yeni senaryo seçim kutusundan önce eklenir (aynı çalıştırmada seçili gelsin)
+    with col_s2:
+        new_scenario = st.text_input("Yeni Senaryo Adı", placeholder="ör. İyimser")
+        if st.button("➕ Senaryoyu Kopyala") and new_scenario.strip():
+            if new_scenario.strip() in scenarios.names():
+                st.warning(f"'{new_scenario.strip()}' adlı senaryo zaten var")
+            else:
+                scenarios.create(new_scenario.strip(), source=st.session_state.get('scenario_name'))
+                st.session_state['scenario_name'] = new_scenario.strip()
+    
+    with col_s1:
+        scenario_name = st.selectbox("🗂️ Senaryo", scenarios.names(), key='scenario_name')
+    
+    # Ayarlar form ile toplu uygulanır; slider hareketleri portföyü yeniden hesaplatmaz
+    with st.form("scenario_adjust"):
+        st.markdown("**🎛️ Ayarlama Parametreleri:**")
+        
+        selected_categories = st.multiselect(
+            "📂 Kategoriler (boş: tümü)",
+            sorted(ml_forecasts.categories)
+        )
+        
+        col_a, col_b, col_c = st.columns(3)
+        with col_a:
+            growth_rate = st.slider(
+                "Büyüme Oranı (%)",
+                min_value=-50,
+                max_value=100,
+                value=0,
+                step=5
+            )
+        
+        with col_b:
+            seasonality_boost = st.slider(
+                "Sezonsellik Çarpanı",
+                min_value=0.5,
+                max_value=2.0,
+                value=1.0,
+                step=0.1
+            )
+        
+        with col_c:
+            selected_months = st.multiselect(
+                "Sezonsellik Ayları (boş: tümü)",
+                scenarios.months.tolist()
+            )
+        
+        col_apply, col_reset = st.columns(2)
+        with col_apply:
+            apply_clicked = st.form_submit_button("✅ Uygula")
+        with col_reset:
+            reset_clicked = st.form_submit_button("↩️ Seçilenleri Sıfırla")
+    
+    if apply_clicked:
+        scenarios.adjust(
+            scenario_name,
+            selected_categories or None,
+            growth=growth_rate,
+            seasonality=seasonality_boost,
+            months=selected_months or None
+        )
+    elif reset_clicked:
+        scenarios.reset(scenario_name, selected_categories or None)
+    
+    # Portföy özeti (önceden hesaplanmış toplamlar)
+    portfolio = scenarios.portfolio(scenario_name)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("ML Toplam", f"{portfolio['ml_total']:.4f}")
+    with col2:
+        st.metric("Senaryo Toplam", f"{portfolio['adjusted_total']:.4f}", f"{portfolio['difference_pct']:+.1f}%")
+    with col3:
+        st.metric("Ayarlanan Kategori", portfolio['adjusted_categories'])
+    
+    monthly = scenarios.monthly([scenario_name])
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=monthly['Month'],
+        y=monthly['ML'],
+        mode='lines+markers',
+        name='ML Tahmin (Portföy)',
+        line=dict(color='#667eea', width=2, dash='dot')
+    ))
+    fig.add_trace(go.Scatter(
+        x=monthly['Month'],
+        y=monthly[scenario_name],
+        mode='lines+markers',
+        name=f'{scenario_name} (Portföy)',
+        line=dict(color='#f5576c', width=3)
+    ))
+    fig.update_layout(
+        title="📊 Portföy Aylık Toplamları",
+        height=350,
+        xaxis_title="Ay",
+        yaxis_title="Satış Tahmini",
+        hovermode='x unified'
     )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # Kategori detayı
+    selected_category = category_picker("📂 Kategori Detayı", comparison_view, key='hybrid_category')
     
     if selected_category:
-        forecast_data = ml_forecasts[selected_category].copy()
+        forecast_data = scenarios.rows(scenario_name, selected_category)
         
         col1, col2 = st.columns([2, 1])
         
         with col1:
             st.subheader(f"📈 {selected_category} - ML Tahmin + Manuel Ayar")
             
-            # Manuel ayar parametreleri
-            st.markdown("**🎛️ Ayarlama Parametreleri:**")
-            
-            col_a, col_b = st.columns(2)
-            with col_a:
-                growth_rate = st.slider(
-                    "Büyüme Oranı (%)",
-                    min_value=-50,
-                    max_value=100,
-                    value=0,
-                    step=5
-                )
-            
-            with col_b:
-                seasonality_boost = st.slider(
-                    "Sezonsellik Çarpanı",
-                    min_value=0.5,
-                    max_value=2.0,
-                    value=1.0,
-                    step=0.1
-                )
-            
-            # Ayarlanmış tahmin
-            forecast_data['Adjusted'] = forecast_data['yhat'] * (1 + growth_rate/100) * seasonality_boost
-            
             # Grafik
             fig = go.Figure()
             
             fig.add_trace(go.Scatter(
                 x=forecast_data['Month'],
-                y=forecast_data['yhat'],
+                y=forecast_data['Forecast'],
                 mode='lines+markers',
                 name='ML Tahmin (Orijinal)',
                 line=dict(color='#667eea', width=2, dash='dot'),
@@ -362,7 +502,7 @@ else:  # Hibrit mod
         with col2:
             st.subheader("📊 Karşılaştırma")
             
-            ml_total = forecast_data['yhat'].sum()
+            ml_total = forecast_data['Forecast'].sum()
             adjusted_total = forecast_data['Adjusted'].sum()
             difference = adjusted_total - ml_total
             diff_pct = (difference / ml_total * 100) if ml_total > 0 else 0
@@ -373,14 +513,117 @@ else:  # Hibrit mod
             st.divider()
             
             # Detay tablo
-            comparison_table = forecast_data[['Month', 'yhat', 'Adjusted']].copy()
+            comparison_table = forecast_data[['Month', 'Forecast', 'Adjusted']].copy()
             comparison_table.columns = ['Ay', 'ML', 'Ayarlanmış']
             comparison_table['Fark %'] = ((comparison_table['Ayarlanmış'] - comparison_table['ML']) / comparison_table['ML'] * 100).round(1)
             
             st.dataframe(comparison_table, use_container_width=True)
+    
+    # Kayıtlı senaryoların karşılaştırması
+    with st.expander("🗂️ Senaryo Karşılaştırması"):
+        scenario_table = scenarios.compare()[
+            ['scenario', 'adjusted_total', 'difference', 'difference_pct', 'adjusted_categories']
+        ]
+        scenario_table.columns = ['Senaryo', 'Toplam', 'Fark', 'Fark %', 'Ayarlanan Kategori']
+        st.dataframe(scenario_table, use_container_width=True, hide_index=True)
+        st.dataframe(scenarios.monthly(), use_container_width=True, hide_index=True)
 
-# Excel export
+# Performans paneli: son eğitim çalıştırmasının ölçümleri
+if forecast_mode != "✋ Manuel Ayarlama" and forecaster.last_stats is not None:
+    stats = forecaster.last_stats
+    counts = stats.counts()
+    
+    with st.expander("⏱️ Performans"):
+        col1, col2, col3, col4, col5 = st.columns(5)
+        with col1:
+            st.metric("Toplam Süre", f"{stats.seconds:.1f} sn")
+        with col2:
+            st.metric("Eğitilen", counts['fit'] + counts['batched'])
+        with col3:
+            st.metric("Cache", counts['cache'])
+        with col4:
+            st.metric("Hata / Atlanan", f"{counts['failed']} / {counts['skipped']}")
+        with col5:
+            peak = f"{stats.peak_rss_mb:,.0f} MB" if stats.peak_rss_mb is not None else "-"
+            process_peak = stats.process_peak_rss_mb
+            st.metric(
+                "Tepe Bellek",
+                peak,
+                help="Bu çalıştırma boyunca örneklenen en yüksek RSS"
+                     + (f"; süreç ömrü boyunca tepe {process_peak:,.0f} MB" if process_peak is not None else "")
+            )
+        
+        st.markdown("**Aşamalar**")
+        st.dataframe(stats.stage_frame(), use_container_width=True, hide_index=True)
+        
+        route_counts = stats.route_counts()
+        if route_counts:
+            st.markdown("**Model Rotaları**")
+            st.dataframe(
+                pd.DataFrame({'Model': list(route_counts), 'Kategori': list(route_counts.values())}),
+                use_container_width=True,
+                hide_index=True
+            )
+        
+        st.markdown("**Bellek**")
+        memory = forecaster.memory_report()
+        memory.columns = ['Bileşen', 'Adet', 'MB', 'Not']
+        st.dataframe(memory.round({'MB': 2}), use_container_width=True, hide_index=True)
+        
+        # Çok kategoride sadece en yavaşlar gönderilir
+        st.markdown(f"**Kategoriler** (en yavaş {min(len(stats.categories), DEFAULT_PAGE_SIZE)})")
+        category_stats = stats.category_frame()
+        slowest = category_stats[['fit', 'predict', 'postprocess', 'load']].astype(float).sum(axis=1, min_count=1)
+        st.dataframe(
+            category_stats.assign(total=slowest).sort_values('total', ascending=False).head(DEFAULT_PAGE_SIZE),
+            use_container_width=True,
+            hide_index=True
+        )
+
+# Dışa aktarma: dosya sadece hazırlama istenince diskteki geçici dosyaya akıtılarak yazılır, sonra indirilir
 st.divider()
-if st.button("💾 Sonuçları Excel'e Aktar"):
-    # Export fonksiyonu eklenecek
-    st.success("Excel export özelliği eklenecek!")
+if forecast_mode != "✋ Manuel Ayarlama":
+    from ml_budget_export import export_file, MIME_TYPES
+    
+    if forecast_mode == "🔀 Hibrit (ML + Manuel)":
+        export_store = scenarios.apply(scenario_name)
+        export_name = f"ml_forecast_{scenario_name}"
+    else:
+        export_store = forecaster.forecasts
+        export_name = "ml_forecast_detailed"
+    
+    col_fmt, col_download = st.columns([1, 3])
+    with col_fmt:
+        export_format = st.selectbox(
+            "Format",
+            ['xlsx', 'csv', 'parquet'],
+            help="xlsx: Özet + kategori başına sayfa\ncsv/parquet: Tek uzun tablo (Category, Month, ...)"
+        )
+    # Dosya sadece istenince üretilir; aynı tahmin + format için oturumda tekrar kullanılır
+    export_key = (export_name, export_format, export_store.version())
+    
+    def prepare_export():
+        # Ek sayfalar (özet, karşılaştırma) sadece hazırlama istenince hesaplanır
+        sheets = None
+        if export_format == 'xlsx':
+            if forecast_mode == "🔀 Hibrit (ML + Manuel)":
+                sheets = {'Senaryo': scenarios.category_totals(scenario_name)}
+            else:
+                sheets = {'Özet': forecaster.get_summary(), 'Karşılaştırma': forecaster.compare_with_actuals(df)}
+        # Oturumda byte'lar değil diskteki geçici dosyanın tutamacı tutulur
+        previous = st.session_state.pop('export_file', None)
+        if previous is not None:
+            previous.close()
+        st.session_state['export_file'] = export_file(export_store, export_format, sheets=sheets)
+        st.session_state['export_key'] = export_key
+    
+    with col_download:
+        if st.session_state.get('export_key') != export_key:
+            st.button("📦 İndirme Dosyasını Hazırla", on_click=prepare_export)
+        else:
+            st.download_button(
+                "💾 Sonuçları İndir",
+                data=st.session_state['export_file'],
+                file_name=f"{export_name}.{export_format}",
+                mime=MIME_TYPES[export_format]
+            )
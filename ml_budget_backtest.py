@@ -0,0 +1,273 @@
+import os
+import csv
+import glob
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+import numpy as np
+from ml_budget_forecaster import MLBudgetForecaster, resolve_n_jobs
+from ml_budget_engines import get_engine
+from ml_budget_data import load_workbook
+
+RESULT_COLUMNS = [
+    'config', 'engine', 'category', 'origin', 'train_end', 'horizon', 'n_test',
+    'mape', 'smape', 'bias', 'fit_seconds', 'predict_seconds', 'error'
+]
+
+
+def forecast_metrics(actual, forecast):
+    """
+    MAPE, sMAPE ve bias (% olarak)
+    MAPE sıfır gerçekleşmeleri atlar; bias = (toplam tahmin - toplam gerçek) / toplam gerçek
+    """
+    actual = np.asarray(actual, dtype=float)
+    forecast = np.asarray(forecast, dtype=float)
+
+    nonzero = actual != 0
+    mape = np.mean(np.abs((forecast[nonzero] - actual[nonzero]) / actual[nonzero])) * 100 if nonzero.any() else np.nan
+
+    denominator = np.abs(actual) + np.abs(forecast)
+    defined = denominator > 0
+    smape = np.mean(2 * np.abs(forecast[defined] - actual[defined]) / denominator[defined]) * 100 if defined.any() else 0.0
+
+    total = actual.sum()
+    bias = (forecast.sum() - total) / abs(total) * 100 if total != 0 else np.nan
+
+    return mape, smape, bias
+
+
+def _month_number(ts):
+    return ts.year * 12 + ts.month
+
+
+def evaluate_holdout(engine, params, train, test):
+    """
+    train üzerinde eğit, test tarihlerini tahmin et
+    Dönüş: (mape, smape, bias, fit_saniye, predict_saniye)
+    Aralıklar skorlanmadığı için simülasyon kapalı (uncertainty_samples=0)
+    """
+    start = time.perf_counter()
+    model = engine.fit(train, params)
+    fitted = time.perf_counter()
+
+    periods = _month_number(test['ds'].max()) - _month_number(train['ds'].max())
+    forecast = engine.predict(model, periods, uncertainty_samples=0)
+    predicted = time.perf_counter()
+
+    scored = test.merge(forecast[['ds', 'yhat']], on='ds', how='left')
+    mape, smape, bias = forecast_metrics(scored['y'], scored['yhat'])
+
+    return mape, smape, bias, fitted - start, predicted - fitted
+
+
+def _run_fold(task):
+    """
+    İşçi süreçte tek fold'u çalıştır
+    """
+    config, engine, params, category, origin, train, test, horizon = task
+    row = {
+        'config': config,
+        'engine': engine.name,
+        'category': category,
+        'origin': origin,
+        'train_end': train['ds'].max().strftime('%Y-%m-%d'),
+        'horizon': horizon,
+        'n_test': len(test),
+        'error': '',
+    }
+    try:
+        mape, smape, bias, fit_seconds, predict_seconds = evaluate_holdout(engine, params, train, test)
+        row.update(mape=mape, smape=smape, bias=bias, fit_seconds=fit_seconds, predict_seconds=predict_seconds)
+    except Exception as e:
+        row.update(mape=np.nan, smape=np.nan, bias=np.nan, fit_seconds=np.nan, predict_seconds=np.nan, error=str(e))
+    return row
+
+
+class _ResultWriter:
+    """
+    Fold sonuçlarını tamamlandıkça diske yazar
+    .csv: satır satır eklenir; .parquet: klasör içine parça dosyalar
+    """
+
+    def __init__(self, path, flush_every=200):
+        self.path = path
+        self.flush_every = flush_every
+        self.parquet = path.endswith('.parquet')
+        self._buffer = []
+
+        if self.parquet:
+            os.makedirs(path, exist_ok=True)
+
+    def existing(self):
+        """
+        Daha önce yazılmış sonuçlar (devam etmek için)
+        """
+        if self.parquet:
+            parts = sorted(glob.glob(os.path.join(self.path, 'part-*.parquet')))
+            if not parts:
+                return pd.DataFrame(columns=RESULT_COLUMNS)
+            return pd.concat([pd.read_parquet(part) for part in parts], ignore_index=True)
+
+        if not os.path.exists(self.path):
+            return pd.DataFrame(columns=RESULT_COLUMNS)
+        return pd.read_csv(self.path, keep_default_na=False, na_values=[''], dtype={'category': str, 'error': str})
+
+    def write(self, row):
+        if self.parquet:
+            self._buffer.append(row)
+            if len(self._buffer) >= self.flush_every:
+                self.flush()
+            return
+
+        new_file = not os.path.exists(self.path)
+        with open(self.path, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS)
+            if new_file:
+                writer.writeheader()
+            writer.writerow(row)
+
+    def flush(self):
+        if not self.parquet or not self._buffer:
+            return
+        index = len(glob.glob(os.path.join(self.path, 'part-*.parquet')))
+        part = os.path.join(self.path, f"part-{index:05d}.parquet")
+        pd.DataFrame(self._buffer, columns=RESULT_COLUMNS).to_parquet(part, index=False)
+        self._buffer = []
+
+
+class Backtester:
+    """
+    Rolling-origin backtest: her kategori için k. aya kadar eğit, k+1..k+h aylarını skorla
+    Fold'lar ve kategoriler süreç havuzunda paralel çalışır
+    """
+
+    def __init__(self, forecaster=None, horizon=3, min_train=12, step=1, n_jobs=1):
+        """
+        forecaster: Motor ve parametreler için MLBudgetForecaster (varsayılan: Prophet)
+        horizon: Her fold'da skorlanan ay sayısı
+        min_train: İlk fold'un eğitim uzunluğu (ay)
+        step: Ardışık origin'ler arası ay sayısı
+        """
+        self.forecaster = forecaster or MLBudgetForecaster()
+        self.horizon = horizon
+        self.min_train = min_train
+        self.step = step
+        self.n_jobs = n_jobs
+
+    def default_configs(self):
+        """
+        Forecaster'ın kendi motoru ve parametreleri
+        """
+        return [{
+            'name': self.forecaster.engine.name,
+            'engine': self.forecaster.engine,
+            'params': self.forecaster.model_params,
+        }]
+
+    def make_folds(self, prophet_data):
+        """
+        Tek serinin (origin, train, test) fold'ları
+        """
+        dates = np.sort(prophet_data['ds'].unique())
+        folds = []
+        for origin in range(self.min_train, len(dates), self.step):
+            test_dates = dates[origin:origin + self.horizon]
+            train = prophet_data[prophet_data['ds'] < dates[origin]]
+            test = prophet_data[prophet_data['ds'].isin(test_dates)]
+            if len(train) >= 2:
+                folds.append((origin, train, test))
+        return folds
+
+    def run(self, df, configs=None, results_path=None):
+        """
+        Tüm kategoriler ve konfigürasyonlar için backtest
+        configs: [{'name', 'engine', 'params'}] (varsayılan: forecaster'ın ayarları)
+        results_path: .csv veya .parquet; varsa tamamlanmış fold'lar atlanır
+        """
+        configs = configs or self.default_configs()
+        writer = _ResultWriter(results_path) if results_path else None
+        previous = writer.existing() if writer else pd.DataFrame(columns=RESULT_COLUMNS)
+        done = set(zip(previous['config'].astype(str), previous['category'].astype(str), previous['origin'].astype(int)))
+
+        all_series = self.forecaster.prepare_all_categories(df)
+
+        tasks = []
+        for config in configs:
+            engine = get_engine(config['engine'])
+            params = dict(self.forecaster.model_params, **config.get('params', {}))
+            for category, prophet_data in all_series.items():
+                for origin, train, test in self.make_folds(prophet_data):
+                    if (config['name'], str(category), origin) in done:
+                        continue
+                    tasks.append((config['name'], engine, params, category, origin, train, test, self.horizon))
+
+        print(f"🧪 {len(tasks)} fold çalıştırılacak ({len(done)} fold daha önce tamamlanmış)")
+
+        rows = []
+        workers = resolve_n_jobs(self.n_jobs)
+        try:
+            if workers > 1 and len(tasks) > 1:
+                with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+                    futures = [executor.submit(_run_fold, task) for task in tasks]
+                    for future in as_completed(futures):
+                        rows.append(self._record(future.result(), writer))
+            else:
+                for task in tasks:
+                    rows.append(self._record(_run_fold(task), writer))
+        finally:
+            # Yarıda kesilse de tamamlanan fold'lar yazılır (parquet tamponu)
+            if writer:
+                writer.flush()
+
+        results = pd.concat([previous, pd.DataFrame(rows, columns=RESULT_COLUMNS)], ignore_index=True)
+        return results.sort_values(['config', 'category', 'origin'], kind='stable').reset_index(drop=True)
+
+    def _record(self, row, writer):
+        if writer:
+            writer.write(row)
+        if row['error']:
+            print(f"❌ {row['config']} / {row['category']} / {row['train_end']}: Hata - {row['error']}")
+        return row
+
+    @staticmethod
+    def summarize(results):
+        """
+        Konfigürasyon bazında doğruluk ve maliyet özeti
+        """
+        ok = results[results['error'].fillna('') == '']
+        summary = ok.groupby('config').agg(
+            Folds=('origin', 'size'),
+            Categories=('category', 'nunique'),
+            MAPE=('mape', 'mean'),
+            sMAPE=('smape', 'mean'),
+            Bias=('bias', 'mean'),
+            Fit_Seconds=('fit_seconds', 'sum'),
+            Predict_Seconds=('predict_seconds', 'sum'),
+        )
+        summary['Errors'] = results.groupby('config')['error'].apply(lambda e: (e.fillna('') != '').sum())
+        return summary.reset_index().sort_values('sMAPE')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest: doğruluk ve maliyet")
+    parser.add_argument('input', help="Veri dosyası (.xlsx Sayfa1 düzeni veya temiz .csv)")
+    parser.add_argument('--engines', nargs='+', default=['prophet', 'seasonal_naive'])
+    parser.add_argument('--horizon', type=int, default=3)
+    parser.add_argument('--min-train', type=int, default=12)
+    parser.add_argument('--step', type=int, default=1)
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    parser.add_argument('--results', default='backtest_results.csv',
+                        help="Sonuç tablosu (.csv veya .parquet); varsa kalınan yerden devam edilir")
+    args = parser.parse_args()
+
+    df = load_workbook(args.input)
+    backtester = Backtester(horizon=args.horizon, min_train=args.min_train, step=args.step, n_jobs=args.n_jobs)
+    configs = [{'name': engine, 'engine': engine} for engine in args.engines]
+
+    results = backtester.run(df, configs=configs, results_path=args.results)
+
+    print("\n" + "="*80)
+    print("📏 BACKTEST ÖZETİ")
+    print("="*80)
+    print(Backtester.summarize(results).to_string(index=False))
@@ -0,0 +1,290 @@
+"""
+Toplu (headless) tahmin: bir klasör veya glob'daki tüm çalışma kitapları tek süreçte
+
+Tüm dosyalar aynı işçi havuzunu ve aynı model cache'ini kullanır. Her girdi için
+ayrı çıktı klasörü yazılır; klasör tamamlanınca _SUCCESS.json eklenir. Tekrar
+çalıştırmada içeriği ve ayarları değişmemiş tamamlanmış girdiler atlanır.
+
+Kullanım:
+    python ml_budget_batch.py bolgeler/ --out sonuclar/
+    python ml_budget_batch.py "bolgeler/*.xlsx" --engine seasonal_naive --n-jobs -1
+"""
+import os
+import glob
+import json
+import time
+import shutil
+import hashlib
+import argparse
+from collections import Counter
+from concurrent.futures.process import BrokenProcessPool
+import pandas as pd
+from ml_budget_forecaster import MLBudgetForecaster, resolve_n_jobs
+from ml_budget_store import MODEL_RETENTION
+from ml_budget_cache import ForecastCache
+from ml_budget_engines import get_engine
+from ml_budget_data import read_workbook, file_fingerprint
+from ml_budget_export import export_forecasts
+from ml_budget_tuning import load_tuned_params
+
+INPUT_EXTENSIONS = ('.xlsx', '.csv', '.parquet')
+
+# Girdi klasörü tamamlandı işareti (en son yazılır)
+MANIFEST = '_SUCCESS.json'
+
+# Çıktı düzeni değişirse eski tamamlanmış klasörler yeniden üretilsin
+BATCH_VERSION = 1
+
+REPORT_COLUMNS = ['input', 'output', 'status', 'seconds', 'categories', 'error']
+
+
+def expand_inputs(patterns, recursive=False):
+    """
+    Klasör, glob veya dosya yollarından sıralı, tekil girdi listesi
+    Sadece .xlsx/.csv/.parquet; Excel kilit dosyaları (~$...) atlanır
+    """
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, '**', '*') if recursive else os.path.join(pattern, '*')
+        matches = glob.glob(pattern, recursive=recursive)
+        if not matches:
+            print(f"⚠️  Eşleşen dosya yok: {pattern}")
+        paths.extend(matches)
+
+    unique = {}
+    for path in paths:
+        name = os.path.basename(path)
+        if os.path.isfile(path) and name.lower().endswith(INPUT_EXTENSIONS) and not name.startswith('~$'):
+            unique.setdefault(os.path.abspath(path), path)
+    return [unique[key] for key in sorted(unique)]
+
+
+def output_dirs(inputs, out_dir):
+    """
+    Girdi başına çıktı klasörü: dosya adı (uzantısız)
+    Farklı klasörlerde aynı adlı dosyalara yol hash'i eklenir
+    """
+    stems = [os.path.splitext(os.path.basename(path))[0] for path in inputs]
+    counts = Counter(stems)
+    dirs = {}
+    for path, stem in zip(inputs, stems):
+        if counts[stem] > 1:
+            stem = f"{stem}-{hashlib.sha256(os.path.abspath(path).encode('utf-8')).hexdigest()[:8]}"
+        dirs[path] = os.path.join(out_dir, stem)
+    return dirs
+
+
+def _long_format(formats):
+    """
+    Uzun tablo formatı: parquet isteniyorsa ve pyarrow varsa parquet, yoksa csv
+    """
+    if 'parquet' in formats:
+        try:
+            import pyarrow  # noqa: F401
+            return 'parquet'
+        except ImportError:
+            print("⚠️  pyarrow yok, uzun tablo CSV olarak yazılacak")
+            return 'csv'
+    return 'csv' if 'csv' in formats else None
+
+
+def is_complete(output_dir, fingerprint, settings):
+    """
+    Çıktı klasörü aynı girdi içeriği ve ayarlarla tamamlanmış mı
+    """
+    try:
+        with open(os.path.join(output_dir, MANIFEST), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return False
+    return manifest.get('fingerprint') == fingerprint and manifest.get('settings') == settings
+
+
+class BatchRunner:
+    """
+    Çalışma kitaplarını sırayla tahmin eder; işçi havuzu ve cache tüm girdiler için ortak
+    Her girdi önce geçici klasöre yazılır, manifest en son eklenip klasör yerine taşınır;
+    yarıda kalan girdiler bir sonraki çalıştırmada baştan yapılır
+    """
+
+    def __init__(self, out_dir, engine='prophet', n_jobs=-1, uncertainty_samples=1000,
+                 cache_dir='.ml_budget_cache', formats=('xlsx', 'parquet'), tuned_params=None,
+                 horizon=None, model_retention='none'):
+        self.out_dir = out_dir
+        # Toplu çalıştırmada modeller dışa aktarılmaz: varsayılan olarak saklanmaz
+        # (ortak parametreli motorda en az sıkıştırılmış saklanmalı)
+        if model_retention == 'none' and get_engine(engine).pooled:
+            model_retention = 'compact'
+        self.n_jobs = n_jobs
+        self.cache = ForecastCache(cache_dir) if cache_dir else None
+        self.formats = tuple(formats)
+        self.long_format = _long_format(self.formats)
+        self.forecaster_params = {
+            'engine': engine,
+            'uncertainty_samples': uncertainty_samples,
+            'category_params': tuned_params or {},
+            'horizon': horizon,
+            'model_retention': model_retention,
+        }
+        self.settings = {
+            'version': BATCH_VERSION,
+            'engine': engine,
+            'uncertainty_samples': uncertainty_samples,
+            'formats': sorted(self.formats),
+            'horizon': horizon,
+            'tuned_params': hashlib.sha256(
+                json.dumps(tuned_params or {}, sort_keys=True).encode('utf-8')
+            ).hexdigest()[:12],
+        }
+        self.executor = None
+
+    def _forecaster(self):
+        return MLBudgetForecaster(
+            n_jobs=self.n_jobs, cache=self.cache, executor=self.executor, **self.forecaster_params
+        )
+
+    def _open_pool(self):
+        """
+        Süreç havuzu sadece paralel eğitim yolu kullanılacaksa açılır
+        """
+        template = self._forecaster()
+        if resolve_n_jobs(self.n_jobs) > 1 and not template.engine.batched:
+            self.executor = template.create_executor(self.n_jobs)
+
+    def _close_pool(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def process(self, path, output_dir, fingerprint):
+        """
+        Tek girdiyi tahmin et ve çıktılarını yaz
+        Dönüş: Manifest sözlüğü
+        """
+        start = time.perf_counter()
+        df = read_workbook(path)
+
+        forecaster = self._forecaster()
+        forecaster.train_all_categories(df)
+
+        partial = f"{output_dir}.partial"
+        shutil.rmtree(partial, ignore_errors=True)
+        os.makedirs(partial)
+
+        outputs = ['summary.csv', 'comparison.csv']
+        forecaster.get_summary().to_csv(os.path.join(partial, 'summary.csv'), index=False)
+        forecaster.compare_with_actuals(df).to_csv(os.path.join(partial, 'comparison.csv'), index=False)
+        if 'xlsx' in self.formats:
+            export_forecasts(forecaster.forecasts, os.path.join(partial, 'detailed.xlsx'))
+            outputs.append('detailed.xlsx')
+        if self.long_format:
+            export_forecasts(forecaster.forecasts, os.path.join(partial, f"detailed.{self.long_format}"))
+            outputs.append(f"detailed.{self.long_format}")
+
+        stats = forecaster.last_stats
+        manifest = {
+            'input': os.path.abspath(path),
+            'fingerprint': fingerprint,
+            'settings': self.settings,
+            'finished': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'seconds': round(time.perf_counter() - start, 3),
+            'categories': len(forecaster.forecasts),
+            'counts': stats.counts() if stats is not None else None,
+            'outputs': outputs,
+        }
+        with open(os.path.join(partial, MANIFEST), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+        shutil.rmtree(output_dir, ignore_errors=True)
+        os.replace(partial, output_dir)
+        return manifest
+
+    def run(self, inputs, force=False):
+        """
+        Girdileri sırayla işle; hata alan girdi diğerlerini durdurmaz
+        force=True: Tamamlanmış girdileri de yeniden işle
+        Dönüş: Girdi başına durum tablosu (out_dir/batch_report.csv olarak da yazılır)
+        """
+        os.makedirs(self.out_dir, exist_ok=True)
+        dirs = output_dirs(inputs, self.out_dir)
+        records = []
+
+        self._open_pool()
+        try:
+            for k, path in enumerate(inputs, 1):
+                output_dir = dirs[path]
+                print(f"\n📂 [{k}/{len(inputs)}] {path}")
+                record = {'input': path, 'output': output_dir, 'status': None,
+                          'seconds': None, 'categories': None, 'error': None}
+
+                try:
+                    fingerprint = file_fingerprint(path)
+                    if not force and is_complete(output_dir, fingerprint, self.settings):
+                        print("⏭️  Tamamlanmış, atlanıyor")
+                        record['status'] = 'skipped'
+                    else:
+                        manifest = self.process(path, output_dir, fingerprint)
+                        record.update(status='done', seconds=manifest['seconds'], categories=manifest['categories'])
+                except BrokenProcessPool as e:
+                    # Çöken işçi havuzu sonraki girdiler için yeniden açılır
+                    record.update(status='failed', error=f"İşçi havuzu çöktü: {e}")
+                    self._close_pool()
+                    self._open_pool()
+                except Exception as e:
+                    record.update(status='failed', error=str(e))
+
+                if record['status'] == 'failed':
+                    print(f"❌ {path}: {record['error']}")
+                records.append(record)
+        finally:
+            self._close_pool()
+
+        report = pd.DataFrame(records, columns=REPORT_COLUMNS)
+        report.to_csv(os.path.join(self.out_dir, 'batch_report.csv'), index=False)
+        return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Çok sayıda çalışma kitabı için toplu tahmin")
+    parser.add_argument('inputs', nargs='+', help="Klasör, glob veya dosya (.xlsx Sayfa1 düzeni, temiz .csv veya uzun düzen .csv/.parquet)")
+    parser.add_argument('--out', default='ml_budget_output', help="Çıktı kök klasörü (girdi başına alt klasör)")
+    parser.add_argument('--engine', default='prophet', choices=['prophet', 'seasonal_naive', 'global', 'auto'])
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    parser.add_argument('--samples', type=int, default=1000, help="Güven aralığı simülasyon sayısı (0: kapalı)")
+    parser.add_argument('--cache-dir', default='.ml_budget_cache')
+    parser.add_argument('--no-cache', action='store_true')
+    parser.add_argument('--formats', nargs='+', default=['xlsx', 'parquet'], choices=['xlsx', 'parquet', 'csv'],
+                        help="Detaylı tahmin formatları (parquet için pyarrow yoksa csv)")
+    parser.add_argument('--tuned-params', default='tuned_params.json')
+    parser.add_argument('--horizon', type=int, default=None,
+                        help="Tahmin ufku (ay); verilirse pencere verinin son ayından sonra başlar")
+    parser.add_argument('--model-retention', default='none', choices=list(MODEL_RETENTION),
+                        help="Eğitilmiş modellerin bellekte saklanması (toplu çıktılar modelleri kullanmaz)")
+    parser.add_argument('--recursive', action='store_true', help="Klasörlerde alt klasörleri de tara")
+    parser.add_argument('--force', action='store_true', help="Tamamlanmış girdileri de yeniden işle")
+    args = parser.parse_args()
+
+    inputs = expand_inputs(args.inputs, recursive=args.recursive)
+    if not inputs:
+        parser.error("İşlenecek .xlsx/.csv/.parquet dosyası bulunamadı")
+
+    runner = BatchRunner(
+        args.out,
+        engine=args.engine,
+        n_jobs=args.n_jobs,
+        uncertainty_samples=args.samples,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        formats=args.formats,
+        tuned_params=load_tuned_params(args.tuned_params),
+        horizon=args.horizon,
+        model_retention=args.model_retention
+    )
+    report = runner.run(inputs, force=args.force)
+
+    print("\n" + "="*80)
+    print("📦 TOPLU ÇALIŞTIRMA ÖZETİ")
+    print("="*80)
+    print(report['status'].value_counts().to_string())
+
+    raise SystemExit(1 if (report['status'] == 'failed').any() else 0)
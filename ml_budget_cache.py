@@ -0,0 +1,127 @@
+import os
+import json
+import threading
+import hashlib
+import pandas as pd
+
+# Cache formatı değişirse eski kayıtlar geçersiz olsun
+# 2: Simülasyon sayısı anahtardan çıktı, tahminle birlikte attrs içinde saklanıyor
+CACHE_VERSION = 2
+
+
+class ForecastCache:
+    """
+    Disk üzerinde model ve tahmin cache'i
+    Anahtar: kategori + hazırlanmış seri + model parametreleri hash'i
+    Toplam boyut max_bytes'ı aşınca en eski kullanılanlar silinir (LRU)
+    """
+
+    def __init__(self, cache_dir='.ml_budget_cache', max_bytes=512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # Toplam boyut bir kez taranır, sonra bellekte takip edilir
+        self._total_bytes = sum(size for _, _, size in self._entries())
+
+    def make_key(self, category, prophet_data, params):
+        """
+        Seri içeriği ve hiperparametrelerden cache anahtarı üret
+        """
+        h = hashlib.sha256()
+        h.update(f"v{CACHE_VERSION}|{category}|".encode('utf-8'))
+        h.update(json.dumps(params, sort_keys=True, default=str).encode('utf-8'))
+        h.update(pd.to_datetime(prophet_data['ds']).values.astype('datetime64[ns]').tobytes())
+        h.update(prophet_data['y'].to_numpy(dtype=float).tobytes())
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _entries(self):
+        """
+        (path, mtime, boyut) listesi
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_mtime, stat.st_size))
+        return entries
+
+    def get(self, key):
+        """
+        Cache'ten (model_json, forecast_df) döndür, yoksa None
+        Yazılırken forecast.attrs'ta olan bilgiler (ör. uncertainty_samples) geri yüklenir
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        # LRU için son kullanım zamanını güncelle
+        os.utime(path, None)
+
+        forecast = pd.DataFrame(entry['forecast'])
+        forecast.attrs.update(entry.get('attrs', {}))
+        return entry['model'], forecast
+
+    def put(self, key, model_json, forecast):
+        """
+        Modeli ve tahmini diske yaz, gerekirse eski kayıtları sil
+        """
+        path = self._path(key)
+        entry = {
+            'model': model_json,
+            'forecast': forecast.to_dict(orient='list'),
+            'attrs': dict(forecast.attrs),
+        }
+
+        old_size = os.path.getsize(path) if os.path.exists(path) else 0
+
+        # Yarım yazılmış dosya okunmasın diye önce geçici dosyaya yaz
+        # (süreç + thread başına ayrı: aynı anahtarı yazan thread'ler birbirinin dosyasına karışmaz)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+        self._total_bytes += os.path.getsize(path) - old_size
+        if self._total_bytes > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        """
+        Toplam boyut sınırın altına inene kadar en eski kayıtları sil
+        """
+        entries = sorted(self._entries(), key=lambda e: e[1])
+        total = sum(size for _, _, size in entries)
+
+        for path, _, size in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+        self._total_bytes = total
+
+    def clear(self):
+        """
+        Tüm cache kayıtlarını sil
+        """
+        for path, _, _ in self._entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._total_bytes = 0
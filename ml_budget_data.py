@@ -0,0 +1,281 @@
+import os
+import hashlib
+import threading
+import pandas as pd
+import numpy as np
+
+# Sayfa1 düzeninde kullanılan kolonlar: kolon indeksi -> ad
+WORKBOOK_COLUMNS = {0: 'Month', 1: 'MainGroupDesc', 4: 'Sales_2024', 13: 'Sales_2025'}
+
+# Excel'de ilk 2 satır başlık
+HEADER_ROWS = 2
+
+SALES_DTYPE = 'float32'
+
+# Uzun düzen (seri, ay, değer) kolonları: iç ad -> kabul edilen başlıklar (büyük/küçük harf duyarsız)
+LONG_COLUMNS = {
+    'MainGroupDesc': ('maingroupdesc', 'series_id', 'series', 'category'),
+    'ds': ('ds', 'date', 'month', 'period'),
+    'y': ('y', 'value', 'sales'),
+}
+
+# Uzun düzen okunurken bellekte tutulan satır bloğu
+LONG_CHUNK_ROWS = 500_000
+
+# Ingest cache anahtarına girer: temizleme veya şema değişince artırılmalı (eski cache okunmaz)
+INGEST_VERSION = 1
+
+
+def file_fingerprint(source, chunk_size=1024 * 1024):
+    """
+    Dosya içeriğinin sha256 hash'i
+    source: Dosya yolu veya getvalue() destekleyen dosya nesnesi (Streamlit upload)
+    """
+    h = hashlib.sha256()
+    if hasattr(source, 'getvalue'):
+        h.update(source.getvalue())
+    else:
+        with open(source, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def _source_name(source):
+    return getattr(source, 'name', None) or str(source)
+
+
+def _excel_engine():
+    """
+    Varsa Rust tabanlı calamine okuyucu, yoksa openpyxl
+    """
+    try:
+        import python_calamine  # noqa: F401
+        return 'calamine'
+    except ImportError:
+        return 'openpyxl'
+
+
+def compact_frame(data, levels=()):
+    """
+    Temiz veriyi kompakt tiplere çevir
+    Month: int8, MainGroupDesc ve alt seviyeler: category, satışlar: float32
+    """
+    month = pd.to_numeric(data['Month'], errors='coerce')
+    keep = month.notna() & data['MainGroupDesc'].notna()
+    data = data[keep]
+    month = month[keep]
+
+    compact = pd.DataFrame({
+        'Month': month.astype(np.int8).to_numpy(),
+        'MainGroupDesc': pd.Categorical(data['MainGroupDesc'].astype(str).to_numpy()),
+    })
+    # Alt hiyerarşi seviyeleri (boş hücreler NaN kalır)
+    for level in levels:
+        values = data[level]
+        compact[level] = pd.Categorical(values.astype(str).where(values.notna()).to_numpy())
+    compact['Sales_2024'] = pd.to_numeric(data['Sales_2024'], errors='coerce').astype(SALES_DTYPE).to_numpy()
+    compact['Sales_2025'] = pd.to_numeric(data['Sales_2025'], errors='coerce').astype(SALES_DTYPE).to_numpy()
+
+    return compact
+
+
+def is_long_frame(df):
+    """
+    Veri uzun düzende mi (ds, y kolonları) yoksa yıl başına satış kolonlu Sayfa1 düzeninde mi
+    """
+    return 'ds' in df.columns and 'y' in df.columns
+
+
+def long_columns(columns, levels=()):
+    """
+    Dosya başlıklarını uzun düzen kolonlarına eşle: {dosyadaki ad: iç ad}
+    Eşleşmeyen zorunlu kolon varsa None
+    """
+    lookup = {str(column).strip().casefold(): column for column in columns}
+    mapping = {}
+    for name, aliases in LONG_COLUMNS.items():
+        found = next((lookup[alias] for alias in aliases if alias in lookup), None)
+        if found is None:
+            return None
+        mapping[found] = name
+    for level in levels:
+        if level in columns:
+            mapping[level] = level
+    return mapping
+
+
+def _month_starts(values):
+    """
+    Tarih kolonunu ay başına çevir: tarih/metin ('2024-01', '2024-01-15') veya YYYYMM sayı
+    Çözülemeyen değerler NaT
+    """
+    if pd.api.types.is_integer_dtype(values) or pd.api.types.is_float_dtype(values):
+        dates = pd.to_datetime(values.astype('Int64').astype(str), format='%Y%m', errors='coerce')
+    elif pd.api.types.is_datetime64_any_dtype(values):
+        dates = values
+    else:
+        # Biçim bloktan bloğa tahmin edilmesin: '2024-01' ve '2024-01-15' aynı dosyada olabilir
+        dates = pd.to_datetime(values, errors='coerce', format='ISO8601')
+        # ISO dışı metinler (ör. '15.01.2024') tek tek çözülür
+        other = dates.isna() & values.notna()
+        if other.any():
+            dates[other] = pd.to_datetime(values[other], errors='coerce', format='mixed', dayfirst=True)
+    return dates.to_numpy().astype('datetime64[M]')
+
+
+def _long_chunks(source, levels, chunksize):
+    """
+    Kaynağı (CSV veya Parquet) blok blok, sadece gerekli kolonlarla oku
+    """
+    name = _source_name(source).lower()
+    if name.endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet girdisi için pyarrow gerekli: pip install pyarrow") from e
+        parquet = pq.ParquetFile(source)
+        mapping = long_columns(parquet.schema_arrow.names, levels)
+        if mapping is None:
+            raise ValueError(f"Uzun düzen kolonları bulunamadı (gerekli: {', '.join(LONG_COLUMNS)})")
+        for batch in parquet.iter_batches(batch_size=chunksize, columns=list(mapping)):
+            yield batch.to_pandas().rename(columns=mapping)
+        return
+
+    header = pd.read_csv(source, nrows=0).columns
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    mapping = long_columns(header, levels)
+    if mapping is None:
+        raise ValueError(f"Uzun düzen kolonları bulunamadı (gerekli: {', '.join(LONG_COLUMNS)})")
+    series_column = next(column for column, name in mapping.items() if name == 'MainGroupDesc')
+    reader = pd.read_csv(
+        source,
+        usecols=list(mapping),
+        dtype={series_column: str, **{level: str for level in levels}},
+        chunksize=chunksize
+    )
+    for chunk in reader:
+        yield chunk.rename(columns=mapping)
+
+
+def read_long(source, levels=(), chunksize=LONG_CHUNK_ROWS):
+    """
+    Uzun düzen veriyi (seri, ay, değer satırları; CSV veya Parquet) blok blok oku
+    Çok yıllı geçmiş yıl başına kolon açmadan tek tabloda tutulur
+    Seri kimlikleri ve seviyeler kategori kodlu; aynı seri + ayın değerleri toplanır
+    levels: Okunacak alt hiyerarşi seviyesi kolonları
+    Dönüş: MainGroupDesc (category), [seviyeler], ds (ay başı), y (float32); seri ve ay sıralı
+    """
+    from pandas.api.types import union_categoricals
+
+    levels = list(levels)
+    if hasattr(source, 'seek'):
+        source.seek(0)
+
+    keys = {column: [] for column in ['MainGroupDesc', *levels]}
+    months, values = [], []
+    for chunk in _long_chunks(source, levels, chunksize):
+        month = _month_starts(chunk['ds'])
+        value = pd.to_numeric(chunk['y'], errors='coerce').to_numpy(dtype=SALES_DTYPE)
+        keep = ~np.isnat(month) & ~np.isnan(value) & chunk['MainGroupDesc'].notna().to_numpy()
+        for column, parts in keys.items():
+            values_ = chunk[column][keep]
+            parts.append(pd.Categorical(values_.astype(str).where(values_.notna()).to_numpy()))
+        months.append(month[keep].astype(np.int32))
+        values.append(value[keep])
+
+    if not months:
+        raise ValueError("Veri bulunamadı")
+
+    data = pd.DataFrame({column: union_categoricals(parts) for column, parts in keys.items()})
+    data['ds'] = np.concatenate(months)
+    data['y'] = np.concatenate(values).astype(float)
+
+    # Aynı seri + ay (ör. mağaza satırları) tek değer
+    data = data.groupby(list(keys) + ['ds'], sort=True, observed=True, dropna=False)['y'].sum().reset_index()
+    data['ds'] = data['ds'].to_numpy().astype('datetime64[M]').astype('datetime64[ns]')
+    data['y'] = data['y'].astype(SALES_DTYPE)
+    return data
+
+
+def _csv_is_long(source, levels=()):
+    header = pd.read_csv(source, nrows=0).columns
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return 'Sales_2024' not in header and long_columns(header, levels) is not None
+
+
+def read_workbook(source, sheet_name='Sayfa1', hierarchy=None):
+    """
+    Kaynak dosyayı oku, sadece kullanılan kolonları al
+    Excel: Sayfa1 düzeni (kolon 0, 1, 4, 13)
+    CSV: Month, MainGroupDesc, Sales_2024, Sales_2025 başlıklı temiz düzen
+    CSV/Parquet uzun düzen (seri, tarih, değer başlıklı): read_long ile blok blok
+    hierarchy: MainGroupDesc altındaki seviyeler, üstten alta {Excel kolon indeksi: ad}
+               (ör. {2: 'SubGroupDesc'}); CSV ve Parquet'te aynı adlı kolonlar okunur
+    """
+    hierarchy = hierarchy or {}
+    levels = list(hierarchy.values())
+
+    if hasattr(source, 'seek'):
+        source.seek(0)
+
+    name = _source_name(source).lower()
+    if name.endswith('.parquet') or (name.endswith('.csv') and _csv_is_long(source, levels)):
+        return read_long(source, levels)
+
+    if name.endswith('.csv'):
+        data = pd.read_csv(
+            source,
+            usecols=list(WORKBOOK_COLUMNS.values()) + levels,
+            dtype={'MainGroupDesc': 'category', 'Sales_2024': SALES_DTYPE, 'Sales_2025': SALES_DTYPE,
+                   **{level: 'category' for level in levels}}
+        )
+    else:
+        columns = {**WORKBOOK_COLUMNS, **hierarchy}
+        data = pd.read_excel(
+            source,
+            sheet_name=sheet_name,
+            header=None,
+            skiprows=HEADER_ROWS,
+            usecols=sorted(columns),
+            engine=_excel_engine()
+        )
+        data = data.rename(columns=columns)
+
+    return compact_frame(data, levels)
+
+
+def load_workbook(source, cache_dir='.ml_budget_cache/ingest', sheet_name='Sayfa1', hierarchy=None):
+    """
+    Temiz veriyi yükle; aynı dosya daha önce okunduysa Arrow cache'ten
+    Cache sıkıştırmasız Arrow (Feather) dosyası: tekrar okumada memory-map edilir
+    Anahtar: dosya içeriği + INGEST_VERSION (+ seviye seçimi)
+    pyarrow yoksa her seferinde kaynaktan okunur
+    hierarchy: Okunacak alt seviye kolonları (bkz. read_workbook)
+    """
+    try:
+        import pyarrow.feather as feather
+    except ImportError:
+        return read_workbook(source, sheet_name, hierarchy)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    key = f"{file_fingerprint(source)}-v{INGEST_VERSION}"
+    if hierarchy:
+        # Farklı seviye seçimleri ayrı cache dosyalarına yazılır
+        spec = ','.join(f"{column}={name}" for column, name in sorted(hierarchy.items()))
+        key = f"{key}-{hashlib.sha256(spec.encode('utf-8')).hexdigest()[:12]}"
+    path = os.path.join(cache_dir, f"{key}-{sheet_name}.arrow")
+
+    if os.path.exists(path):
+        return feather.read_table(path, memory_map=True).to_pandas()
+
+    data = read_workbook(source, sheet_name, hierarchy)
+
+    # Yarım yazılmış dosya okunmasın diye önce geçici dosyaya yaz (süreç + thread başına ayrı)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    feather.write_feather(data, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, path)
+
+    return data
@@ -0,0 +1,585 @@
+import json
+import warnings
+import pandas as pd
+import numpy as np
+from ml_budget_routing import ROUTES, ROUTING_THRESHOLDS, series_matrix, profile_series, route_series
+
+# Prophet'in varsayılan interval_width=0.80 aralığına karşılık gelen z değeri
+Z_80 = 1.2815515655446004
+
+
+class ForecastEngine:
+    """
+    Tahmin motoru arayüzü
+    fit/predict Prophet'e benzer: predict çıktısı ds, yhat, yhat_lower, yhat_upper
+    batched=True olan motorlar tüm kategorileri tek seferde eğitir
+    """
+    name = None
+    batched = False
+    # pooled=True: Kategoriler ortak parametreleri paylaşır; bir kategorinin tahmini
+    # diğerlerinin verisine de bağlı olduğundan kategori bazlı cache kullanılmaz
+    pooled = False
+    # routed=True: Motor her seriyi profiline göre bir alt motora yönlendirir (bkz. AutoEngine)
+    routed = False
+    # simulated=True: Aralıklar simülasyonla üretilir; uncertainty_samples sadece predict'i etkiler
+    simulated = False
+
+    def fit(self, category_data, params, init=None):
+        raise NotImplementedError
+
+    def predict(self, model, periods, uncertainty_samples=None):
+        """
+        uncertainty_samples: Güven aralığı simülasyon sayısı (None: motor varsayılanı)
+        """
+        raise NotImplementedError
+
+    def warm_start(self, model):
+        """
+        Yeniden eğitimde başlangıç noktası olacak parametreler (desteklenmiyorsa None)
+        """
+        return None
+
+    def fit_predict_all(self, all_series, params, periods):
+        """
+        {kategori: seri} -> {kategori: (model, tahmin)}
+        Varsayılan: kategori kategori fit + predict
+        """
+        results = {}
+        for category, category_data in all_series.items():
+            model = self.fit(category_data, params)
+            results[category] = (model, self.predict(model, periods))
+        return results
+
+    def to_json(self, model):
+        raise NotImplementedError
+
+    def from_json(self, model_json):
+        raise NotImplementedError
+
+
+class ProphetEngine(ForecastEngine):
+    """
+    Prophet (Stan) tabanlı motor
+    """
+    name = 'prophet'
+    simulated = True
+
+    def fit(self, category_data, params, init=None):
+        from prophet import Prophet
+
+        model = Prophet(**params)
+        if init is not None:
+            # Önceki fit'ten başlayan Stan optimizasyonu
+            model.fit(category_data, init=init)
+        else:
+            model.fit(category_data)
+        return model
+
+    def predict(self, model, periods, uncertainty_samples=None):
+        # 0 verilirse sadece nokta tahmini (yhat_lower/yhat_upper üretilmez)
+        # Ayar sadece bu çağrı için: saklanan/cache'lenen model değişmez
+        previous = model.uncertainty_samples
+        if uncertainty_samples is not None:
+            model.uncertainty_samples = uncertainty_samples
+        
+        try:
+            # Sadece gelecek ay başları; geçmiş dönemleri tahmin etmeye gerek yok
+            future = model.make_future_dataframe(periods=periods, freq='MS', include_history=False)
+            return model.predict(future)
+        finally:
+            model.uncertainty_samples = previous
+
+    def warm_start(self, model):
+        from prophet.utilities import warm_start_params
+        return warm_start_params(model)
+
+    def to_json(self, model):
+        from prophet.serialize import model_to_json
+        return model_to_json(model)
+
+    def from_json(self, model_json):
+        from prophet.serialize import model_from_json
+        return model_from_json(model_json)
+
+
+class SeasonalNaiveModel:
+    """
+    Seasonal-naive motorunun "modeli": geçmiş seri + hesaplanan parametreler
+    """
+
+    def __init__(self, history, growth=None, sigma=None):
+        self.history = history
+        self.growth = growth
+        self.sigma = sigma
+
+
+class SeasonalNaiveEngine(ForecastEngine):
+    """
+    Sadece NumPy kullanan trendli seasonal-naive motoru
+    Tahmin = geçen yılın aynı ayı x yıllık büyüme oranı
+    Tüm kategoriler (kategori x ay) matrisi üzerinde tek seferde hesaplanır
+    Güven aralıkları analitik olduğundan simülasyon sayısı kullanılmaz
+    """
+    name = 'seasonal_naive'
+    batched = True
+
+    def __init__(self, season_length=12, growth_clip=(0.1, 10.0)):
+        self.season_length = season_length
+        self.growth_clip = growth_clip
+
+    def fit(self, category_data, params, init=None):
+        return SeasonalNaiveModel(category_data)
+
+    def predict(self, model, periods, uncertainty_samples=None):
+        results = self.fit_predict_all({0: model.history}, {}, periods)
+        fitted, forecast = results[0]
+        model.growth, model.sigma = fitted.growth, fitted.sigma
+        return forecast
+
+    def fit_predict_all(self, all_series, params, periods):
+        categories = list(all_series)
+        if not categories:
+            return {}
+
+        # Tüm seriler tek uzun tabloda: kategori kodu + ay indeksi
+        lengths = np.array([len(all_series[c]) for c in categories])
+        codes = np.repeat(np.arange(len(categories)), lengths)
+        ds = np.concatenate([
+            pd.to_datetime(all_series[c]['ds']).values.astype('datetime64[M]')
+            for c in categories
+        ])
+        y = np.concatenate([all_series[c]['y'].to_numpy(dtype=float) for c in categories])
+        month_index = ds.astype(np.int64)
+
+        start = month_index.min()
+        offsets = month_index - start
+        n_hist = offsets.max() + 1
+        m = self.season_length
+
+        # (kategori x ay) matrisi; gelecek aylar için de yer aç
+        Y = np.full((len(categories), n_hist + periods), np.nan)
+        Y[codes, offsets] = y
+
+        last = np.full(len(categories), -1)
+        np.maximum.at(last, codes, offsets)
+
+        # Yıllık büyüme: aynı ayın bir yıl önceki değeriyle oranı
+        current = Y[:, m:n_hist]
+        previous = Y[:, :n_hist - m] if n_hist > m else np.empty((len(categories), 0))
+        paired = ~np.isnan(current) & ~np.isnan(previous)
+        cur_sum = np.where(paired, current, 0.0).sum(axis=1)
+        prev_sum = np.where(paired, previous, 0.0).sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            growth = np.where(prev_sum > 0, cur_sum / prev_sum, 1.0)
+        growth = np.clip(np.nan_to_num(growth, nan=1.0, posinf=1.0), *self.growth_clip)
+
+        # Belirsizlik: trendli seasonal-naive'in geçmişteki hata std'si
+        # Yeterli eşleşme yoksa serinin kendi std'si kullanılır
+        residuals = np.where(paired, current - growth[:, None] * previous, np.nan)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            sigma = np.where(
+                paired.sum(axis=1) > 1,
+                np.nanstd(residuals, axis=1) if residuals.size else np.nan,
+                np.nanstd(Y[:, :n_hist], axis=1)
+            )
+
+            # Seviye: mevsimsel karşılığı olmayan aylar için son 12 ayın ortalaması
+            recent = np.arange(n_hist)[None, :] > (last - m)[:, None]
+            level = np.nanmean(np.where(recent, Y[:, :n_hist], np.nan), axis=1)
+        sigma = np.nan_to_num(sigma)
+
+        # Her kategori kendi son ayından itibaren periods ay ileri
+        horizon = np.arange(1, periods + 1)
+        target = last[:, None] + horizon[None, :]
+        rows = np.arange(len(categories))[:, None]
+
+        yhat = np.full(target.shape, np.nan)
+        years_back = np.zeros(target.shape)
+        max_years = n_hist // m + 1
+        for k in range(1, max_years + 1):
+            source = target - k * m
+            valid = (source >= 0) & np.isnan(yhat)
+            base = np.where(valid, Y[rows, np.clip(source, 0, None)], np.nan)
+            found = ~np.isnan(base)
+            yhat = np.where(found, base * growth[:, None] ** k, yhat)
+            years_back = np.where(found, k, years_back)
+
+        missing = np.isnan(yhat)
+        yhat = np.where(missing, level[:, None], yhat)
+        years_back = np.where(missing, 1, years_back)
+
+        spread = Z_80 * sigma[:, None] * np.sqrt(years_back)
+        target_ds = (target + start).astype('datetime64[M]').astype('datetime64[ns]')
+
+        results = {}
+        for i, category in enumerate(categories):
+            forecast = pd.DataFrame({
+                'ds': target_ds[i],
+                'yhat': yhat[i],
+                'yhat_lower': yhat[i] - spread[i],
+                'yhat_upper': yhat[i] + spread[i],
+            })
+            model = SeasonalNaiveModel(all_series[category], growth[i], sigma[i])
+            results[category] = (model, forecast)
+        return results
+
+    def to_json(self, model):
+        history = model.history
+        return json.dumps({
+            'ds': pd.to_datetime(history['ds']).dt.strftime('%Y-%m-%d').tolist(),
+            'y': history['y'].astype(float).tolist(),
+            'growth': None if model.growth is None else float(model.growth),
+            'sigma': None if model.sigma is None else float(model.sigma),
+        })
+
+    def from_json(self, model_json):
+        data = json.loads(model_json)
+        history = pd.DataFrame({'ds': pd.to_datetime(data['ds']), 'y': data['y']})
+        return SeasonalNaiveModel(history, data['growth'], data['sigma'])
+
+
+class GlobalModel:
+    """
+    Global motorun kategori modeli: kendi seviye/trend/sezon sapması katsayıları (coef),
+    tüm kategorilerle ortak sezon katsayıları (shared), ölçek ve tahmin kovaryansı
+    """
+
+    def __init__(self, history, coef, shared, scale, sigma, covariance, start, last):
+        self.history = history
+        self.coef = np.asarray(coef, dtype=float)
+        self.shared = np.asarray(shared, dtype=float)
+        self.scale = scale
+        self.sigma = sigma
+        self.covariance = np.asarray(covariance, dtype=float)
+        self.start = start
+        self.last = last
+
+
+class GlobalEngine(ForecastEngine):
+    """
+    Tüm kategoriler tek doğrusal modelde (sadece NumPy)
+    y_it / ölçek_i = seviye_i + trend_i * t + F(ay_t) · (ortak_sezon + sapma_i)
+    F: Ortak Fourier sezon tabanı (n_harmonics harmonik); sapma_i ortak sezona doğru,
+    trend sıfıra doğru ridge ile çekilir. Tüm kategorilerin normal denklemleri
+    (kategori x p x p) dizileriyle toplu kurulur, ortak sezon Schur tümleyeniyle
+    kapalı formda çözülür: iterasyon ve Stan optimizasyonu yok
+    Aralıklar analitik: sigma_i * sqrt(1 + x' (X'X + Λ)^-1 x)
+    """
+    name = 'global'
+    batched = True
+    pooled = True
+
+    def __init__(self, n_harmonics=3, seasonal_shrinkage=0.5, trend_shrinkage=0.1):
+        self.n_harmonics = n_harmonics
+        self.seasonal_shrinkage = seasonal_shrinkage
+        self.trend_shrinkage = trend_shrinkage
+
+    def _basis(self, month_index):
+        """
+        Takvim ayına göre Fourier tabanı: (..., 2 * n_harmonics)
+        """
+        angle = 2 * np.pi * (np.asarray(month_index) % 12)[..., None] / 12
+        k = np.arange(1, self.n_harmonics + 1)
+        return np.concatenate([np.sin(angle * k), np.cos(angle * k)], axis=-1)
+
+    def _design(self, month_index, start):
+        """
+        [1, t (yıl), F] tasarım satırları: (..., 2 + 2 * n_harmonics)
+        """
+        month_index = np.asarray(month_index)
+        t = (month_index - start) / 12
+        ones = np.ones(month_index.shape + (1,))
+        return np.concatenate([ones, t[..., None], self._basis(month_index)], axis=-1)
+
+    def _forecast(self, coef, shared, scale, sigma, covariance, start, last, periods):
+        """
+        (kategori x ufuk) nokta tahmini ve 80% aralık yarı genişliği
+        """
+        target = last[:, None] + np.arange(1, periods + 1)[None, :]
+        x = self._design(target, start[:, None])
+        yhat = np.einsum('nhp,np->nh', x, coef) + self._basis(target) @ shared
+        leverage = np.einsum('nhp,npq,nhq->nh', x, covariance, x)
+        spread = Z_80 * sigma[:, None] * np.sqrt(1 + leverage)
+        return target, yhat * scale[:, None], spread * scale[:, None]
+
+    def fit(self, category_data, params, init=None):
+        return self.fit_predict_all({0: category_data}, params, 1)[0][0]
+
+    def predict(self, model, periods, uncertainty_samples=None):
+        target, yhat, spread = self._forecast(
+            model.coef[None], model.shared, np.array([model.scale]), np.array([model.sigma]),
+            model.covariance[None], np.array([model.start]), np.array([model.last]), periods
+        )
+        return pd.DataFrame({
+            'ds': target[0].astype('datetime64[M]').astype('datetime64[ns]'),
+            'yhat': yhat[0],
+            'yhat_lower': yhat[0] - spread[0],
+            'yhat_upper': yhat[0] + spread[0],
+        })
+
+    def fit_predict_all(self, all_series, params, periods):
+        categories = list(all_series)
+        if not categories:
+            return {}
+
+        # Tüm seriler (kategori x ay) matrisinde; W gözlem maskesi
+        lengths = np.array([len(all_series[c]) for c in categories])
+        codes = np.repeat(np.arange(len(categories)), lengths)
+        month_index = np.concatenate([
+            pd.to_datetime(all_series[c]['ds']).values.astype('datetime64[M]').astype(np.int64)
+            for c in categories
+        ])
+        y = np.concatenate([all_series[c]['y'].to_numpy(dtype=float) for c in categories])
+        observed = ~np.isnan(y)
+
+        start = month_index.min()
+        offsets = month_index - start
+        n_hist = offsets.max() + 1
+
+        Y = np.zeros((len(categories), n_hist))
+        W = np.zeros((len(categories), n_hist))
+        Y[codes[observed], offsets[observed]] = y[observed]
+        W[codes[observed], offsets[observed]] = 1.0
+
+        last = np.full(len(categories), -1)
+        np.maximum.at(last, codes[observed], offsets[observed])
+        last = last + start
+
+        # Kategori ölçeği: ortak sezon göreli (çarpımsal) genlik olarak paylaşılır
+        # Hep sıfır satan kategoriler ortak tahmine katılmaz, tahminleri sıfırdır (ölçek 0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scale = np.abs(Y).sum(axis=1) / W.sum(axis=1)
+        scale = np.where(np.isfinite(scale), scale, 0.0)
+        active = scale > 0
+        Y = Y / np.where(active, scale, 1.0)[:, None]
+        W = W * active[:, None]
+
+        months = start + np.arange(n_hist)
+        X = self._design(months, start)
+        F = X[:, 2:]
+        penalty = np.diag([0.0, self.trend_shrinkage] + [self.seasonal_shrinkage] * F.shape[1])
+
+        # Kategori normal denklemleri: A_i = X' W_i X + Λ, B_i = X' W_i F
+        A = np.einsum('nt,tp,tq->npq', W, X, X) + penalty
+        A[~active, 0, 0] = 1.0
+        B = np.einsum('nt,tp,tq->npq', W, X, F)
+        A_inv = np.linalg.inv(A)
+        XWy = (W * Y) @ X
+        FWy = (W * Y) @ F
+
+        # Ortak sezon: kategori katsayıları elenerek (Schur tümleyeni) tek sistem
+        A_inv_B = A_inv @ B
+        M = np.einsum('nt,tp,tq->pq', W, F, F) - np.einsum('npq,npr->qr', B, A_inv_B)
+        r = FWy.sum(axis=0) - np.einsum('npq,np->q', A_inv_B, XWy)
+        shared = np.linalg.solve(M + 1e-10 * np.eye(len(M)), r)
+
+        coef = np.einsum('npq,nq->np', A_inv, XWy - B @ shared)
+
+        # Artık std (serbestlik derecesi: seviye + trend)
+        residual = W * (Y - coef @ X.T - F @ shared)
+        dof = np.maximum(W.sum(axis=1) - 2, 1)
+        sigma = np.sqrt((residual ** 2).sum(axis=1) / dof)
+
+        target, yhat, spread = self._forecast(coef, shared, scale, sigma, A_inv, np.full(len(categories), start), last, periods)
+        target_ds = target.astype('datetime64[M]').astype('datetime64[ns]')
+
+        results = {}
+        for i, category in enumerate(categories):
+            forecast = pd.DataFrame({
+                'ds': target_ds[i],
+                'yhat': yhat[i],
+                'yhat_lower': yhat[i] - spread[i],
+                'yhat_upper': yhat[i] + spread[i],
+            })
+            model = GlobalModel(all_series[category], coef[i], shared, scale[i], sigma[i], A_inv[i], start, last[i])
+            results[category] = (model, forecast)
+        return results
+
+    def to_json(self, model):
+        history = model.history
+        return json.dumps({
+            'ds': pd.to_datetime(history['ds']).dt.strftime('%Y-%m-%d').tolist(),
+            'y': history['y'].astype(float).tolist(),
+            'coef': model.coef.tolist(),
+            'shared': model.shared.tolist(),
+            'scale': float(model.scale),
+            'sigma': float(model.sigma),
+            'covariance': model.covariance.tolist(),
+            'start': int(model.start),
+            'last': int(model.last),
+        })
+
+    def from_json(self, model_json):
+        data = json.loads(model_json)
+        history = pd.DataFrame({'ds': pd.to_datetime(data['ds']), 'y': data['y']})
+        return GlobalModel(
+            history, data['coef'], data['shared'], data['scale'], data['sigma'],
+            data['covariance'], data['start'], data['last']
+        )
+
+
+class LevelModel:
+    """
+    Sabit seviye motorlarının modeli: geçmiş seri + seviye ve std
+    """
+
+    def __init__(self, history, level=None, sigma=None):
+        self.history = history
+        self.level = level
+        self.sigma = sigma
+
+
+class MeanEngine(ForecastEngine):
+    """
+    Son window ayın ortalaması (sıfırlar dahil) düz tahmin olarak; seyrek, kısa veya düz seriler için
+    Aralık: aynı ayların std'siyle analitik
+    """
+    name = 'mean'
+    batched = True
+
+    def __init__(self, window=12):
+        self.window = window
+
+    def _levels(self, Y, recent):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            values = np.where(recent, Y, np.nan)
+            return np.nanmean(values, axis=1), np.nan_to_num(np.nanstd(values, axis=1))
+
+    def fit(self, category_data, params, init=None):
+        return LevelModel(category_data)
+
+    def predict(self, model, periods, uncertainty_samples=None):
+        fitted, forecast = self.fit_predict_all({0: model.history}, {}, periods)[0]
+        model.level, model.sigma = fitted.level, fitted.sigma
+        return forecast
+
+    def fit_predict_all(self, all_series, params, periods):
+        if not all_series:
+            return {}
+        categories, Y, start = series_matrix(all_series)
+        observed = ~np.isnan(Y)
+        last = Y.shape[1] - 1 - np.argmax(observed[:, ::-1], axis=1)
+        recent = np.arange(Y.shape[1])[None, :] > (last - self.window)[:, None]
+        level, sigma = self._levels(Y, recent)
+
+        target = last[:, None] + np.arange(1, periods + 1)[None, :]
+        target_ds = (target + start).astype('datetime64[M]').astype('datetime64[ns]')
+        spread = Z_80 * sigma
+
+        results = {}
+        for i, category in enumerate(categories):
+            yhat = np.full(periods, level[i])
+            forecast = pd.DataFrame({
+                'ds': target_ds[i],
+                'yhat': yhat,
+                'yhat_lower': yhat - spread[i],
+                'yhat_upper': yhat + spread[i],
+            })
+            results[category] = (LevelModel(all_series[category], level[i], sigma[i]), forecast)
+        return results
+
+    def to_json(self, model):
+        history = model.history
+        return json.dumps({
+            'ds': pd.to_datetime(history['ds']).dt.strftime('%Y-%m-%d').tolist(),
+            'y': history['y'].astype(float).tolist(),
+            'level': None if model.level is None else float(model.level),
+            'sigma': None if model.sigma is None else float(model.sigma),
+        })
+
+    def from_json(self, model_json):
+        data = json.loads(model_json)
+        history = pd.DataFrame({'ds': pd.to_datetime(data['ds']), 'y': data['y']})
+        return LevelModel(history, data['level'], data['sigma'])
+
+
+class ZeroEngine(MeanEngine):
+    """
+    Sıfır tahmin; son dönemde hiç satışı olmayan seriler için
+    """
+    name = 'zero'
+
+    def _levels(self, Y, recent):
+        return np.zeros(len(Y)), np.zeros(len(Y))
+
+
+class RoutedModel:
+    """
+    AutoEngine modeli: seçilen rota + o motorun modeli
+    """
+
+    def __init__(self, route, model):
+        self.route = route
+        self.model = model
+
+
+class AutoEngine(ForecastEngine):
+    """
+    Seri profiline göre en ucuz yeterli motoru seçer (bkz. ml_budget_routing)
+    Sıfır/ortalama/seasonal-naive rotaları vektörel, sadece Prophet rotası kategori kategori eğitilir
+    """
+    name = 'auto'
+    routed = True
+    # Prophet rotasındaki seriler için
+    simulated = True
+
+    def __init__(self, thresholds=None):
+        self.thresholds = dict(ROUTING_THRESHOLDS, **(thresholds or {}))
+        self.engines = {route: get_engine(route) for route in ROUTES}
+
+    def route(self, all_series):
+        """
+        {kategori: seri} -> profil + model + gerekçe tablosu (index: kategori)
+        """
+        profile = profile_series(all_series, self.thresholds['recent_months'])
+        return route_series(profile, self.thresholds)
+
+    def fit(self, category_data, params, init=None):
+        route = self.route({0: category_data})['model'].iloc[0]
+        engine = self.engines[route]
+        return RoutedModel(route, engine.fit(category_data, params, init=init if route == 'prophet' else None))
+
+    def predict(self, model, periods, uncertainty_samples=None):
+        return self.engines[model.route].predict(model.model, periods, uncertainty_samples)
+
+    def warm_start(self, model):
+        return self.engines[model.route].warm_start(model.model)
+
+    def fit_predict_all(self, all_series, params, periods):
+        routes = self.route(all_series)['model']
+        results = {}
+        for route, engine in self.engines.items():
+            group = {category: all_series[category] for category in routes.index[routes == route]}
+            for category, (model, forecast) in engine.fit_predict_all(group, params, periods).items():
+                results[category] = (RoutedModel(route, model), forecast)
+        return {category: results[category] for category in all_series}
+
+    def to_json(self, model):
+        return json.dumps({'route': model.route, 'model': self.engines[model.route].to_json(model.model)})
+
+    def from_json(self, model_json):
+        data = json.loads(model_json)
+        return RoutedModel(data['route'], self.engines[data['route']].from_json(data['model']))
+
+
+ENGINES = {
+    ProphetEngine.name: ProphetEngine,
+    SeasonalNaiveEngine.name: SeasonalNaiveEngine,
+    GlobalEngine.name: GlobalEngine,
+    MeanEngine.name: MeanEngine,
+    ZeroEngine.name: ZeroEngine,
+    AutoEngine.name: AutoEngine,
+}
+
+
+def get_engine(engine):
+    """
+    Motor adı veya örneğinden ForecastEngine döndür
+    """
+    if isinstance(engine, ForecastEngine):
+        return engine
+    if engine not in ENGINES:
+        raise ValueError(f"Bilinmeyen tahmin motoru: {engine} (seçenekler: {', '.join(ENGINES)})")
+    return ENGINES[engine]()
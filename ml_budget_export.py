@@ -0,0 +1,233 @@
+import io
+import os
+import re
+import tempfile
+import numpy as np
+from ml_budget_store import ForecastStore, VALUE_COLUMNS
+
+EXPORT_FORMATS = ('xlsx', 'csv', 'parquet')
+
+MIME_TYPES = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+# Excel sınırları
+MAX_SHEET_NAME = 31
+EXCEL_MAX_ROWS = 1048576
+INVALID_SHEET_CHARS = re.compile(r"[\[\]:*?/\\]")
+
+LONG_COLUMNS = ['Category', 'Month', *VALUE_COLUMNS]
+
+# Kategori sayfalarının listesi (sayfa adı -> kategori)
+INDEX_SHEET = 'Kategoriler'
+LONG_SHEET = 'Tahminler'
+
+
+def sheet_names(categories, reserved=()):
+    """
+    Excel'e uygun, benzersiz sayfa adları (en fazla 31 karakter, büyük/küçük harf duyarsız)
+    Kısaltma sonrası çakışan adlara " (2)", " (3)" ... eklenir
+    """
+    used = {name.casefold() for name in reserved}
+    names = []
+    for category in categories:
+        base = INVALID_SHEET_CHARS.sub('_', str(category)).strip("'") or 'Kategori'
+        name = base[:MAX_SHEET_NAME].rstrip()
+        n = 2
+        while name.casefold() in used:
+            suffix = f" ({n})"
+            name = base[:MAX_SHEET_NAME - len(suffix)].rstrip() + suffix
+            n += 1
+        used.add(name.casefold())
+        names.append(name)
+    return names
+
+
+def iter_long_chunks(store, chunk_size=10000):
+    """
+    Uzun tabloyu kategori blokları halinde üret; tahmini olmayan aylar atlanır
+    Her blok sadece chunk_size kategori kadar bellek kullanır
+    """
+    for start in range(0, len(store), chunk_size):
+        block = slice(start, start + chunk_size)
+        chunk = ForecastStore(
+            store.index[block], store.months,
+            store.forecast[block], store.lower[block], store.upper[block]
+        ).to_long()
+        yield chunk[chunk['Forecast'].notna()]
+
+
+def _cell(value):
+    """
+    openpyxl hücre değeri: NaN boş, numpy tipleri Python tipine
+    """
+    if isinstance(value, (float, np.floating)):
+        return None if np.isnan(value) else float(value)
+    if isinstance(value, np.integer):
+        return int(value)
+    return value
+
+
+def _append_frame(ws, frame):
+    ws.append([str(column) for column in frame.columns])
+    for row in frame.itertuples(index=False):
+        ws.append([_cell(value) for value in row])
+
+
+def write_workbook(store, target, layout='sheets', sheets=None, chunk_size=10000):
+    """
+    Detaylı tahminleri openpyxl write-only modunda yaz (satırlar geçici dosyalara akıtılır)
+    layout='sheets': Her kategori ayrı sayfa + sayfa adı/kategori listesi
+    layout='long': Tek uzun tablo (Excel satır sınırında yeni sayfaya geçilir)
+    sheets: Başa eklenecek ek tablolar {sayfa adı: DataFrame} (ör. özet, karşılaştırma)
+    """
+    from openpyxl import Workbook
+
+    if layout not in ('sheets', 'long'):
+        raise ValueError(f"Bilinmeyen sayfa düzeni: {layout} (seçenekler: sheets, long)")
+
+    wb = Workbook(write_only=True)
+    sheets = sheets or {}
+    for name, frame in sheets.items():
+        _append_frame(wb.create_sheet(name), frame)
+
+    if layout == 'sheets':
+        names = sheet_names(store.index, reserved=[*sheets, INDEX_SHEET])
+        index_ws = wb.create_sheet(INDEX_SHEET)
+        index_ws.append(['Sheet', 'Category'])
+        for name, category in zip(names, store.index):
+            index_ws.append([name, str(category)])
+
+        header = ['Month', *VALUE_COLUMNS]
+        for i, name in enumerate(names):
+            ws = wb.create_sheet(name)
+            ws.append(header)
+            for k in np.flatnonzero(~np.isnan(store.forecast[i])):
+                ws.append([int(store.months[k]), float(store.forecast[i, k]),
+                           float(store.lower[i, k]), float(store.upper[i, k])])
+    else:
+        ws, rows, part = None, EXCEL_MAX_ROWS, 1
+        for chunk in iter_long_chunks(store, chunk_size):
+            for row in chunk.itertuples(index=False):
+                if rows >= EXCEL_MAX_ROWS:
+                    ws = wb.create_sheet(LONG_SHEET if part == 1 else f"{LONG_SHEET} ({part})")
+                    ws.append(LONG_COLUMNS)
+                    rows, part = 1, part + 1
+                ws.append([str(row[0]), int(row[1]), *(_cell(value) for value in row[2:])])
+                rows += 1
+        if ws is None:
+            wb.create_sheet(LONG_SHEET).append(LONG_COLUMNS)
+
+    wb.save(target)
+
+
+def write_long_csv(store, target, chunk_size=10000):
+    """
+    Uzun tabloyu blok blok CSV'ye yaz (target: yol veya binary dosya nesnesi)
+    """
+    if isinstance(target, (str, os.PathLike)):
+        with open(target, 'w', encoding='utf-8', newline='') as f:
+            _write_csv_chunks(store, f, chunk_size)
+        return
+
+    text = io.TextIOWrapper(target, encoding='utf-8', newline='')
+    try:
+        _write_csv_chunks(store, text, chunk_size)
+    finally:
+        text.flush()
+        text.detach()
+
+
+def _write_csv_chunks(store, f, chunk_size):
+    header = True
+    for chunk in iter_long_chunks(store, chunk_size):
+        chunk.to_csv(f, index=False, header=header)
+        header = False
+    if header:
+        f.write(','.join(LONG_COLUMNS) + '\n')
+
+
+def write_long_parquet(store, target, chunk_size=10000):
+    """
+    Uzun tabloyu Parquet'e yaz; her blok ayrı row group (Category sözlük kodlu)
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet çıktısı için pyarrow gerekli: pip install pyarrow") from e
+
+    schema = pa.schema([
+        ('Category', pa.dictionary(pa.int32(), pa.string())),
+        ('Month', pa.int64()),
+        *[(column, pa.float64()) for column in VALUE_COLUMNS],
+    ])
+
+    with pq.ParquetWriter(target, schema) as writer:
+        for chunk in iter_long_chunks(store, chunk_size):
+            category = chunk['Category'].cat
+            arrays = [
+                pa.DictionaryArray.from_arrays(
+                    pa.array(category.codes.to_numpy(dtype=np.int32)),
+                    pa.array(category.categories.astype(str).tolist(), type=pa.string())
+                ),
+                pa.array(chunk['Month'].to_numpy(dtype=np.int64)),
+                *[pa.array(chunk[column].to_numpy(dtype=float)) for column in VALUE_COLUMNS],
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+
+def _format_of(target, fmt):
+    if fmt is None:
+        if not isinstance(target, (str, os.PathLike)):
+            raise ValueError("Dosya nesnesi için format belirtilmeli")
+        fmt = os.path.splitext(os.fspath(target))[1].lstrip('.').lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Bilinmeyen format: {fmt} (seçenekler: {', '.join(EXPORT_FORMATS)})")
+    return fmt
+
+
+def export_forecasts(store, target, fmt=None, layout='sheets', sheets=None, chunk_size=10000):
+    """
+    Tahminleri dosyaya yaz; format uzantıdan (xlsx, csv, parquet) veya fmt ile
+    csv/parquet her zaman uzun tablo; sheets sadece xlsx'e eklenir
+    Yol verilirse önce geçici dosyaya yazılır (yarım dosya kalmaz)
+    """
+    fmt = _format_of(target, fmt)
+
+    def write(out):
+        if fmt == 'xlsx':
+            write_workbook(store, out, layout=layout, sheets=sheets, chunk_size=chunk_size)
+        elif fmt == 'csv':
+            write_long_csv(store, out, chunk_size=chunk_size)
+        else:
+            write_long_parquet(store, out, chunk_size=chunk_size)
+
+    if not isinstance(target, (str, os.PathLike)):
+        write(target)
+        return target
+
+    tmp_path = f"{os.fspath(target)}.{os.getpid()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, target)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return target
+
+
+def export_file(store, fmt, layout='sheets', sheets=None, chunk_size=10000):
+    """
+    Diskteki geçici dosyaya yaz ve başa sarılmış, okunur dosya nesnesini döndür
+    (st.download_button için: içerik bellekte ikinci kez kurulmaz, kapatılınca silinir)
+    """
+    f = tempfile.TemporaryFile()
+    export_forecasts(store, f, fmt=fmt, layout=layout, sheets=sheets, chunk_size=chunk_size)
+    f.flush()
+    # st.download_button io.BufferedReader kabul eder (TemporaryFile io.BufferedRandom döner)
+    raw = f.detach()
+    raw.seek(0)
+    return io.BufferedReader(raw)
@@ -1,18 +1,506 @@
+import gc
+import os
+import json
+import threading
+import zlib
+import time
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
-from prophet import Prophet
+from ml_budget_cache import ForecastCache
+from ml_budget_engines import get_engine
+from ml_budget_stats import RunStats, JsonlTraceHook, current_rss_mb, peak_rss_mb, deep_sizeof
+from ml_budget_hierarchy import Hierarchy, RECONCILIATION_METHODS
+from ml_budget_store import ForecastStore, ModelStore, MODEL_RETENTION, VALUE_COLUMNS, frame_rows
+from ml_budget_data import is_long_frame
 import warnings
 warnings.filterwarnings('ignore')
 
+
+def _category_seed(category_name):
+    """
+    Kategori adından sabit bir random seed üret
+    Seri ve paralel çalıştırmada aynı güven aralıklarını garanti eder
+    """
+    return zlib.crc32(str(category_name).encode('utf-8'))
+
+
+# Global NumPy RNG süreç genelinde tek: seed/simülasyon/geri yükleme aynı anda tek thread'den
+_RANDOM_STATE_LOCK = threading.Lock()
+
+
+@contextmanager
+def _category_random_state(category_name):
+    """
+    Blok içinde global NumPy RNG'yi kategori seed'iyle çalıştır (Prophet aralık simülasyonu np.random kullanır)
+    Çıkışta çağıranın RNG durumu geri yüklenir; thread'ler (JobService, Streamlit oturumları) sırayla girer
+    """
+    with _RANDOM_STATE_LOCK:
+        state = np.random.get_state()
+        np.random.seed(_category_seed(category_name))
+        try:
+            yield
+        finally:
+            np.random.set_state(state)
+
+
+def resolve_n_jobs(n_jobs):
+    """
+    n_jobs değerini işçi sayısına çevir (-1 veya None: tüm çekirdekler)
+    """
+    if n_jobs is None or n_jobs < 1:
+        return os.cpu_count() or 1
+    return n_jobs
+
+
+# Gelecek kaç ay tahmin edilecek
+FORECAST_PERIODS = 12
+
+# Tahmin tablosunun ay kolonları
+FORECAST_MONTHS = np.arange(1, FORECAST_PERIODS + 1)
+
+# Varsayılan Prophet parametreleri
+DEFAULT_MODEL_PARAMS = {
+    'yearly_seasonality': True,
+    'weekly_seasonality': False,
+    'daily_seasonality': False,
+    'seasonality_mode': 'multiplicative',  # Çarpımsal sezonsellik (retail için uygun)
+    'changepoint_prior_scale': 0.05,  # Trend değişim hassasiyeti
+}
+
+# Satış kolonu -> yıl eşlemesi (Sayfa1 düzeni)
+SALES_COLUMNS = {'Sales_2024': 2024, 'Sales_2025': 2025}
+
+# Sayfa1 düzeninde tahmin edilen yıl: son satış yılının ertesi
+FORECAST_YEAR = max(SALES_COLUMNS.values()) + 1
+
+
+def _month_index(dates):
+    """
+    Tarihleri 1970-01'den itibaren ay sayısına çevir
+    """
+    return np.asarray(dates).astype('datetime64[M]').astype(np.int64)
+
+
+class ForecastWindow:
+    """
+    Tahmin penceresi: start ayından itibaren horizon ardışık ay
+    labels: Tablo ay kolonları; takvim yılı penceresinde ay numarası (1-12), diğerlerinde YYYYMM
+    periods: Verilirse her seri kendi son ayından bu kadar ay ileri tahmin edilir (Sayfa1 düzeni);
+             None ise her seri pencere sonuna kadar tahmin edilir
+    """
+
+    def __init__(self, start, horizon=FORECAST_PERIODS, periods=None):
+        self.start = int(_month_index(np.datetime64(start, 'M')))
+        self.horizon = int(horizon)
+        self.fixed_periods = periods
+        index = self.start + np.arange(self.horizon)
+        self.years = index // 12 + 1970
+        self.calendar_year = self.start % 12 == 0 and self.horizon == 12
+        month_of_year = index % 12 + 1
+        self.labels = month_of_year if self.calendar_year else self.years * 100 + month_of_year
+
+    @classmethod
+    def for_year(cls, year, periods=None):
+        return cls(f"{year}-01", 12, periods)
+
+    @classmethod
+    def after(cls, last, horizon=FORECAST_PERIODS):
+        """
+        Son gözlenen ayın ertesinden başlayan pencere
+        """
+        return cls((np.datetime64(last, 'M') + 1), horizon)
+
+    @classmethod
+    def from_key(cls, key):
+        return cls(key['start'], key['horizon'], key.get('periods'))
+
+    @property
+    def end(self):
+        return self.start + self.horizon - 1
+
+    @property
+    def label(self):
+        """
+        Kolon adlarında kullanılan etiket: takvim yılıysa yıl (ör. '2026'), değilse 'YYYYMM_YYYYMM'
+        """
+        if self.calendar_year:
+            return str(self.years[0])
+        return f"{self.labels[0]}_{self.labels[-1]}"
+
+    def key(self):
+        return {
+            'start': str(np.datetime64(self.start, 'M')),
+            'horizon': self.horizon,
+            'periods': self.fixed_periods,
+        }
+
+    def __eq__(self, other):
+        return isinstance(other, ForecastWindow) and self.key() == other.key()
+
+    def periods(self, last=None):
+        """
+        Son ayı last olan seri için gereken tahmin adımı
+        """
+        if self.fixed_periods is not None:
+            return self.fixed_periods
+        if last is None:
+            return self.horizon
+        return max(self.end - int(_month_index(np.datetime64(last, 'M'))), 1)
+
+    def positions(self, dates):
+        """
+        Tarihlerin penceredeki sütunu; pencere dışı -1
+        """
+        offset = _month_index(dates) - self.start
+        return np.where((offset >= 0) & (offset < self.horizon), offset, -1)
+
+
+# Sayfa1 düzeninin penceresi: ertesi takvim yılı, seriler son aydan FORECAST_PERIODS ay ileri
+LEGACY_WINDOW = ForecastWindow.for_year(FORECAST_YEAR, periods=FORECAST_PERIODS)
+
+
+def _melt_sales(df):
+    """
+    Yıl kolonlarını uzun formata çevir, tarihi aritmetik olarak oluştur
+    Uzun düzen veri (ds, y) olduğu gibi döner
+    Dönen kolonlar: MainGroupDesc, ds, y
+    """
+    if is_long_frame(df):
+        long_data = df[df['y'].notna()]
+        return pd.DataFrame({
+            'MainGroupDesc': long_data['MainGroupDesc'].to_numpy(),
+            'ds': long_data['ds'].to_numpy(),
+            'y': long_data['y'].to_numpy(dtype=float)
+        })
+    
+    long_data = df.melt(
+        id_vars=['Month', 'MainGroupDesc'],
+        value_vars=list(SALES_COLUMNS),
+        var_name='Year',
+        value_name='y'
+    )
+    long_data = long_data[long_data['y'].notna()]
+    
+    months = pd.to_numeric(long_data['Month'], errors='coerce')
+    long_data = long_data[months.notna()]
+    months = months[months.notna()].astype(int).to_numpy()
+    years = long_data['Year'].map(SALES_COLUMNS).to_numpy(dtype=int)
+    
+    # 1970-01'den itibaren ay sayısı -> datetime64[M]
+    month_index = (years - 1970) * 12 + months - 1
+    ds = month_index.astype('datetime64[M]').astype('datetime64[ns]')
+    
+    return pd.DataFrame({
+        'MainGroupDesc': long_data['MainGroupDesc'].to_numpy(),
+        'ds': ds,
+        'y': long_data['y'].to_numpy(dtype=float)
+    })
+
+
+def actual_values(df):
+    """
+    Satır bazlı gerçekleşmeler, boş hücreler hariç (Sayfa1 ve uzun düzen için ortak)
+    Dönüş: (satır no, yıl, ay, değer) dizileri
+    """
+    if is_long_frame(df):
+        index = _month_index(df['ds'].to_numpy())
+        rows = np.arange(len(df))
+        years, months = index // 12 + 1970, index % 12 + 1
+        values = df['y'].to_numpy(dtype=float)
+    else:
+        month = pd.to_numeric(df['Month'], errors='coerce').to_numpy(dtype=float)
+        rows = np.tile(np.arange(len(df)), len(SALES_COLUMNS))
+        years = np.repeat(list(SALES_COLUMNS.values()), len(df))
+        months = np.tile(month, len(SALES_COLUMNS))
+        values = np.concatenate([df[column].to_numpy(dtype=float) for column in SALES_COLUMNS])
+    
+    keep = ~np.isnan(values) & ~np.isnan(months)
+    return rows[keep], years[keep], months[keep].astype(np.int64), values[keep]
+
+
+def prepare_all_series(df):
+    """
+    Tüm kategorilerin ds/y serilerini tek vektörel geçişte hazırla
+    Kategori başına filtreleme yok: süre satır sayısıyla doğrusal artar
+    Dönüş: {kategori: DataFrame(ds, y)}
+    """
+    long_data = _melt_sales(df)
+    codes, categories = pd.factorize(long_data['MainGroupDesc'])
+    keep = codes >= 0
+    
+    # Kategori, sonra tarih sırası (kararlı); seriler tek dizinin ardışık dilimleri
+    ds = long_data['ds'].to_numpy()[keep]
+    y = long_data['y'].to_numpy()[keep]
+    codes = codes[keep]
+    order = np.lexsort((ds, codes))
+    codes, ds, y = codes[order], ds[order], y[order]
+    
+    bounds = np.flatnonzero(np.diff(codes)) + 1
+    starts = np.concatenate([[0], bounds])
+    ends = np.concatenate([bounds, [len(codes)]])
+    return {
+        categories[codes[start]]: pd.DataFrame({'ds': ds[start:end], 'y': y[start:end]})
+        for start, end in zip(starts, ends) if end > start
+    }
+
+
+def _same_series(a, b):
+    """
+    İki hazırlanmış serinin (ds, y) birebir aynı olup olmadığı
+    """
+    if a is None or b is None:
+        return a is None and b is None
+    return (
+        len(a) == len(b)
+        and np.array_equal(a['ds'].to_numpy(), b['ds'].to_numpy())
+        and np.array_equal(a['y'].to_numpy(), b['y'].to_numpy(), equal_nan=True)
+    )
+
+
+# Paralel eğitimde her işçi sürecinin kendi forecaster kopyası
+_WORKER_FORECASTER = None
+
+
+def _init_worker(params):
+    global _WORKER_FORECASTER
+    _WORKER_FORECASTER = MLBudgetForecaster(**params)
+
+
+def _fit_category_worker(task):
+    """
+    İşçi süreçte tek kategori eğit
+    Model JSON olarak döner (Prophet nesnesi doğrudan pickle edilmez)
+    """
+    category, prophet_data, init, window = task
+    _WORKER_FORECASTER.window = window
+    timings = {}
+    try:
+        model, forecast_2026 = _WORKER_FORECASTER.fit_category(prophet_data, category, init=init, timings=timings)
+        return category, _WORKER_FORECASTER.engine.to_json(model), frame_rows(forecast_2026, window.labels), timings, None
+    except Exception as e:
+        return category, None, None, timings, str(e)
+
+
 class MLBudgetForecaster:
     """
     Machine Learning tabanlı bütçe tahmin motoru
     Prophet kullanarak kategori bazlı satış tahminleri yapar
     """
     
-    def __init__(self):
-        self.models = {}
-        self.forecasts = {}
+    def __init__(self, n_jobs=1, cache=None, model_params=None, engine='prophet',
+                 uncertainty_samples=1000, category_params=None, hooks=None, trace_path=None,
+                 hierarchy_levels=None, reconciliation='bottom_up', executor=None, horizon=None,
+                 model_retention='all', memory_budget_mb=None):
+        """
+        n_jobs: Paralel eğitimde kullanılacak süreç sayısı
+                (1: seri, -1: tüm çekirdekler)
+        cache: Opsiyonel ForecastCache; verisi değişmeyen kategoriler yeniden eğitilmez
+        model_params: Prophet parametreleri (varsayılan: DEFAULT_MODEL_PARAMS)
+        engine: Tahmin motoru ('prophet', hızlı 'seasonal_naive' veya tüm kategoriler tek modelde 'global')
+        uncertainty_samples: Güven aralığı simülasyon sayısı (0: sadece nokta tahmini)
+        category_params: Kategori bazlı parametreler {kategori: {...}} (ör. load_tuned_params);
+                         toplu motorlarda aynı parametreli kategoriler birlikte, pooled motorlarda kullanılmaz
+        hooks: Ölçüm olaylarını alan StatsHook nesneleri (metrik dışa aktarıcılar)
+        trace_path: Verilirse her çalıştırmanın olayları bu dosyaya JSON satırları olarak eklenir
+        hierarchy_levels: MainGroupDesc altındaki seviye kolonları, üstten alta (ör. ['SubGroupDesc']);
+                          verilirse en alt seviye serileri eğitilir ve yukarı uzlaştırılır
+        reconciliation: 'bottom_up' (sadece yapraklar) veya 'mint' (tüm düğümler eğitilir, MinT/WLS)
+        executor: Paylaşılan süreç havuzu (bkz. create_executor); verilirse her çalıştırmada
+                  yeni havuz açılmaz, havuzun kapatılması çağırana aittir
+        horizon: Son gözlenen aydan sonra tahmin edilecek ay sayısı; None ve Sayfa1 düzeninde
+                 ertesi takvim yılı (2026), uzun düzende 12 ay
+        model_retention: Eğitilmiş modellerin saklanması (bkz. ModelStore)
+                         'all': nesneler, 'compact': sıkıştırılmış JSON,
+                         'none': saklanmaz, gerektiğinde cache'ten yüklenir veya yeniden eğitilir
+        memory_budget_mb: Verilirse her çalıştırmadan sonra süreç belleği (RSS) bu sınırı aşıyorsa
+                          model saklama bir kademe düşürülür (all -> compact -> none)
+        """
+        if reconciliation not in RECONCILIATION_METHODS:
+            raise ValueError(f"Bilinmeyen uzlaştırma yöntemi: {reconciliation}")
+        if model_retention not in MODEL_RETENTION:
+            raise ValueError(f"Bilinmeyen model saklama politikası: {model_retention}")
+        
+        self.horizon = horizon
+        self.window = LEGACY_WINDOW
+        self.engine = get_engine(engine)
+        # Ortak parametreli motorda tek kategori yeniden eğitilemez: modeller en az sıkıştırılmış saklanır
+        if model_retention == 'none' and self.engine.pooled:
+            raise ValueError(f"{self.engine.name} motorunda model_retention='none' kullanılamaz")
+        self.models = ModelStore(self.engine, model_retention, loader=self._load_model)
+        self.memory_budget_mb = memory_budget_mb
+        self.forecasts = ForecastStore.empty(self.window.labels)
+        self.data = None
+        self.series = {}
+        self.n_jobs = n_jobs
+        self.cache = cache
+        self.model_params = dict(DEFAULT_MODEL_PARAMS, **(model_params or {}))
+        self.uncertainty_samples = uncertainty_samples
+        self.category_params = category_params or {}
+        self.hooks = list(hooks or [])
+        self.trace_path = trace_path
+        self.last_stats = None
+        self.hierarchy_levels = list(hierarchy_levels or [])
+        self.reconciliation = reconciliation
+        self.hierarchy = None
+        self.reconciled = None
+        self.executor = executor
+        self.routes = None
+    
+    @property
+    def levels(self):
+        """
+        Tahmin seviyeleri (üstten alta)
+        """
+        return ['MainGroupDesc'] + self.hierarchy_levels
+    
+    def _worker_params(self):
+        """
+        İşçi süreçlerdeki forecaster kopyaları için ayarlar
+        """
+        return {
+            'n_jobs': 1,
+            'model_params': self.model_params,
+            'engine': self.engine,
+            'uncertainty_samples': self.uncertainty_samples,
+            'category_params': self.category_params,
+        }
+    
+    def create_executor(self, n_jobs=None, mp_context=None):
+        """
+        Bu forecaster'ın ayarlarıyla başlatılmış süreç havuzu
+        Aynı ayarlı birden çok forecaster (ör. toplu çalıştırmada her dosya) tek havuzu paylaşabilir
+        mp_context: multiprocessing başlatma bağlamı (varsayılan: platformun varsayılanı)
+        """
+        return ProcessPoolExecutor(
+            max_workers=resolve_n_jobs(self.n_jobs if n_jobs is None else n_jobs),
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(self._worker_params(),)
+        )
+    
+    def _new_stats(self, kind, workers):
+        """
+        Yeni çalıştırma için ölçüm nesnesi (trace dosyası ve hook'lar bağlı)
+        """
+        hooks = list(self.hooks)
+        if self.trace_path:
+            hooks.append(JsonlTraceHook(self.trace_path))
+        return RunStats(kind, self.engine.name, workers, hooks=hooks)
+    
+    def _finish_stats(self, stats):
+        stats.finish()
+        self.last_stats = stats
+        print(f"\n{stats.summary_line()}")
+        self._enforce_memory_budget()
+    
+    def _enforce_memory_budget(self):
+        """
+        RSS bütçeyi aşıyorsa model saklamayı bir kademe düşür (ortak parametreli motorda en fazla compact)
+        """
+        if self.memory_budget_mb is None:
+            return
+        rss = current_rss_mb()
+        if rss is None or rss <= self.memory_budget_mb:
+            return
+        
+        floor = MODEL_RETENTION.index('compact' if self.engine.pooled else 'none')
+        position = MODEL_RETENTION.index(self.models.policy)
+        if position >= floor:
+            print(f"⚠️  Bellek {rss:,.0f} MB > bütçe {self.memory_budget_mb:,.0f} MB (model saklama zaten '{self.models.policy}')")
+            return
+        
+        policy = MODEL_RETENTION[position + 1]
+        self.models.set_policy(policy)
+        gc.collect()
+        print(f"⚠️  Bellek {rss:,.0f} MB > bütçe {self.memory_budget_mb:,.0f} MB: model saklama '{policy}' yapıldı "
+              f"(şimdi {current_rss_mb() or 0:,.0f} MB)")
+    
+    def _load_model(self, category, refit=True):
+        """
+        Saklanmayan (model_retention='none') modeli geri getir: önce cache, yoksa refit=True ise yeniden eğit
+        Sonuç saklanmaz; eğitilmiş seri yoksa None
+        """
+        series = self.series.get(category)
+        if series is None:
+            return None
+        if self.cache is not None and not self.engine.pooled:
+            hit = self.cache.get(self.cache.make_key(category, series, self.cache_params(category)))
+            if hit is not None:
+                return self.engine.from_json(hit[0])
+        if not refit:
+            return None
+        return self.engine.fit(series, self.params_for(category))
+    
+    def memory_report(self):
+        """
+        Forecaster'ın tuttuğu verilerin ve sürecin bellek kullanımı (MB)
+        Çok sayıda seri/modelde ilk 100 öğe ölçülüp toplama oranlanır (not kolonunda belirtilir)
+        """
+        mb = 1024 ** 2
+        rows = []
+        
+        data_mb = self.data.memory_usage(deep=True).sum() / mb if self.data is not None else 0.0
+        rows.append(('Veri', 0 if self.data is None else len(self.data), data_mb, 'satır'))
+        
+        series = list(self.series.values())
+        sample = series[:100]
+        series_mb = sum(s.memory_usage(deep=True).sum() for s in sample) / mb
+        if sample:
+            series_mb *= len(series) / len(sample)
+        rows.append(('Seriler', len(series), series_mb, 'tahmini' if len(series) > len(sample) else ''))
+        
+        rows.append(('Tahminler', len(self.forecasts), deep_sizeof(self.forecasts) / mb, ''))
+        if self.reconciled is not None:
+            rows.append(('Uzlaştırılmış', len(self.reconciled), deep_sizeof(self.reconciled) / mb, ''))
+        
+        model_bytes, exact = self.models.nbytes()
+        rows.append((
+            'Modeller', len(self.models), model_bytes / mb,
+            f"saklama: {self.models.policy}" + ('' if exact else ', tahmini')
+        ))
+        
+        rows.append(('Süreç (RSS)', None, current_rss_mb(), ''))
+        rows.append(('Süreç (ömür boyu tepe RSS)', None, peak_rss_mb(), 'önceki çalıştırmalar dahil'))
+        report = pd.DataFrame(rows, columns=['component', 'items', 'mb', 'note'])
+        report['items'] = report['items'].astype('Int64')
+        return report
+    
+    def params_for(self, category):
+        """
+        Kategori için model parametreleri (ayarlanmış parametreler varsayılanları ezer)
+        """
+        overrides = self.category_params.get(category)
+        if not overrides:
+            return self.model_params
+        return dict(self.model_params, **overrides)
+    
+    def cache_params(self, category=None):
+        """
+        Cache anahtarına giren ayarlar (motor + model parametreleri
+        + Sayfa1 düzeni dışındaki pencerelerde tahmin penceresi)
+        Simülasyon sayısı fit'e girmez: anahtarda yok, farklı sayıda sadece tahmin yenilenir
+        """
+        params = dict(self.params_for(category), engine=self.engine.name)
+        if self.window != LEGACY_WINDOW:
+            params['window'] = self.window.key()
+        if self.engine.routed:
+            params['routing'] = self.engine.thresholds
+        return params
+    
+    def window_for(self, df):
+        """
+        Veriye göre tahmin penceresi: Sayfa1 düzeninde (horizon verilmediyse) ertesi takvim yılı,
+        aksi halde portföyün son gözlenen ayından sonraki horizon ay
+        """
+        if self.horizon is None and not is_long_frame(df):
+            return LEGACY_WINDOW
+        rows, years, months, _ = actual_values(df)
+        if not len(rows):
+            raise ValueError("Tahmin penceresi için gözlem yok")
+        last = (years.max() - 1970) * 12 + months[years == years.max()].max() - 1
+        return ForecastWindow.after(np.datetime64(int(last), 'M'), self.horizon or FORECAST_PERIODS)
         
     def prepare_data_for_prophet(self, df, category=None):
         """
@@ -20,180 +508,689 @@ class MLBudgetForecaster:
         Prophet formatı: ds (tarih), y (değer)
         """
         if category:
-            df = df[df['MainGroupDesc'] == category].copy()
-        
-        # Uzun format'a çevir
-        data_2024 = df[df['Sales_2024'].notna()][['Month', 'Sales_2024']].copy()
-        data_2024['Year'] = 2024
-        data_2024.rename(columns={'Sales_2024': 'Sales'}, inplace=True)
+            df = df[df['MainGroupDesc'] == category]
         
-        data_2025 = df[df['Sales_2025'].notna()][['Month', 'Sales_2025']].copy()
-        data_2025['Year'] = 2025
-        data_2025.rename(columns={'Sales_2025': 'Sales'}, inplace=True)
-        
-        # Birleştir
-        combined = pd.concat([data_2024, data_2025], ignore_index=True)
-        
-        # Tarih oluştur
-        combined['Month'] = combined['Month'].astype(int)
-        combined['ds'] = pd.to_datetime(
-            combined['Year'].astype(str) + '-' + 
-            combined['Month'].astype(str).str.zfill(2) + '-01'
-        )
-        combined['y'] = combined['Sales']
+        long_data = _melt_sales(df)
         
         # Sadece ds ve y kolonlarını al
-        prophet_data = combined[['ds', 'y']].sort_values('ds')
+        prophet_data = long_data[['ds', 'y']].sort_values('ds', kind='stable')
         
         return prophet_data
     
-    def train_model(self, category_data, category_name):
+    def prepare_all_categories(self, df):
         """
-        Belirli bir kategori için Prophet modeli eğit
+        Tüm kategoriler için Prophet verisini tek geçişte hazırla
+        """
+        return prepare_all_series(df)
+    
+    def train_model(self, category_data, category_name, init=None):
+        """
+        Belirli bir kategori için seçili motorla model eğit
+        init: Önceki modelden başlangıç parametreleri (warm start)
         """
-        # Model parametreleri
-        model = Prophet(
-            yearly_seasonality=True,
-            weekly_seasonality=False,
-            daily_seasonality=False,
-            seasonality_mode='multiplicative',  # Çarpımsal sezonsellik (retail için uygun)
-            changepoint_prior_scale=0.05,  # Trend değişim hassasiyeti
-        )
-        
         # Modeli eğit
-        model.fit(category_data)
+        model = self.engine.fit(category_data, self.params_for(category_name), init=init)
         
         # Modeli kaydet
         self.models[category_name] = model
         
         return model
     
-    def forecast_2026(self, model, periods=12):
+    def forecast_2026(self, model, periods=None, uncertainty_samples=None):
         """
-        2026 için tahmin yap
+        Tahmin penceresi (varsayılan 2026) için tahmin yap
+        periods verilmezse pencerenin adım sayısı, uncertainty_samples verilmezse forecaster'ın ayarı
         """
-        # Gelecek 12 ay için tarih oluştur
-        future = model.make_future_dataframe(periods=periods, freq='MS')
+        if periods is None:
+            periods = self.window.periods()
+        if uncertainty_samples is None:
+            uncertainty_samples = self.uncertainty_samples
         
-        # Tahmin yap
-        forecast = model.predict(future)
+        # Gelecek ay başları için tahmin
+        forecast = self.engine.predict(model, periods, uncertainty_samples)
         
         return forecast
     
     def get_2026_forecast(self, forecast):
         """
-        Sadece 2026 tahminlerini al
+        Sadece tahmin penceresindeki (varsayılan 2026) ayları al; Month pencere etiketi
         """
-        forecast_2026 = forecast[forecast['ds'].dt.year == 2026].copy()
-        forecast_2026['Month'] = forecast_2026['ds'].dt.month
+        positions = self.window.positions(forecast['ds'].to_numpy())
+        forecast_2026 = forecast[positions >= 0].copy()
+        
+        # Simülasyon kapalıysa aralık yok: sınırlar nokta tahminine eşit
+        for bound in ['yhat_lower', 'yhat_upper']:
+            if bound not in forecast_2026:
+                forecast_2026[bound] = forecast_2026['yhat']
+        
+        forecast_2026['Month'] = self.window.labels[positions[positions >= 0]]
         forecast_2026 = forecast_2026[['Month', 'yhat', 'yhat_lower', 'yhat_upper']]
         forecast_2026.columns = ['Month', 'Forecast', 'Lower_Bound', 'Upper_Bound']
         
-        return forecast_2026
+        return forecast_2026.reset_index(drop=True)
+    
+    def get_2026_rows(self, forecasts):
+        """
+        get_2026_forecast'in toplu, vektörel hali
+        forecasts: Motor çıktıları listesi (ds, yhat[, yhat_lower, yhat_upper])
+        Dönüş: (n, 3, ay) dizisi: tahmin, alt sınır, üst sınır
+        """
+        lengths = np.array([len(f) for f in forecasts])
+        codes = np.repeat(np.arange(len(forecasts)), lengths)
+        positions = self.window.positions(np.concatenate([f['ds'].to_numpy() for f in forecasts]))
+        values = []
+        for column in ['yhat', 'yhat_lower', 'yhat_upper']:
+            # Simülasyon kapalıysa aralık yok: sınırlar nokta tahminine eşit
+            values.append(np.concatenate([
+                f[column if column in f else 'yhat'].to_numpy(dtype=float) for f in forecasts
+            ]))
+        
+        keep = positions >= 0
+        rows = np.full((len(forecasts), len(VALUE_COLUMNS), self.window.horizon), np.nan)
+        for k, column in enumerate(values):
+            rows[codes[keep], k, positions[keep]] = column[keep]
+        return rows
+    
+    def fit_category(self, category_data, category_name, init=None, timings=None):
+        """
+        Tek kategori için model eğit ve 2026 tahminini üret
+        Model self.models'a yazılmaz: _run_tasks tek serileştirmeyle hem cache'e hem ModelStore'a yazar
+        timings: Verilirse fit/predict/postprocess süreleri (saniye) bu sözlüğe yazılır
+        """
+        timings = {} if timings is None else timings
+        
+        start = time.perf_counter()
+        model = self.engine.fit(category_data, self.params_for(category_name), init=init)
+        fitted = time.perf_counter()
+        timings['fit'] = fitted - start
+        
+        # Güven aralığı simülasyonu kategoriye özel seed ile
+        with _category_random_state(category_name):
+            forecast = self.forecast_2026(model, periods=self.window.periods(category_data['ds'].iloc[-1]))
+        predicted = time.perf_counter()
+        timings['predict'] = predicted - fitted
+        
+        forecast_2026 = self.get_2026_forecast(forecast)
+        timings['postprocess'] = time.perf_counter() - predicted
+        
+        return model, forecast_2026
+    
+    def predict_category(self, model, category, category_data=None, uncertainty_samples=None):
+        """
+        Eğitilmiş modelden kategorinin 2026 tahmini (yeniden eğitim yok)
+        category_data: Eğitim serisi; verilirse tahmin serinin son ayından başlar
+        """
+        last = category_data['ds'].iloc[-1] if category_data is not None and len(category_data) else None
+        
+        # Güven aralığı simülasyonu kategoriye özel seed ile
+        with _category_random_state(category):
+            forecast = self.forecast_2026(model, self.window.periods(last), uncertainty_samples=uncertainty_samples)
+        
+        return self.get_2026_forecast(forecast)
+    
+    def forecast_intervals(self, category, uncertainty_samples=1000):
+        """
+        Eğitilmiş modelden tek kategori için güven aralıklı 2026 tahmini
+        Simülasyon sayısı sadece bu tahmini etkiler: model ve saklanan tahminler değişmez
+        """
+        model = self.models.get(category)
+        if model is None:
+            raise KeyError(f"{category}: Eğitilmiş model yok")
+        
+        return self.predict_category(model, category, self.series.get(category), uncertainty_samples)
     
-    def train_all_categories(self, df):
+    def train_all_categories(self, df, n_jobs=None, progress=None):
         """
         Tüm kategoriler için model eğit ve tahmin yap
+        n_jobs verilmezse forecaster'ın ayarı kullanılır
+        progress: Her kategoriden sonra progress(biten, toplam) çağrılır
         """
-        categories = df['MainGroupDesc'].unique()
-        all_forecasts = {}
+        workers = resolve_n_jobs(self.n_jobs if n_jobs is None else n_jobs)
+        # Hata alınsa da trace dosyası ve hook'lar kapatılır
+        with self._new_stats('train', workers) as stats:
+            # Veriyi tek geçişte hazırla
+            with stats.stage('prepare'):
+                self.window = self.window_for(df)
+                self.routes = None
+                if self.hierarchy_levels:
+                    hierarchy, categories, all_series = self._prepare_hierarchy(df)
+                else:
+                    categories = df['MainGroupDesc'].unique()
+                    all_series = self.prepare_all_categories(df)
+            
+            print(f"🤖 {len(categories)} kategori için ML modeli eğitiliyor...\n")
+            
+            tasks = []
+            for i, category in enumerate(categories, 1):
+                prophet_data = all_series.get(category)
+            
+                if prophet_data is None or len(prophet_data) < 2:
+                    print(f"⚠️  {category}: Yetersiz veri, atlanıyor")
+                    stats.record_category(category, 'skipped', error='Yetersiz veri')
+                    continue
+            
+                tasks.append((i, category, prophet_data))
+            
+            all_forecasts = self._run_tasks(tasks, workers, progress=progress, stats=stats)
+            
+            if self.hierarchy_levels:
+                with stats.stage('reconcile'):
+                    all_forecasts = self._reconcile(hierarchy, all_forecasts)
+            
+            # Artımlı güncelleme için veriyi sakla
+            self.data = df
+            self.series = all_series
+            
+            self.forecasts = all_forecasts
+            self._finish_stats(stats)
+        return all_forecasts
+    
+    def update_with_actuals(self, new_rows, n_jobs=None):
+        """
+        Yeni ay gerçekleşmelerini ekle ve sadece serisi değişen kategorileri yeniden eğit
+        new_rows: Aynı formatta (Month, MainGroupDesc, Sales_2024, Sales_2025) yeni satırlar;
+                  sadece yeni değerler dolu, diğer satış kolonları boş olmalı
+                  Uzun düzende (MainGroupDesc, ds, y): aynı seri + ayın eski değeri yenisiyle değişir
+        Prophet modelleri önceki fit parametrelerinden (Stan init) başlar
+        Dönüş: Güncellenen kategorilerin tahminleri (ForecastStore)
+        """
+        if self.data is None:
+            raise ValueError("Önce train_all_categories çalıştırılmalı")
         
-        print(f"🤖 {len(categories)} kategori için ML modeli eğitiliyor...\n")
+        data = self._append_actuals(new_rows)
         
-        for i, category in enumerate(categories, 1):
-            try:
-                # Veriyi hazırla
-                prophet_data = self.prepare_data_for_prophet(df, category)
-                
-                if len(prophet_data) < 2:
+        # Uzlaştırma tüm ağacı etkiler: ağaç yeniden kurulur,
+        # cache varsa sadece serisi değişen yapraklar yeniden eğitilir
+        # Global motorda ortak sezon tüm kategorilerden tek seferde yeniden tahmin edilir
+        # Yeni ay pencereyi ilerletirse tüm kategoriler yeni pencereye göre tahmin edilir
+        if self.hierarchy_levels or self.engine.pooled or self.window_for(data) != self.window:
+            return self.train_all_categories(data, n_jobs=n_jobs)
+        
+        workers = resolve_n_jobs(self.n_jobs if n_jobs is None else n_jobs)
+        with self._new_stats('update', workers) as stats:
+            # Sadece yeni satırı olan kategoriler yeniden hazırlanır
+            with stats.stage('prepare'):
+                affected = pd.unique(new_rows['MainGroupDesc'])
+                new_series = self.prepare_all_categories(data[data['MainGroupDesc'].isin(affected)])
+                changed = [c for c in affected if not _same_series(self.series.get(c), new_series.get(c))]
+            
+            print(f"🔄 {len(changed)} kategori güncelleniyor ({len(affected) - len(changed)} değişmedi)...\n")
+            
+            tasks = []
+            inits = {}
+            for i, category in enumerate(changed, 1):
+                prophet_data = new_series.get(category)
+            
+                if prophet_data is None or len(prophet_data) < 2:
                     print(f"⚠️  {category}: Yetersiz veri, atlanıyor")
+                    stats.record_category(category, 'skipped', error='Yetersiz veri')
                     continue
+            
+                # Saklanmayan model sadece cache'ten yüklenebiliyorsa kullanılır (warm start için yeniden eğitilmez)
+                previous = self.models.get(category, refit=False)
+                if previous is not None:
+                    inits[category] = self.engine.warm_start(previous)
+                tasks.append((i, category, prophet_data))
+            
+            updated = self._run_tasks(tasks, workers, inits, stats=stats)
+            
+            self.data = data
+            self.series.update(new_series)
+            self.forecasts.update(updated)
+            self._finish_stats(stats)
+        return updated
+    
+    def _append_actuals(self, new_rows):
+        """
+        Yeni satırları veriye ekle; uzun düzende aynı seri + ayın eski satırı düşürülür
+        """
+        data = self.data
+        if is_long_frame(data):
+            def keys(frame):
+                return pd.MultiIndex.from_arrays([frame['MainGroupDesc'].astype(str), frame['ds']])
+            data = data[~keys(data).isin(keys(new_rows))]
+        return pd.concat([data, new_rows], ignore_index=True)
+    
+    def _prepare_hierarchy(self, df):
+        """
+        Hiyerarşi ağacı ve eğitilecek düğüm serileri
+        bottom_up: sadece yapraklar; mint: toplanmış üst düğüm serileri de
+        Dönüş: (ağaç, eğitilecek düğümler, {düğüm: seri})
+        """
+        hierarchy = Hierarchy.from_frame(df, self.levels)
+        leaf_series = self.prepare_all_categories(df.assign(MainGroupDesc=hierarchy.row_labels(df)))
+        
+        if self.reconciliation == 'mint':
+            all_series = dict(hierarchy.aggregate_series(leaf_series), **leaf_series)
+            nodes = hierarchy.nodes['Node'].tolist()
+        else:
+            all_series = leaf_series
+            nodes = list(hierarchy.leaf_nodes)
+        
+        return hierarchy, nodes, all_series
+    
+    def _reconcile(self, hierarchy, base_forecasts):
+        """
+        Düğüm tahminlerini uzlaştır; self.reconciled tüm düğümleri (ağaç sırasıyla) tutar
+        Dönüş: MainGroupDesc seviyesindeki uzlaştırılmış tahminler (ForecastStore)
+        """
+        nodes = hierarchy.nodes['Node'].tolist()
+        base = base_forecasts.reindex(nodes)
+        mean, lower, upper = hierarchy.reconcile(base.forecast, base.lower, base.upper, self.reconciliation)
+        
+        self.hierarchy = hierarchy
+        self.reconciled = ForecastStore(nodes, self.window.labels, mean, lower, upper)
+        return self.reconciled.reindex(hierarchy.nodes_at('MainGroupDesc'))
+    
+    def _level_store(self, level):
+        """
+        Uzlaştırılmış tahminlerin bir seviyesi
+        """
+        if self.reconciled is None:
+            raise ValueError("Seviye bazlı özet için hierarchy_levels ile eğitim gerekli")
+        return self.reconciled.reindex(self.hierarchy.nodes_at(level))
+    
+    def _run_tasks(self, tasks, workers, inits=None, progress=None, stats=None):
+        """
+        (sıra, kategori, seri) görevlerini eğit: önce cache, sonra seçili yürütme yolu
+        Modeller self.models'a saklama politikasına göre yazılır, tahminler kategori sırasıyla döner
+        stats: Kategori süreleri ve aşama toplamları bu RunStats'a yazılır
+        """
+        inits = inits or {}
+        stats = stats or RunStats('tasks', self.engine.name, workers)
+        categories, rows = [], []
+        
+        # Yönlendirmeli motorda her seri önce profillenir (cache'ten gelenler dahil)
+        routes = None
+        if self.engine.routed and tasks:
+            with stats.stage('route'):
+                routes = self.engine.route({category: prophet_data for _, category, prophet_data in tasks})
+                self._store_routes(routes)
+        
+        # Cache'te olanları ayır, sadece değişen kategorileri eğit
+        cached = {}
+        cache_keys = {}
+        # Ortak parametreli motorlarda kategori sonucu diğer kategorilere de bağlı: cache yok
+        cache = self.cache if not self.engine.pooled else None
+        if cache is not None:
+            with stats.stage('cache_lookup'):
+                for _, category, prophet_data in tasks:
+                    key = cache.make_key(category, prophet_data, self.cache_params(category))
+                    cache_keys[category] = key
+                    hit = cache.get(key)
+                    if hit is not None:
+                        cached[category] = hit
+        
+        to_fit = [task for task in tasks if task[1] not in cached]
+        if routes is not None:
+            results = self._fit_routed(to_fit, routes, workers, inits, stats)
+            fit_source = 'fit'
+        elif self.engine.batched:
+            results = self._fit_batched(to_fit, stats)
+            fit_source = 'batched'
+        elif workers > 1 and len(to_fit) > 1:
+            results = self._fit_parallel(to_fit, workers, inits)
+            fit_source = 'fit'
+        else:
+            results = self._fit_serial(to_fit, inits)
+            fit_source = 'fit'
+        
+        # Sonuçlar her yolda kategori sırasıyla gelir
+        train_start = time.perf_counter()
+        for done, (i, category, prophet_data) in enumerate(tasks, 1):
+            if category in cached:
+                start = time.perf_counter()
+                model_json, forecast_2026 = cached[category]
+                # Nesne sadece 'all' politikasında kurulur; diğerlerinde JSON yeterli
+                model = self.engine.from_json(model_json) if self.models.policy == 'all' else None
+                timings = {'load': time.perf_counter() - start}
                 
-                # Model eğit
-                model = self.train_model(prophet_data, category)
-                
-                # Tahmin yap
-                forecast = self.forecast_2026(model)
-                forecast_2026 = self.get_2026_forecast(forecast)
-                
-                # Kaydet
-                all_forecasts[category] = forecast_2026
-                
-                total_forecast = forecast_2026['Forecast'].sum()
-                print(f"✅ {i:2d}. {category:20s} - 2026 Tahmini: {total_forecast:>12,.0f}")
+                # Tahmin başka simülasyon sayısıyla yazılmışsa model yeniden eğitilmez, sadece tahmin yenilenir
+                if self.engine.simulated and forecast_2026.attrs.get('uncertainty_samples') != self.uncertainty_samples:
+                    if model is None:
+                        model = self.engine.from_json(model_json)
+                    start = time.perf_counter()
+                    forecast_2026 = self.predict_category(model, category, prophet_data)
+                    timings['predict'] = time.perf_counter() - start
+                    self._cache_put(cache, cache_keys[category], model_json, forecast_2026, timings)
+                    if self.models.policy != 'all':
+                        model = None
                 
+                forecast_rows = frame_rows(forecast_2026, self.window.labels)
+                error = None
+                source = '♻️'
+                record_source = 'cache'
+            else:
+                _, _, model, model_json, forecast_rows, timings, error = next(results)
+                # JSON bir kez üretilir; cache ve sıkıştırılmış ModelStore aynı metni kullanır
+                if error is None and model_json is None and (cache is not None or self.models.policy == 'compact'):
+                    model_json = self.engine.to_json(model)
+                if error is None and cache is not None:
+                    self._cache_put(
+                        cache, cache_keys[category], model_json,
+                        ForecastStore([category], self.window.labels, *forecast_rows).frame(category), timings
+                    )
+                source = '✅'
+                record_source = fit_source
+                if routes is not None and routes.at[category, 'model'] != 'prophet':
+                    record_source = 'batched'
+            
+            route = reason = None
+            if routes is not None:
+                route, reason = routes.at[category, 'model'], routes.at[category, 'reason']
+            stats.record_category(category, record_source, timings, error, route=route, reason=reason)
+            
+            if progress is not None:
+                progress(done, len(tasks))
+            
+            if error is not None:
+                print(f"❌ {category}: Hata - {error}")
+                continue
+            
+            # Kaydet
+            self.models.put(category, model, model_json)
+            categories.append(category)
+            rows.append(forecast_rows)
+            
+            total_forecast = np.nansum(forecast_rows[0])
+            print(f"{source} {i:2d}. {category:20s} - {self.window.label} Tahmini: {total_forecast:>12,.0f}")
+        
+        if tasks:
+            stats.add_stage('train', time.perf_counter() - train_start)
+        
+        return ForecastStore.from_rows(categories, rows, self.window.labels)
+    
+    def _cache_put(self, cache, key, model_json, forecast_2026, timings):
+        """
+        Modeli ve tahmini cache'e yaz; tahmin hangi simülasyon sayısıyla üretildiğini attrs'ta taşır
+        """
+        start = time.perf_counter()
+        forecast_2026.attrs['uncertainty_samples'] = self.uncertainty_samples
+        cache.put(key, model_json, forecast_2026)
+        timings['cache_write'] = time.perf_counter() - start
+    
+    def _store_routes(self, routes):
+        """
+        Rota tablosunu güncelle; güncellemede sadece yeniden profillenen seriler değişir
+        """
+        if self.routes is None:
+            self.routes = routes
+        else:
+            self.routes = pd.concat([self.routes.drop(routes.index, errors='ignore'), routes])
+    
+    def _fit_routed(self, tasks, routes, workers, inits, stats=None):
+        """
+        Yönlendirmeli motor: ucuz rotalar (sıfır, ortalama, seasonal-naive) tek vektörel çağrıda,
+        Prophet rotası süreç havuzunda veya sırayla; sonuçlar görev sırasıyla döner
+        """
+        heavy = routes.loc[[category for _, category, _ in tasks], 'model'] == 'prophet'
+        prophet_tasks = [task for task, is_heavy in zip(tasks, heavy) if is_heavy]
+        batched = {
+            result[1]: result
+            for result in self._fit_batched([task for task, is_heavy in zip(tasks, heavy) if not is_heavy], stats)
+        }
+        
+        if workers > 1 and len(prophet_tasks) > 1:
+            fitted = self._fit_parallel(prophet_tasks, workers, inits)
+        else:
+            fitted = self._fit_serial(prophet_tasks, inits)
+        
+        for _, category, _ in tasks:
+            yield batched[category] if category in batched else next(fitted)
+    
+    def _fit_serial(self, tasks, inits):
+        """
+        Kategorileri tek süreçte sırayla eğit
+        """
+        for i, category, prophet_data in tasks:
+            timings = {}
+            try:
+                model, forecast_2026 = self.fit_category(
+                    prophet_data, category, init=inits.get(category), timings=timings
+                )
+                yield i, category, model, None, frame_rows(forecast_2026, self.window.labels), timings, None
             except Exception as e:
-                print(f"❌ {category}: Hata - {str(e)}")
+                yield i, category, None, None, None, timings, str(e)
+    
+    def _fit_batched(self, tasks, stats=None):
+        """
+        Vektörel motorlarda kategorileri parametre grubu başına tek çağrıda eğit
+        Toplu fit+predict süresi 'fit_batch', 2026 tablosunun çıkarılması 'postprocess' aşamasına yazılır
+        """
+        if not tasks:
+            return
         
-        self.forecasts = all_forecasts
-        return all_forecasts
+        periods = self.window.periods(min(prophet_data['ds'].to_numpy()[-1] for _, _, prophet_data in tasks))
+        start = time.perf_counter()
+        results = {}
+        errors = {}
+        for params, group in self._param_groups(tasks):
+            try:
+                results.update(self.engine.fit_predict_all(
+                    {category: prophet_data for _, category, prophet_data in group}, params, periods
+                ))
+            except Exception as e:
+                errors.update({category: str(e) for _, category, _ in group})
+        
+        if stats is not None:
+            stats.add_stage('fit_batch', time.perf_counter() - start)
+        
+        start = time.perf_counter()
+        fitted = [category for _, category, _ in tasks if category not in errors]
+        all_rows = self.get_2026_rows([results[category][1] for category in fitted]) if fitted else []
+        rows = dict(zip(fitted, all_rows))
+        if stats is not None:
+            stats.add_stage('postprocess', time.perf_counter() - start)
+        
+        for i, category, _ in tasks:
+            if category in errors:
+                yield i, category, None, None, None, {}, errors[category]
+            else:
+                yield i, category, results[category][0], None, rows[category], {}, None
     
-    def get_summary(self):
+    def _param_groups(self, tasks):
         """
-        Tüm kategoriler için özet tahmin
+        Görevleri model parametrelerine göre grupla: [(parametreler, görevler), ...]
+        Ortak parametreli (pooled) motorlar tek modelde eğitilir: kategori parametreleri kullanılmaz
         """
-        summary = []
+        if self.engine.pooled:
+            if any(category in self.category_params for _, category, _ in tasks):
+                print(f"⚠️  {self.engine.name} motoru tüm kategorilerde ortak parametre kullanır: kategori parametreleri atlandı")
+            return [(self.model_params, tasks)]
         
-        for category, forecast in self.forecasts.items():
-            summary.append({
-                'Category': category,
-                'Total_Forecast': forecast['Forecast'].sum(),
-                'Lower_Bound': forecast['Lower_Bound'].sum(),
-                'Upper_Bound': forecast['Upper_Bound'].sum(),
-                'Avg_Monthly': forecast['Forecast'].mean()
-            })
+        groups = {}
+        for task in tasks:
+            params = self.params_for(task[1])
+            key = json.dumps(params, sort_keys=True, default=str)
+            groups.setdefault(key, (params, []))[1].append(task)
+        return list(groups.values())
+    
+    def _fit_parallel(self, tasks, workers, inits):
+        """
+        Kategorileri süreç havuzunda eğit (Stan fit CPU-bound)
+        executor.map gönderim sırasını korur
+        """
+        index = {category: i for i, category, _ in tasks}
+        jobs = [(category, prophet_data, inits.get(category), self.window) for _, category, prophet_data in tasks]
+        
+        if self.executor is not None:
+            results = self.executor.map(_fit_category_worker, jobs)
+            yield from self._load_results(results, index)
+            return
         
-        summary_df = pd.DataFrame(summary)
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(tasks)),
+            initializer=_init_worker,
+            initargs=(self._worker_params(),)
+        ) as executor:
+            yield from self._load_results(executor.map(_fit_category_worker, jobs), index)
+    
+    def _load_results(self, results, index):
+        """
+        İşçi sonuçlarındaki model JSON'larını yükle
+        """
+        for category, model_json, forecast_rows, timings, error in results:
+            start = time.perf_counter()
+            model = self.engine.from_json(model_json) if error is None and self.models.policy == 'all' else None
+            timings['load'] = time.perf_counter() - start
+            yield index[category], category, model, model_json, forecast_rows, timings, error
+    
+    def get_summary(self, level=None):
+        """
+        Tüm kategoriler için özet tahmin
+        level: Hiyerarşi seviyesi ('Total', 'MainGroupDesc' veya alt seviye); yeniden eğitim gerekmez
+        """
+        summary_df = self._forecasts_at(level).totals().rename_axis('Category').reset_index()
         summary_df = summary_df.sort_values('Total_Forecast', ascending=False)
         
         return summary_df
     
-    def compare_with_actuals(self, df):
+    def _actual_totals(self, df, level=None):
         """
-        2024 ve 2025 gerçek verilerle karşılaştırma
+        Kategori bazında son iki gerçekleşme yılı ve tahmin toplamları
+        Son yıl, kategorinin o yıl gözlenen ay sayısıyla yıllığa çevrilir (ör. 9 ay: x12/9);
+        tahmin de penceredeki tahminli ay sayısıyla yıllığa çevrilir
         """
-        comparison = []
+        forecasts = self._forecasts_at(level)
         
-        for category in self.forecasts.keys():
-            cat_data = df[df['MainGroupDesc'] == category]
-            
-            sales_2024 = cat_data['Sales_2024'].sum()
-            sales_2025 = cat_data['Sales_2025'].sum()
-            
-            # 2025 tam yıl tahmini (9 ay veriden)
-            if sales_2025 > 0:
-                sales_2025_estimated = sales_2025 * (12/9)
-            else:
-                sales_2025_estimated = 0
-            
-            forecast_2026 = self.forecasts[category]['Forecast'].sum()
-            
-            # Büyüme oranları
-            growth_24_25 = ((sales_2025_estimated - sales_2024) / sales_2024 * 100) if sales_2024 > 0 else 0
-            growth_25_26 = ((forecast_2026 - sales_2025_estimated) / sales_2025_estimated * 100) if sales_2025_estimated > 0 else 0
-            
-            comparison.append({
-                'Category': category,
-                'Sales_2024': sales_2024,
-                'Sales_2025_Est': sales_2025_estimated,
-                'Forecast_2026': forecast_2026,
-                'Growth_24_25_%': growth_24_25,
-                'Growth_25_26_%': growth_25_26
-            })
+        if self.reconciled is not None and level is not None:
+            labels = self.hierarchy.row_labels(df, level).to_numpy()
+        else:
+            labels = np.asarray(df['MainGroupDesc'].to_numpy(), dtype=object)
+        
+        # Gerçekleşmeler tek geçişte; tahmini olmayan gruplar dışarıda kalır
+        rows, years, months, values = actual_values(df)
+        codes = forecasts.index.get_indexer(pd.Index(labels[rows], dtype=object))
+        found = codes >= 0
+        codes, years, months, values = codes[found], years[found], months[found], values[found]
+        
+        n = len(forecasts)
+        last_year = int(years.max()) if len(years) else int(self.window.years[0]) - 1
+        in_last = years == last_year
+        sales_prev = np.bincount(codes, weights=np.where(years == last_year - 1, values, 0.0), minlength=n)
+        sales_last = np.bincount(codes, weights=np.where(in_last, values, 0.0), minlength=n)
         
-        comparison_df = pd.DataFrame(comparison)
-        comparison_df = comparison_df.sort_values('Forecast_2026', ascending=False)
+        # Son yılda gözlenen farklı ay sayısı (alt seviye satırları aynı ayı tekrarlar)
+        observed = np.unique(codes[in_last] * 12 + months[in_last] - 1)
+        months_last = np.bincount(observed // 12, minlength=n)
+        
+        forecast_total = forecasts.totals()['Total_Forecast'].to_numpy()
+        months_forecast = (~np.isnan(forecasts.forecast)).sum(axis=1)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sales_last_estimated = np.where(sales_last > 0, sales_last * 12 / months_last, 0.0)
+            forecast_annualized = np.where(months_forecast > 0, forecast_total * 12 / months_forecast, 0.0)
+        
+        return {
+            'categories': forecasts.categories,
+            'last_year': last_year,
+            'sales_prev': sales_prev,
+            'sales_last_estimated': sales_last_estimated,
+            'months_last': months_last,
+            'forecast': forecast_total,
+            'forecast_annualized': forecast_annualized,
+        }
+    
+    def compare_with_actuals(self, df, level=None):
+        """
+        Son iki gerçekleşme yılı ve tahmin penceresiyle karşılaştırma
+        Kolon adları veriden gelir; Sayfa1 düzeninde Sales_2024, Sales_2025_Est, Forecast_2026,
+        Forecast_2026_Annualized, Growth_24_25_%, Growth_25_26_%
+        Growth_25_26_% = Forecast_2026_Annualized / Sales_2025_Est - 1 (ikisi de 12 aya çevrilmiş)
+        level: Hiyerarşi seviyesi; gerçekleşmeler aynı seviyede toplanır
+        """
+        totals = self._actual_totals(df, level)
+        last_year = totals['last_year']
+        sales_prev = totals['sales_prev']
+        sales_last = totals['sales_last_estimated']
+        forecast_annualized = totals['forecast_annualized']
+        
+        # Büyüme oranları
+        with np.errstate(divide='ignore', invalid='ignore'):
+            growth_prev_last = np.where(sales_prev > 0, (sales_last - sales_prev) / sales_prev * 100, 0.0)
+            growth_last_forecast = np.where(
+                sales_last > 0,
+                (forecast_annualized - sales_last) / sales_last * 100,
+                0.0
+            )
+        
+        prev, last = f"{(last_year - 1) % 100:02d}", f"{last_year % 100:02d}"
+        window = self.window.label
+        window_short = window[-2:] if self.window.calendar_year else window
+        comparison_df = pd.DataFrame({
+            'Category': totals['categories'],
+            f'Sales_{last_year - 1}': sales_prev,
+            f'Sales_{last_year}_Est': sales_last,
+            f'Forecast_{window}': totals['forecast'],
+            f'Forecast_{window}_Annualized': forecast_annualized,
+            f'Growth_{prev}_{last}_%': growth_prev_last,
+            f'Growth_{last}_{window_short}_%': growth_last_forecast,
+        })
+        comparison_df = comparison_df.sort_values(f'Forecast_{window}', ascending=False)
         
         return comparison_df
+    
+    def portfolio_totals(self, df):
+        """
+        Portföy toplamları (uygulama metrikleri): önceki yıl, yıllığa çevrilmiş son yıl ve tahmin
+        growth, yıllığa çevrilmiş son yıl ile forecast_annualized arasındadır
+        """
+        totals = self._actual_totals(df)
+        sales_last = float(totals['sales_last_estimated'].sum())
+        forecast_annualized = float(totals['forecast_annualized'].sum())
+        return {
+            'last_year': totals['last_year'],
+            'window': self.window.label,
+            'sales_prev': float(totals['sales_prev'].sum()),
+            'sales_last_estimated': sales_last,
+            'forecast': float(totals['forecast'].sum()),
+            'forecast_annualized': forecast_annualized,
+            'growth': (forecast_annualized - sales_last) / sales_last * 100 if sales_last > 0 else 0.0,
+        }
+    
+    def _forecasts_at(self, level):
+        """
+        Seviyeye göre tahmin tablosu (level None: MainGroupDesc)
+        """
+        if level is None or (self.reconciled is None and level == 'MainGroupDesc'):
+            return self.forecasts
+        return self._level_store(level)
 
 
 # Test edelim
 if __name__ == "__main__":
+    import argparse
+    from ml_budget_data import load_workbook
+    from ml_budget_tuning import load_tuned_params
+    from ml_budget_export import export_forecasts
+    
+    parser = argparse.ArgumentParser(description="Tek veri dosyası için ML bütçe tahmini (çok dosya için: ml_budget_batch.py)")
+    parser.add_argument('input', help="Veri dosyası (.xlsx Sayfa1 düzeni, temiz .csv veya uzun düzen .csv/.parquet)")
+    parser.add_argument('--out-dir', default='.', help="Çıktı klasörü")
+    parser.add_argument('--engine', default='prophet', choices=['prophet', 'seasonal_naive', 'global', 'auto'])
+    parser.add_argument('--n-jobs', type=int, default=1)
+    parser.add_argument('--horizon', type=int, default=None, help="Tahmin ufku (ay); verilmezse Sayfa1 için 2026")
+    parser.add_argument('--model-retention', default='all', choices=list(MODEL_RETENTION),
+                        help="Eğitilmiş modellerin saklanması: nesne (all), sıkıştırılmış (compact), saklanmaz (none)")
+    parser.add_argument('--memory-budget-mb', type=float, default=None,
+                        help="Süreç belleği bu sınırı aşarsa model saklama bir kademe düşürülür")
+    args = parser.parse_args()
+    
     # Veriyi yükle
-    df = pd.read_csv('/home/claude/budget_cleaned_data.csv')
+    df = load_workbook(args.input)
+    os.makedirs(args.out_dir, exist_ok=True)
     
-    # ML Forecaster oluştur
-    forecaster = MLBudgetForecaster()
+    # ML Forecaster oluştur (değişmeyen kategoriler cache'ten gelir,
+    # ml_budget_tuning ile ayarlanmış parametreler varsa kullanılır)
+    forecaster = MLBudgetForecaster(
+        n_jobs=args.n_jobs,
+        engine=args.engine,
+        cache=ForecastCache(),
+        category_params=load_tuned_params(),
+        horizon=args.horizon,
+        model_retention=args.model_retention,
+        memory_budget_mb=args.memory_budget_mb
+    )
     
     print("="*80)
     print("🚀 ML TABANLI BÜTÇE TAHMİN SİSTEMİ")
@@ -204,7 +1201,7 @@ if __name__ == "__main__":
     all_forecasts = forecaster.train_all_categories(df)
     
     print("\n" + "="*80)
-    print("📊 ÖZET TAHMİNLER (2026)")
+    print(f"📊 ÖZET TAHMİNLER ({forecaster.window.label})")
     print("="*80)
     
     # Özet
@@ -223,12 +1220,15 @@ if __name__ == "__main__":
     print("💾 Sonuçlar kaydediliyor...")
     
     # Sonuçları kaydet
-    summary.to_csv('/home/claude/ml_forecast_summary.csv', index=False)
-    comparison.to_csv('/home/claude/ml_forecast_comparison.csv', index=False)
+    summary.to_csv(os.path.join(args.out_dir, 'ml_forecast_summary.csv'), index=False)
+    comparison.to_csv(os.path.join(args.out_dir, 'ml_forecast_comparison.csv'), index=False)
     
-    # Her kategori için detaylı tahmin
-    with pd.ExcelWriter('/home/claude/ml_forecast_detailed.xlsx') as writer:
-        for category, forecast in forecaster.forecasts.items():
-            forecast.to_excel(writer, sheet_name=category[:30], index=False)
+    # Her kategori için detaylı tahmin (write-only, satırlar diske akıtılır)
+    # + tek uzun tablo (pyarrow varsa Parquet, yoksa CSV)
+    export_forecasts(forecaster.forecasts, os.path.join(args.out_dir, 'ml_forecast_detailed.xlsx'))
+    try:
+        export_forecasts(forecaster.forecasts, os.path.join(args.out_dir, 'ml_forecast_detailed.parquet'))
+    except ImportError:
+        export_forecasts(forecaster.forecasts, os.path.join(args.out_dir, 'ml_forecast_detailed.csv'))
     
     print("✅ Tamamlandı!")
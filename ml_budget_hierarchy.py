@@ -0,0 +1,239 @@
+import warnings
+import numpy as np
+import pandas as pd
+from ml_budget_engines import Z_80
+
+# Ağacın kökü: tüm yaprakların toplamı
+TOTAL_LEVEL = 'Total'
+TOTAL_NODE = 'Toplam'
+
+# Düğüm adı: üst seviyeler dahil yol (ör. "Gıda / Süt Ürünleri")
+SEPARATOR = ' / '
+
+# Alt seviyesi boş satırlar bu etiketle toplanır
+MISSING_LABEL = '(Tanımsız)'
+
+RECONCILIATION_METHODS = ('bottom_up', 'mint')
+
+
+def _sparse():
+    """
+    scipy.sparse ve linalg (sadece hiyerarşi kullanıldığında yüklenir)
+    """
+    try:
+        import scipy.sparse as sparse
+        import scipy.sparse.linalg as linalg
+    except ImportError as e:
+        raise ImportError("Hiyerarşik tahmin için scipy gerekli: pip install scipy") from e
+    return sparse, linalg
+
+
+def _clean_levels(df, levels):
+    """
+    Seviye kolonlarını string'e çevir, boş değerleri MISSING_LABEL yap
+    """
+    return pd.DataFrame({
+        level: df[level].astype(object).where(df[level].notna(), MISSING_LABEL).astype(str).to_numpy()
+        for level in levels
+    })
+
+
+def _path_labels(leaves, levels):
+    """
+    Yaprak tablosu için verilen seviyelere kadar olan yol adları
+    """
+    labels = leaves[levels[0]].to_numpy(dtype=object)
+    for level in levels[1:]:
+        labels = labels + SEPARATOR + leaves[level].to_numpy(dtype=object)
+    return labels
+
+
+class Hierarchy:
+    """
+    Seviye kolonlarından (üstten alta) kurulan ağaç ve toplama matrisi
+    S (düğüm x yaprak, sparse): düğüm tahmini = S @ yaprak tahminleri
+    Düğüm sırası: Toplam, 1. seviye, ..., yapraklar (son blok birim matris)
+    """
+
+    def __init__(self, levels, leaves, include_total=True):
+        sparse, _ = _sparse()
+
+        self.levels = list(levels)
+        self.leaves = leaves.reset_index(drop=True)
+        self.n_leaves = len(self.leaves)
+
+        names, node_levels, rows, cols = [], [], [], []
+        self._leaf_labels = {}
+
+        leaf_index = np.arange(self.n_leaves)
+        if include_total:
+            names.append(TOTAL_NODE)
+            node_levels.append(TOTAL_LEVEL)
+            rows.append(np.zeros(self.n_leaves, dtype=np.int64))
+            cols.append(leaf_index)
+            self._leaf_labels[TOTAL_LEVEL] = np.full(self.n_leaves, TOTAL_NODE, dtype=object)
+
+        for depth, level in enumerate(self.levels, 1):
+            labels = _path_labels(self.leaves, self.levels[:depth])
+            codes, uniques = pd.factorize(labels)
+            rows.append(codes + len(names))
+            cols.append(leaf_index)
+            names.extend(uniques)
+            node_levels.extend([level] * len(uniques))
+            self._leaf_labels[level] = labels
+
+        self.nodes = pd.DataFrame({'Node': names, 'Level': node_levels})
+        self.n_nodes = len(names)
+        self.leaf_nodes = self._leaf_labels[self.levels[-1]]
+
+        rows = np.concatenate(rows)
+        cols = np.concatenate(cols)
+        self.S = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, cols)), shape=(self.n_nodes, self.n_leaves)
+        )
+
+    @classmethod
+    def from_frame(cls, df, levels, include_total=True):
+        """
+        Verideki benzersiz seviye kombinasyonlarından ağaç kur
+        """
+        leaves = _clean_levels(df, levels).drop_duplicates().sort_values(list(levels), kind='stable')
+        return cls(levels, leaves, include_total=include_total)
+
+    def level_names(self):
+        return list(self.nodes['Level'].unique())
+
+    def nodes_at(self, level):
+        """
+        Seviyedeki düğüm adları (ağaç sırasıyla)
+        """
+        if level not in self._leaf_labels:
+            raise ValueError(f"Bilinmeyen seviye: {level} (seçenekler: {', '.join(self.level_names())})")
+        return self.nodes.loc[self.nodes['Level'] == level, 'Node'].tolist()
+
+    def row_labels(self, df, level=None):
+        """
+        df satırlarının verilen seviyedeki düğüm adları (varsayılan: yaprak)
+        Ağaçta olmayan kombinasyonlar NaN
+        """
+        level = level or self.levels[-1]
+        if level not in self._leaf_labels:
+            raise ValueError(f"Bilinmeyen seviye: {level} (seçenekler: {', '.join(self.level_names())})")
+
+        rows = pd.MultiIndex.from_frame(_clean_levels(df, self.levels))
+        leaf_positions = pd.MultiIndex.from_frame(self.leaves).get_indexer(rows)
+        labels = self._leaf_labels[level][np.maximum(leaf_positions, 0)]
+        return pd.Series(np.where(leaf_positions >= 0, labels, np.nan), index=df.index, dtype=object)
+
+    def aggregate_series(self, leaf_series):
+        """
+        Yaprak serilerini (ds, y) üst düğümlere topla: {düğüm: DataFrame(ds, y)}
+        Bir ayda hiçbir yaprağın verisi yoksa o ay düğümde de yok
+        """
+        dates = np.unique(np.concatenate([
+            series['ds'].to_numpy() for series in leaf_series.values()
+        ])) if leaf_series else np.array([], dtype='datetime64[ns]')
+
+        values = np.zeros((self.n_leaves, len(dates)))
+        observed = np.zeros((self.n_leaves, len(dates)))
+        positions = {name: i for i, name in enumerate(self.leaf_nodes)}
+        for name, series in leaf_series.items():
+            i = positions[name]
+            columns = np.searchsorted(dates, series['ds'].to_numpy())
+            y = series['y'].to_numpy(dtype=float)
+            values[i, columns] = np.nan_to_num(y)
+            observed[i, columns] = ~np.isnan(y)
+
+        aggregate = self.n_nodes - self.n_leaves
+        totals = self.S[:aggregate] @ values
+        counts = self.S[:aggregate] @ observed
+
+        result = {}
+        for i, name in enumerate(self.nodes['Node'].iloc[:aggregate]):
+            keep = counts[i] > 0
+            result[name] = pd.DataFrame({'ds': dates[keep], 'y': totals[i, keep]})
+        return result
+
+    def reconcile(self, mean, lower, upper, method='bottom_up'):
+        """
+        Düğüm x ay temel tahminleri tutarlı hale getir
+        mean/lower/upper: (n_nodes, h) dizileri; tahmini olmayan düğümler NaN
+        bottom_up: Sadece yapraklar kullanılır, üst düğümler S ile toplanır
+        mint: Köşegen W (tahmin varyansı) ile MinT/WLS; varyans yoksa yaprak sayısı (yapısal)
+        Dönüş: Uzlaştırılmış (mean, lower, upper), her biri (n_nodes, h)
+        """
+        if method not in RECONCILIATION_METHODS:
+            raise ValueError(f"Bilinmeyen uzlaştırma yöntemi: {method} (seçenekler: {', '.join(RECONCILIATION_METHODS)})")
+
+        leaves = slice(self.n_nodes - self.n_leaves, self.n_nodes)
+        leaf_mean = np.nan_to_num(mean[leaves])
+
+        # Aralıklar: yapraklar bağımsız varsayılarak yarı genişlikler karesel toplanır
+        low_width = np.sqrt(self.S @ np.nan_to_num(mean[leaves] - lower[leaves]) ** 2)
+        up_width = np.sqrt(self.S @ np.nan_to_num(upper[leaves] - mean[leaves]) ** 2)
+
+        # Hiçbir yaprağın tahmini olmayan (düğüm, ay) hücreleri boş kalır
+        empty = (self.S @ ~np.isnan(mean[leaves])) == 0
+
+        if method == 'bottom_up':
+            reconciled = np.where(empty, np.nan, self.S @ leaf_mean)
+            return reconciled, reconciled - low_width, reconciled + up_width
+
+        reconciled = np.where(empty, np.nan, self.S @ self._mint_leaves(mean, lower, upper, leaf_mean))
+
+        # Temel tahmini olan düğümlerde kendi aralık genişliği korunur
+        has_base = ~np.isnan(mean)
+        low_width = np.where(has_base, mean - lower, low_width)
+        up_width = np.where(has_base, upper - mean, up_width)
+        return reconciled, reconciled - low_width, reconciled + up_width
+
+    def _mint_leaves(self, mean, lower, upper, start):
+        """
+        (S' W^-1 S) b = S' W^-1 y normal denklemlerini ay başına eşlenik gradyanla çöz
+        S'W^-1 S yoğunlaşabildiği için matris kurulmaz, sadece S ile çarpım yapılır
+        W düğüm başına tahmin edilen aylardaki aralık genişliklerinden; pencerede tahmin edilmeyen
+        aylar (ör. 2026 penceresinde Eki-Ara) sadece o ayın çözümünden düşer
+        """
+        _, linalg = _sparse()
+
+        observed = ~np.isnan(mean)
+        has_base = observed.any(axis=1)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            sigma = np.nanmean((upper - lower) / (2 * Z_80), axis=1)
+        variance = np.where(has_base, np.nan_to_num(sigma) ** 2, 0.0)
+
+        if variance[has_base].max(initial=0.0) > 0:
+            floor = variance[has_base].max() * 1e-8
+            weights = np.maximum(variance, floor)
+        else:
+            # Aralık yok (uncertainty_samples=0): yapısal ölçekleme
+            weights = np.asarray(self.S.sum(axis=1)).ravel()
+
+        # O ay tahmini olmayan düğümler (yetersiz veri) çok zayıf bir sıfır tahmini alır;
+        # böylece sistem tekil olmaz ve toplamları diğer düğümler belirler
+        weak = weights[has_base].max(initial=1.0) * 1e6
+        inverse = np.where(observed, 1.0 / weights[:, None], 1.0 / weak)
+
+        S, St = self.S, self.S.T.tocsr()
+        rhs = St @ (inverse * np.nan_to_num(mean))
+        solution = np.empty_like(start)
+        for h in range(start.shape[1]):
+            month_inverse = inverse[:, h]
+            diagonal = St @ month_inverse
+            operator = linalg.LinearOperator(
+                (self.n_leaves, self.n_leaves),
+                matvec=lambda x: St @ (month_inverse * (S @ x)),
+                dtype=float
+            )
+            preconditioner = linalg.LinearOperator(
+                (self.n_leaves, self.n_leaves),
+                matvec=lambda x: x / diagonal,
+                dtype=float
+            )
+            x, info = linalg.cg(operator, rhs[:, h], x0=start[:, h], rtol=1e-10, maxiter=1000, M=preconditioner)
+            if info != 0:
+                print(f"⚠️  MinT çözümü {h + 1}. ayda yakınsamadı, bottom-up kullanılıyor")
+                x = start[:, h]
+            solution[:, h] = x
+        return solution
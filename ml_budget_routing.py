@@ -0,0 +1,154 @@
+import warnings
+import numpy as np
+import pandas as pd
+
+# Ucuzdan pahalıya model rotaları
+ROUTES = ('zero', 'mean', 'seasonal_naive', 'prophet')
+
+# Rota eşikleri (AutoEngine(thresholds=...) ile ezilebilir)
+ROUTING_THRESHOLDS = {
+    'recent_months': 12,          # "son dönem": sıfır satış kontrolü
+    'sparse_share': 0.5,          # sıfır ay oranı bu ve üstündeyse seyrek seri
+    'flat_cv': 0.05,              # değişim katsayısı bunun altındaysa düz seri
+    'min_seasonal_length': 13,    # seasonal-naive için en az ay (bir yıl önceki aynı ay)
+    'min_prophet_length': 18,     # Prophet için en az ay (bir tam yıl + yarım sezon; Sayfa1 düzeni en fazla 21 ay)
+    'strong_seasonality': 0.6,    # sezon gücü bu ve üstündeyse geçen yılın deseni yeterli
+    'weak_seasonality': 0.3,      # kısa seride sezon gücü bunun altındaysa ortalama yeterli
+}
+
+PROFILE_COLUMNS = ['n_obs', 'recent_total', 'zero_share', 'cv', 'seasonal_strength']
+
+
+def series_matrix(all_series):
+    """
+    {seri: (ds, y)} -> (seriler, (seri x ay) matrisi, ilk ay indeksi)
+    Gözlenmeyen aylar NaN
+    """
+    categories = list(all_series)
+    lengths = np.array([len(all_series[c]) for c in categories])
+    codes = np.repeat(np.arange(len(categories)), lengths)
+    # Tek concat, seri başına kolon erişiminden çok daha hızlı
+    stacked = pd.concat([all_series[c] for c in categories], ignore_index=True)
+    month_index = pd.to_datetime(stacked['ds']).values.astype('datetime64[M]').astype(np.int64)
+    y = stacked['y'].to_numpy(dtype=float)
+
+    start = month_index.min()
+    Y = np.full((len(categories), month_index.max() - start + 1), np.nan)
+    Y[codes, month_index - start] = y
+    return categories, Y, start
+
+
+def seasonal_strength(Y, start):
+    """
+    Sezon gücü: 1 - Var(artık) / Var(yıl seviyesinden arındırılmış seri), 0-1 arası
+    Yıl ortalamaları çıkarılır, ay-yıl ortalamaları sezon bileşenidir; varyanslar serbestlik
+    derecesiyle düzeltilir (sadece gürültü olan seri ~0). En az 6 takvim ayı iki kez
+    görülmemişse NaN
+    """
+    n, T = Y.shape
+    months = start + np.arange(T)
+    year = months // 12 - months[0] // 12
+    month_of_year = months % 12
+    observed = ~np.isnan(Y)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        year_mean = np.stack([np.nanmean(Y[:, year == k], axis=1) for k in range(year.max() + 1)], axis=1)
+        detrended = Y - year_mean[:, year]
+        seasonal = np.stack([np.nanmean(detrended[:, month_of_year == m], axis=1) for m in range(12)], axis=1)
+    remainder = detrended - seasonal[:, month_of_year]
+
+    counts = np.stack([observed[:, month_of_year == m].sum(axis=1) for m in range(12)], axis=1)
+    n_obs = observed.sum(axis=1)
+    repeated = (counts >= 2).sum(axis=1)
+    # Serbestlik: gözlenen her yıl için bir seviye, her takvim ayı için bir sezon parametresi
+    dof_detrended = n_obs - (~np.isnan(year_mean)).sum(axis=1)
+    dof_remainder = dof_detrended - ((counts > 0).sum(axis=1) - 1)
+
+    ss_detrended = np.nansum(detrended ** 2, axis=1)
+    ss_remainder = np.nansum(remainder ** 2, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = (ss_remainder / dof_remainder) / (ss_detrended / dof_detrended)
+    valid = (repeated >= 6) & (dof_remainder > 0) & (ss_detrended > 0)
+    return np.where(valid, np.clip(1 - ratio, 0.0, 1.0), np.nan)
+
+
+def profile_series(all_series, recent_months=ROUTING_THRESHOLDS['recent_months']):
+    """
+    Seri profili (tüm seriler tek matriste, sadece NumPy)
+    n_obs: Gözlenen ay sayısı, recent_total: Son recent_months aydaki mutlak toplam,
+    zero_share: Sıfır ay oranı, cv: Değişim katsayısı, seasonal_strength: bkz. seasonal_strength
+    Her serinin profili sadece kendi verisine bağlıdır
+    """
+    if not all_series:
+        return pd.DataFrame(columns=PROFILE_COLUMNS)
+
+    categories, Y, start = series_matrix(all_series)
+    observed = ~np.isnan(Y)
+    n_obs = observed.sum(axis=1)
+
+    last = Y.shape[1] - 1 - np.argmax(observed[:, ::-1], axis=1)
+    recent = np.arange(Y.shape[1])[None, :] > (last - recent_months)[:, None]
+    recent_total = np.nansum(np.where(recent, np.abs(Y), 0.0), axis=1)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        zero_share = (Y == 0).sum(axis=1) / np.maximum(n_obs, 1)
+        mean = np.nanmean(Y, axis=1)
+        std = np.nanstd(Y, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cv = np.where(mean != 0, std / np.abs(mean), np.inf)
+
+    return pd.DataFrame({
+        'n_obs': n_obs,
+        'recent_total': recent_total,
+        'zero_share': zero_share,
+        'cv': cv,
+        'seasonal_strength': seasonal_strength(Y, start),
+    }, index=pd.Index(categories, name='category'))
+
+
+def route_series(profile, thresholds=None):
+    """
+    Profilden her seri için en ucuz yeterli model ve gerekçesi
+    Dönüş: profile + model, reason kolonları
+    """
+    t = dict(ROUTING_THRESHOLDS, **(thresholds or {}))
+    n, strength = profile['n_obs'].to_numpy(), profile['seasonal_strength'].to_numpy()
+    zero_share, cv = profile['zero_share'].to_numpy(), profile['cv'].to_numpy()
+    strong = np.nan_to_num(strength, nan=0.0) >= t['strong_seasonality']
+    weak = np.nan_to_num(strength, nan=0.0) < t['weak_seasonality']
+    short = n < t['min_prophet_length']
+
+    # Kurallar sırayla denenir, ilk tutan kazanır
+    rules = [
+        (profile['recent_total'].to_numpy() == 0, 'zero',
+         lambda i: f"son {t['recent_months']} ayda satış yok"),
+        (n < t['min_seasonal_length'], 'mean',
+         lambda i: f"kısa seri ({n[i]} ay)"),
+        (zero_share >= t['sparse_share'], 'mean',
+         lambda i: f"seyrek seri (ayların %{zero_share[i] * 100:.0f}'i sıfır)"),
+        (cv < t['flat_cv'], 'mean',
+         lambda i: f"düz seri (CV {cv[i]:.3f})"),
+        (strong, 'seasonal_naive',
+         lambda i: f"güçlü sezon ({strength[i]:.2f}): geçen yılın deseni yeterli"),
+        (short & weak, 'mean',
+         lambda i: f"kısa geçmiş ({n[i]} ay), zayıf sezon ({np.nan_to_num(strength[i]):.2f})"),
+        (short, 'seasonal_naive',
+         lambda i: f"Prophet için kısa geçmiş ({n[i]} ay), orta sezon ({strength[i]:.2f})"),
+    ]
+
+    models = np.full(len(profile), 'prophet', dtype=object)
+    reasons = np.empty(len(profile), dtype=object)
+    pending = np.ones(len(profile), dtype=bool)
+    for mask, model, reason in rules:
+        hit = np.flatnonzero(mask & pending)
+        models[hit] = model
+        reasons[hit] = [reason(i) for i in hit]
+        pending[hit] = False
+
+    for i in np.flatnonzero(pending):
+        measured = 'ölçülemedi' if np.isnan(strength[i]) else f"{strength[i]:.2f}"
+        reasons[i] = f"trend/sezon ayrıştırması gerekli (sezon gücü {measured}, CV {cv[i]:.2f})"
+
+    return profile.assign(model=models, reason=reasons)
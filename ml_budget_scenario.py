@@ -0,0 +1,291 @@
+import json
+import numpy as np
+import pandas as pd
+
+# Yeni senaryoların varsayılan adı (çarpanlar 1: ML tahmini)
+BASE_SCENARIO = 'Temel'
+
+
+def _as_month_factors(value, n_months):
+    """
+    Skaler veya ay başına dizi -> (ay,) çarpan dizisi
+    """
+    factors = np.broadcast_to(np.asarray(value, dtype=float), (n_months,))
+    if (factors <= 0).any():
+        raise ValueError("Sezonsellik çarpanı pozitif olmalı")
+    return factors
+
+
+class Scenario:
+    """
+    Adlandırılmış what-if senaryosu
+    growth: Kategori başına büyüme oranı (%), (n_kategori,)
+    seasonality: Kategori x ay çarpanı, (n_kategori, n_ay)
+    Ayarlanmış tahmin = ML tahmini * (1 + büyüme/100) * sezonsellik
+    """
+
+    def __init__(self, name, categories, months, growth=None, seasonality=None):
+        self.name = name
+        self.index = pd.Index(categories, dtype=object)
+        self.months = np.asarray(months, dtype=np.int64)
+        shape = (len(self.index), len(self.months))
+        self.growth = np.zeros(shape[0]) if growth is None else np.array(growth, dtype=float)
+        self.seasonality = np.ones(shape) if seasonality is None else np.array(seasonality, dtype=float)
+
+    @property
+    def multipliers(self):
+        """
+        Kategori x ay toplam çarpan
+        """
+        return (1 + self.growth / 100)[:, None] * self.seasonality
+
+    def changed(self):
+        """
+        Ayarlanmış kategoriler (çarpanı 1 olmayan)
+        """
+        return (self.growth != 0) | (self.seasonality != 1).any(axis=1)
+
+    def copy(self, name):
+        return Scenario(name, self.index, self.months, self.growth, self.seasonality)
+
+    def to_dict(self):
+        """
+        JSON uyumlu; sadece ayarlanmış kategoriler yazılır
+        """
+        changed = np.flatnonzero(self.changed())
+        return {
+            'name': self.name,
+            'months': self.months.tolist(),
+            'adjustments': {
+                str(self.index[i]): {
+                    'growth': float(self.growth[i]),
+                    'seasonality': self.seasonality[i].tolist(),
+                }
+                for i in changed
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data, categories, months):
+        """
+        to_dict çıktısından; tabloda olmayan kategoriler yok sayılır
+        """
+        scenario = cls(data['name'], categories, months)
+        saved_months = np.asarray(data.get('months', months), dtype=np.int64)
+        columns = scenario.months.searchsorted(saved_months)
+        valid = columns < len(scenario.months)
+        valid[valid] = scenario.months[columns[valid]] == saved_months[valid]
+
+        for category, adjustment in data.get('adjustments', {}).items():
+            if category not in scenario.index:
+                continue
+            i = scenario.index.get_loc(category)
+            scenario.growth[i] = adjustment.get('growth', 0.0)
+            seasonality = np.asarray(adjustment.get('seasonality', np.ones(len(saved_months))), dtype=float)
+            scenario.seasonality[i, columns[valid]] = seasonality[valid]
+        return scenario
+
+
+class ScenarioEngine:
+    """
+    ForecastStore üzerinde vektörel what-if hesapları
+    Senaryolar bellekte (kategori x ay) çarpan dizileri olarak tutulur;
+    portföy aylık toplamları her ayarda sadece değişen satırlar kadar güncellenir
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.base = np.nan_to_num(store.forecast)
+        self.base_monthly = self.base.sum(axis=0)
+        self.scenarios = {}
+        self._monthly = {}
+        self.create(BASE_SCENARIO)
+
+    @property
+    def categories(self):
+        return self.store.categories
+
+    @property
+    def months(self):
+        return self.store.months
+
+    def names(self):
+        return list(self.scenarios)
+
+    def _get(self, name):
+        try:
+            return self.scenarios[name]
+        except KeyError:
+            raise KeyError(f"Senaryo bulunamadı: {name}") from None
+
+    def _register(self, scenario):
+        self.scenarios[scenario.name] = scenario
+        self._monthly[scenario.name] = (scenario.multipliers * self.base).sum(axis=0)
+        return scenario
+
+    def create(self, name, source=None):
+        """
+        Yeni senaryo; source verilirse onun kopyası, yoksa ML tahmini (çarpan 1)
+        """
+        if source is not None:
+            return self._register(self._get(source).copy(name))
+        return self._register(Scenario(name, self.store.index, self.months))
+
+    def delete(self, name):
+        self._get(name)
+        del self.scenarios[name]
+        del self._monthly[name]
+
+    def _rows(self, categories):
+        """
+        Kategori adlarından satır indeksleri (None: tümü)
+        """
+        if categories is None:
+            return np.arange(len(self.store.index))
+        positions = self.store.index.get_indexer(pd.Index(list(categories), dtype=object))
+        if (positions < 0).any():
+            missing = [c for c, p in zip(categories, positions) if p < 0]
+            raise KeyError(f"Bilinmeyen kategori: {', '.join(map(str, missing))}")
+        return positions
+
+    def _columns(self, months):
+        if months is None:
+            return np.arange(len(self.months))
+        months = np.atleast_1d(np.asarray(months, dtype=np.int64))
+        columns = self.months.searchsorted(months)
+        found = columns < len(self.months)
+        found[found] = self.months[columns[found]] == months[found]
+        if not found.all():
+            raise ValueError(f"Bilinmeyen ay: {', '.join(map(str, months[~found]))}")
+        return columns
+
+    def adjust(self, name, categories=None, growth=None, seasonality=None, months=None):
+        """
+        Seçili kategorilerin çarpanlarını ayarla (birikimli değil, değeri atar)
+        growth: Büyüme oranı (%)
+        seasonality: Skaler veya seçili ay sayısı kadar çarpan
+        months: Sezonsellik çarpanının uygulanacağı aylar (None: tümü)
+        Dönüş: Güncel portföy özeti (portfolio)
+        """
+        scenario = self._get(name)
+        rows = self._rows(categories)
+
+        before = (scenario.multipliers[rows] * self.base[rows]).sum(axis=0)
+        if growth is not None:
+            scenario.growth[rows] = growth
+        if seasonality is not None:
+            columns = self._columns(months)
+            scenario.seasonality[np.ix_(rows, columns)] = _as_month_factors(seasonality, len(columns))
+        after = (scenario.multipliers[rows] * self.base[rows]).sum(axis=0)
+
+        self._monthly[name] = self._monthly[name] + (after - before)
+        return self.portfolio(name)
+
+    def reset(self, name, categories=None):
+        """
+        Kategorileri ML tahminine döndür
+        """
+        return self.adjust(name, categories, growth=0.0, seasonality=1.0)
+
+    def apply(self, name):
+        """
+        Senaryonun tüm tabloya uygulanmış hali (ForecastStore)
+        Tahmin ve aralık sınırları aynı çarpanla ölçeklenir
+        """
+        from ml_budget_store import ForecastStore
+
+        multipliers = self._get(name).multipliers
+        return ForecastStore(
+            self.store.index, self.months,
+            self.store.forecast * multipliers,
+            self.store.lower * multipliers,
+            self.store.upper * multipliers
+        )
+
+    def rows(self, name, category):
+        """
+        Tek kategori için ML ve ayarlanmış aylık tahmin: Month, Forecast, Adjusted
+        """
+        i = self._rows([category])[0]
+        forecast = self.store.forecast[i]
+        present = ~np.isnan(forecast)
+        return pd.DataFrame({
+            'Month': self.months[present],
+            'Forecast': forecast[present],
+            'Adjusted': (forecast * self._get(name).multipliers[i])[present],
+        })
+
+    def portfolio(self, name):
+        """
+        Portföy toplamları (önceden hesaplanmış aylık toplamlardan)
+        """
+        ml_total = float(self.base_monthly.sum())
+        adjusted_total = float(self._monthly[name].sum())
+        return {
+            'scenario': name,
+            'ml_total': ml_total,
+            'adjusted_total': adjusted_total,
+            'difference': adjusted_total - ml_total,
+            'difference_pct': (adjusted_total - ml_total) / ml_total * 100 if ml_total > 0 else 0.0,
+            'adjusted_categories': int(self._get(name).changed().sum()),
+        }
+
+    def monthly(self, names=None):
+        """
+        Ay x senaryo portföy toplamları (ML tahmini dahil)
+        """
+        names = self.names() if names is None else list(names)
+        frame = pd.DataFrame({'Month': self.months, 'ML': self.base_monthly})
+        for name in names:
+            self._get(name)
+            frame[name] = self._monthly[name]
+        return frame
+
+    def compare(self, names=None):
+        """
+        Senaryoların portföy özetleri yan yana
+        """
+        names = self.names() if names is None else list(names)
+        return pd.DataFrame([self.portfolio(name) for name in names])
+
+    def category_totals(self, name):
+        """
+        Kategori bazında yıllık ML ve ayarlanmış toplam (tek matris işlemi)
+        """
+        scenario = self._get(name)
+        ml_total = self.base.sum(axis=1)
+        adjusted_total = (self.base * scenario.multipliers).sum(axis=1)
+        return pd.DataFrame({
+            'Category': self.store.index,
+            'ML_Total': ml_total,
+            'Adjusted_Total': adjusted_total,
+            'Growth_%': scenario.growth,
+            'Difference_%': np.divide(
+                (adjusted_total - ml_total) * 100, ml_total,
+                out=np.zeros_like(ml_total), where=ml_total > 0
+            ),
+        })
+
+    def refresh(self):
+        """
+        Aylık toplamları baştan hesapla (birikimli güncellemelerin yuvarlama hatasını siler)
+        """
+        for name, scenario in self.scenarios.items():
+            self._monthly[name] = (scenario.multipliers * self.base).sum(axis=0)
+
+    def save(self, path):
+        """
+        Tüm senaryoları JSON dosyasına yaz
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump([s.to_dict() for s in self.scenarios.values()], f, ensure_ascii=False, indent=2)
+
+    def load(self, path):
+        """
+        JSON dosyasındaki senaryoları yükle (aynı adlılar üzerine yazılır)
+        """
+        with open(path, encoding='utf-8') as f:
+            saved = json.load(f)
+        for data in saved:
+            self._register(Scenario.from_dict(data, self.store.index, self.months))
+        return [data['name'] for data in saved]
@@ -0,0 +1,714 @@
+"""
+Tahmin iş servisi: eğitim arayüz sürecinin dışında, yerel HTTP API ile
+
+Veri dosyası POST edilir; aynı içerik ve ayarlarla bekleyen, çalışan veya bitmiş
+bir iş varsa yeni iş açılmaz, mevcut iş döner. Kategori eğitimleri paylaşılan
+süreç havuzunda çalışır; ilerleme ve sonuçlar JSON olarak sorgulanır veya
+satır satır JSON (NDJSON) akışı olarak izlenir. Sadece standart kütüphane
+(asyncio sunucu, urllib istemci) kullanılır.
+
+Uç noktalar:
+    POST /jobs?name=veri.xlsx&engine=prophet&samples=1000   Gövde: dosya içeriği
+    GET  /jobs                                  Tüm işler
+    GET  /jobs/<id>                             Durum ve ilerleme
+    GET  /jobs/<id>/events                      İlerleme akışı (iş bitince kapanır)
+    GET  /jobs/<id>/result                      Tahminler, özet, karşılaştırma, ölçümler
+    GET  /jobs/<id>/intervals?category=..&samples=1000   Tek kategori güven aralıkları
+    GET  /jobs/<id>/export?format=xlsx          Detaylı tahmin dosyası
+    GET  /health
+
+Kullanım:
+    python ml_budget_service.py --port 8765 --n-jobs -1
+    ML_BUDGET_SERVICE_URL=http://127.0.0.1:8765 streamlit run ml_budget_app.py
+"""
+import io
+import os
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import urlsplit, parse_qs, unquote, quote, urlencode
+import pandas as pd
+from ml_budget_forecaster import MLBudgetForecaster, ForecastWindow, resolve_n_jobs
+from ml_budget_cache import ForecastCache
+from ml_budget_data import read_workbook
+from ml_budget_engines import ENGINES, get_engine
+from ml_budget_export import export_file, EXPORT_FORMATS, MIME_TYPES
+from ml_budget_stats import RunStats
+from ml_budget_store import ForecastStore, MODEL_RETENTION
+
+DEFAULT_PORT = 8765
+
+# İstemcilerin servis adresini okuduğu ortam değişkeni
+SERVICE_URL_ENV = 'ML_BUDGET_SERVICE_URL'
+
+# İş anahtarına girer: sonuç düzeni değişirse eski işler paylaşılmaz
+SERVICE_VERSION = 1
+
+MAX_UPLOAD_BYTES = 256 * 1024 * 1024
+
+# İş durumları
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+# İlerleme olayları en fazla bu sıklıkta yayınlanır (saniye)
+PROGRESS_INTERVAL = 0.2
+
+REASONS = {
+    200: 'OK', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found',
+    405: 'Method Not Allowed', 409: 'Conflict', 413: 'Payload Too Large',
+    500: 'Internal Server Error',
+}
+
+
+class ServiceError(Exception):
+    """
+    HTTP hata yanıtı (sunucuda yanıta çevrilir, istemcide yeniden oluşturulur)
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def job_key(data, settings):
+    """
+    İş kimliği: veri içeriği + ayarların hash'i (aynı istek aynı işe düşer)
+    """
+    h = hashlib.sha256(data)
+    h.update(json.dumps(settings, sort_keys=True).encode('utf-8'))
+    return h.hexdigest()[:16]
+
+
+def _records(frame):
+    """
+    DataFrame -> JSON uyumlu satır listesi (NaN -> None)
+    """
+    return json.loads(frame.to_json(orient='records', force_ascii=False))
+
+
+def _parse_samples(value):
+    """
+    Simülasyon sayısı parametresi: negatif olmayan tam sayı, değilse 400
+    """
+    try:
+        samples = int(value)
+    except (TypeError, ValueError):
+        raise ServiceError(400, f"Geçersiz simülasyon sayısı: {value}") from None
+    if samples < 0:
+        raise ServiceError(400, f"Simülasyon sayısı negatif olamaz: {samples}")
+    return samples
+
+
+def _pool_context():
+    """
+    İşçi süreçleri fork ile açılırsa o an açık istemci soketlerini miras alır ve
+    bağlantılar (ör. olay akışı) işçiler kapanana kadar kapanmaz; forkserver/spawn almaz
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+class Job:
+    """
+    Tek eğitim işi; durum alanları sadece olay döngüsünde değişir
+    """
+
+    def __init__(self, job_id, name, settings):
+        self.id = job_id
+        self.name = name
+        self.settings = settings
+        self.status = QUEUED
+        self.done = 0
+        self.total = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.forecaster = None
+        self.summary = None
+        self.comparison = None
+        self.result_body = None
+        # Aralık hesapları aynı modelleri kullanır: aynı anda tek istek
+        self.model_lock = threading.Lock()
+        self._changed = asyncio.Event()
+
+    def notify(self):
+        """
+        Akış dinleyicilerini uyandır
+        """
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait_change(self, timeout):
+        changed = self._changed
+        try:
+            await asyncio.wait_for(changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def set_progress(self, done, total):
+        self.done, self.total = done, total
+        self.notify()
+
+    def to_dict(self):
+        if self.total:
+            progress = self.done / self.total
+        else:
+            progress = 1.0 if self.status == DONE else 0.0
+        return {
+            'id': self.id,
+            'name': self.name,
+            'status': self.status,
+            'settings': self.settings,
+            'done': self.done,
+            'total': self.total,
+            'progress': round(progress, 4),
+            'error': self.error,
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+            'seconds': round((self.finished or time.time()) - self.started, 3) if self.started else None,
+        }
+
+
+class JobService:
+    """
+    Eğitim işlerini yöneten asyncio servisi
+    İşler thread'de çalışır (olay döngüsü bloklanmaz); kategori fit'leri ayar başına
+    tek süreç havuzunda. Bitmiş işler (modeller dahil) max_jobs kadar bellekte tutulur
+    """
+
+    def __init__(self, engine='prophet', n_jobs=-1, uncertainty_samples=1000,
+                 cache_dir='.ml_budget_cache', tuned_params=None, max_concurrent=1,
+                 max_jobs=16, max_upload_bytes=MAX_UPLOAD_BYTES, model_retention='compact'):
+        self.engine = engine
+        # Bitmiş işlerin modelleri bu politikayla saklanır (bkz. ModelStore)
+        self.model_retention = model_retention
+        self.n_jobs = n_jobs
+        self.uncertainty_samples = uncertainty_samples
+        self.cache = ForecastCache(cache_dir) if cache_dir else None
+        self.tuned_params = tuned_params or {}
+        self.max_jobs = max_jobs
+        self.max_upload_bytes = max_upload_bytes
+        self.jobs = {}
+        self._tasks = set()
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        # Eğitim ve aralık/dışa aktarma işleri için; aralıklar eğitimin arkasında beklemesin
+        self._threads = ThreadPoolExecutor(max_workers=max_concurrent + 2, thread_name_prefix='ml-budget')
+        self._pools = {}
+        self._pool_lock = threading.Lock()
+
+    def settings_for(self, engine=None, samples=None):
+        engine = engine or self.engine
+        if engine not in ENGINES:
+            raise ServiceError(400, f"Bilinmeyen tahmin motoru: {engine} (seçenekler: {', '.join(ENGINES)})")
+        samples = self.uncertainty_samples if samples is None else _parse_samples(samples)
+        return {'version': SERVICE_VERSION, 'engine': engine, 'uncertainty_samples': samples}
+
+    def submit(self, data, name, engine=None, samples=None):
+        """
+        Yeni iş aç veya aynı veri + ayarlı mevcut işi döndür (başarısız işler yeniden denenir)
+        Dönüş: (iş, yeni açıldı mı)
+        """
+        if not data:
+            raise ServiceError(400, "Boş veri")
+        settings = self.settings_for(engine, samples)
+        job_id = job_key(data, settings)
+
+        job = self.jobs.get(job_id)
+        if job is not None and job.status != FAILED:
+            return job, False
+
+        job = Job(job_id, name, settings)
+        self.jobs[job_id] = job
+        self._evict()
+        task = asyncio.get_running_loop().create_task(self._run(job, data))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job, True
+
+    def _evict(self):
+        """
+        İş sayısı sınırı aşıldıysa en eski bitmiş işleri bırak
+        """
+        excess = len(self.jobs) - self.max_jobs
+        finished = [job for job in self.jobs.values() if job.status not in ACTIVE_STATES]
+        for job in finished[:max(excess, 0)]:
+            del self.jobs[job.id]
+
+    def get(self, job_id):
+        try:
+            return self.jobs[job_id]
+        except KeyError:
+            raise ServiceError(404, f"İş bulunamadı: {job_id}") from None
+
+    async def _run(self, job, data):
+        loop = asyncio.get_running_loop()
+        last = 0.0
+
+        def progress(done, total):
+            # Eğitim thread'inden; olay döngüsüne seyreltilerek aktarılır
+            nonlocal last
+            now = time.monotonic()
+            if done == total or now - last >= PROGRESS_INTERVAL:
+                last = now
+                loop.call_soon_threadsafe(job.set_progress, done, total)
+
+        async with self._semaphore:
+            job.status, job.started = RUNNING, time.time()
+            job.notify()
+            try:
+                job.forecaster, job.summary, job.comparison = await loop.run_in_executor(
+                    self._threads, self._train, job, data, progress
+                )
+                job.status = DONE
+            except Exception as e:
+                job.status, job.error = FAILED, str(e) or type(e).__name__
+                print(f"❌ {job.id} ({job.name}): {job.error}")
+            job.finished = time.time()
+            job.notify()
+
+    def _pool(self, forecaster):
+        """
+        Ayarlar için ortak süreç havuzu (vektörel motorlarda ve tek işçide yok)
+        """
+        if forecaster.engine.batched or resolve_n_jobs(self.n_jobs) <= 1:
+            return None
+        key = (forecaster.engine.name, forecaster.uncertainty_samples)
+        with self._pool_lock:
+            if key not in self._pools:
+                self._pools[key] = forecaster.create_executor(self.n_jobs, mp_context=_pool_context())
+            return self._pools[key]
+
+    def _drop_pool(self, forecaster):
+        key = (forecaster.engine.name, forecaster.uncertainty_samples)
+        with self._pool_lock:
+            pool = self._pools.pop(key, None)
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def _train(self, job, data, progress):
+        """
+        Eğitim thread'i: veriyi oku, eğit, özet tabloları hazırla
+        """
+        source = io.BytesIO(data)
+        source.name = job.name
+        df = read_workbook(source)
+
+        # Ortak parametreli motorda tek kategori yeniden eğitilemez: 'none' iş başına 'compact'a çıkar
+        model_retention = self.model_retention
+        if model_retention == 'none' and get_engine(job.settings['engine']).pooled:
+            model_retention = 'compact'
+
+        forecaster = MLBudgetForecaster(
+            n_jobs=self.n_jobs,
+            cache=self.cache,
+            engine=job.settings['engine'],
+            uncertainty_samples=job.settings['uncertainty_samples'],
+            category_params=self.tuned_params,
+            model_retention=model_retention
+        )
+        forecaster.executor = self._pool(forecaster)
+        try:
+            forecaster.train_all_categories(df, progress=progress)
+        except BrokenProcessPool:
+            # Sonraki işler yeni havuz açar
+            self._drop_pool(forecaster)
+            raise
+        return forecaster, forecaster.get_summary(), forecaster.compare_with_actuals(df)
+
+    def _result_body(self, job):
+        """
+        Sonuç JSON'u (ilk istekte üretilir, sonra işte saklanır)
+        """
+        if job.result_body is None:
+            stats = job.forecaster.last_stats
+            job.result_body = json.dumps({
+                'job': job.to_dict(),
+                'window': job.forecaster.window.key(),
+                'forecasts': job.forecaster.forecasts.to_payload(),
+                'summary': _records(job.summary),
+                'comparison': _records(job.comparison),
+                'stats': stats.to_dict() if stats is not None else None,
+            }, ensure_ascii=False).encode('utf-8')
+        return job.result_body
+
+    def _intervals(self, job, category, samples):
+        if category not in job.forecaster.models:
+            raise ServiceError(404, f"{category}: Eğitilmiş model yok")
+        with job.model_lock:
+            return job.forecaster.forecast_intervals(category, samples)
+
+    def _finished(self, job):
+        if job.status != DONE:
+            raise ServiceError(409, f"İş tamamlanmadı: {job.status}" + (f" ({job.error})" if job.error else ''))
+        return job
+
+    # HTTP katmanı
+    async def _read_request(self, reader):
+        parts = (await reader.readline()).decode('latin-1').split()
+        if len(parts) != 3:
+            raise ServiceError(400, "Geçersiz istek satırı")
+        method, target = parts[0].upper(), parts[1]
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length') or 0)
+        except ValueError:
+            raise ServiceError(400, "Geçersiz Content-Length") from None
+        if length > self.max_upload_bytes:
+            raise ServiceError(413, f"Dosya çok büyük (sınır {self.max_upload_bytes // (1024 * 1024)} MB)")
+        body = await reader.readexactly(length) if length else b''
+
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        path = [unquote(part) for part in url.path.strip('/').split('/') if part]
+        return method, path, query, body
+
+    async def _send(self, writer, status, body, content_type='application/json', headers=None):
+        head = [
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(body)}",
+            "Connection: close",
+            *(f"{name}: {value}" for name, value in (headers or {}).items()),
+        ]
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+    async def _send_json(self, writer, status, data):
+        await self._send(writer, status, json.dumps(data, ensure_ascii=False).encode('utf-8'))
+
+    async def _stream_events(self, writer, job):
+        """
+        İş durumunu her değişimde bir JSON satırı olarak yaz; iş bitince bağlantıyı kapat
+        """
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+            b"Cache-Control: no-cache\r\nConnection: close\r\n\r\n"
+        )
+        while True:
+            writer.write(json.dumps(job.to_dict(), ensure_ascii=False).encode('utf-8') + b'\n')
+            await writer.drain()
+            if job.status not in ACTIVE_STATES:
+                break
+            # Değişim yoksa da ara ara yazılır (bağlantı canlı kalsın)
+            await job.wait_change(timeout=15)
+
+    async def _send_export(self, writer, job, fmt):
+        if fmt not in EXPORT_FORMATS:
+            raise ServiceError(400, f"Bilinmeyen format: {fmt} (seçenekler: {', '.join(EXPORT_FORMATS)})")
+        loop = asyncio.get_running_loop()
+        sheets = {'Özet': job.summary, 'Karşılaştırma': job.comparison} if fmt == 'xlsx' else None
+        f = await loop.run_in_executor(self._threads, lambda: export_file(job.forecaster.forecasts, fmt, sheets=sheets))
+        with f:
+            size = f.seek(0, os.SEEK_END)
+            f.seek(0)
+            stem = quote(os.path.splitext(job.name)[0])
+            writer.write((
+                f"HTTP/1.1 200 OK\r\nContent-Type: {MIME_TYPES[fmt]}\r\nContent-Length: {size}\r\n"
+                f"Content-Disposition: attachment; filename*=UTF-8''ml_forecast_{stem}.{fmt}\r\n"
+                f"Connection: close\r\n\r\n"
+            ).encode('latin-1'))
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                writer.write(chunk)
+                await writer.drain()
+
+    async def _route(self, method, path, query, body, writer):
+        def expect(allowed):
+            if method != allowed:
+                raise ServiceError(405, f"{method} desteklenmiyor")
+
+        if path == ['health']:
+            expect('GET')
+            active = sum(job.status in ACTIVE_STATES for job in self.jobs.values())
+            return await self._send_json(writer, 200, {'status': 'ok', 'jobs': len(self.jobs), 'active': active})
+
+        if path == ['jobs']:
+            if method == 'POST':
+                job, created = self.submit(body, query.get('name', 'data.xlsx'), query.get('engine'), query.get('samples'))
+                return await self._send_json(writer, 202 if created else 200, dict(job.to_dict(), deduplicated=not created))
+            expect('GET')
+            return await self._send_json(writer, 200, [job.to_dict() for job in self.jobs.values()])
+
+        if len(path) in (2, 3) and path[0] == 'jobs':
+            expect('GET')
+            job = self.get(path[1])
+            action = path[2] if len(path) == 3 else None
+            loop = asyncio.get_running_loop()
+
+            if action is None:
+                return await self._send_json(writer, 200, job.to_dict())
+            if action == 'events':
+                return await self._stream_events(writer, job)
+            if action == 'result':
+                self._finished(job)
+                body = await loop.run_in_executor(self._threads, self._result_body, job)
+                return await self._send(writer, 200, body)
+            if action == 'intervals':
+                self._finished(job)
+                if 'category' not in query:
+                    raise ServiceError(400, "category parametresi gerekli")
+                samples = _parse_samples(query.get('samples', 1000))
+                frame = await loop.run_in_executor(self._threads, self._intervals, job, query['category'], samples)
+                return await self._send_json(writer, 200, _records(frame))
+            if action == 'export':
+                self._finished(job)
+                return await self._send_export(writer, job, query.get('format', 'xlsx'))
+
+        raise ServiceError(404, f"Bilinmeyen adres: /{'/'.join(path)}")
+
+    async def _handle(self, reader, writer):
+        try:
+            try:
+                method, path, query, body = await self._read_request(reader)
+                await self._route(method, path, query, body, writer)
+            except ServiceError as e:
+                await self._send_json(writer, e.status, {'error': str(e)})
+            except (ConnectionError, asyncio.IncompleteReadError):
+                raise
+            except Exception as e:
+                # Beklenmeyen hata sunucuyu düşürmesin
+                await self._send_json(writer, 500, {'error': f"{type(e).__name__}: {e}"})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=DEFAULT_PORT):
+        server = await asyncio.start_server(self._handle, host, port)
+        print(f"🌐 Tahmin servisi: http://{host}:{port} (motor: {self.engine}, işçi: {resolve_n_jobs(self.n_jobs)})")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        self._threads.shutdown(wait=False, cancel_futures=True)
+        with self._pool_lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+class ServiceClient:
+    """
+    Servis istemcisi (urllib); uygulama ve araçlar eğitimi servise bırakıp sonucu buradan alır
+    base_url verilmezse ML_BUDGET_SERVICE_URL, o da yoksa yerel varsayılan port
+    """
+
+    def __init__(self, base_url=None, timeout=60):
+        base_url = base_url or os.environ.get(SERVICE_URL_ENV) or f"http://127.0.0.1:{DEFAULT_PORT}"
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def _open(self, method, path, params=None, data=None, timeout=-1):
+        # urllib.request (http.client, email, ssl) sadece istemci kullanılınca yüklenir
+        from urllib.error import HTTPError
+        from urllib.request import Request, urlopen
+
+        url = f"{self.base_url}{path}" + (f"?{urlencode(params)}" if params else '')
+        headers = {'Content-Type': 'application/octet-stream'} if data is not None else {}
+        request = Request(url, data=data, method=method, headers=headers)
+        try:
+            return urlopen(request, timeout=self.timeout if timeout == -1 else timeout)
+        except HTTPError as e:
+            try:
+                message = json.loads(e.read())['error']
+            except (ValueError, KeyError):
+                message = str(e)
+            raise ServiceError(e.code, message) from None
+
+    def _json(self, method, path, params=None, data=None):
+        with self._open(method, path, params, data) as response:
+            return json.loads(response.read())
+
+    def health(self):
+        return self._json('GET', '/health')
+
+    def submit(self, source, name=None, engine=None, uncertainty_samples=None):
+        """
+        source: Dosya yolu, bytes veya getvalue() destekleyen dosya nesnesi (Streamlit upload)
+        Dönüş: İş durumu (deduplicated=True: aynı veri + ayarlı mevcut iş)
+        """
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as f:
+                data = f.read()
+            name = name or os.path.basename(source)
+        elif hasattr(source, 'getvalue'):
+            data = source.getvalue()
+            name = name or getattr(source, 'name', None)
+        else:
+            data = bytes(source)
+
+        params = {'name': name or 'data.xlsx'}
+        if engine is not None:
+            params['engine'] = engine
+        if uncertainty_samples is not None:
+            params['samples'] = uncertainty_samples
+        return self._json('POST', '/jobs', params, data)
+
+    def jobs(self):
+        return self._json('GET', '/jobs')
+
+    def status(self, job_id):
+        return self._json('GET', f"/jobs/{quote(job_id)}")
+
+    def events(self, job_id):
+        """
+        İş durumlarını geldikçe üret (iş bitince biter)
+        """
+        with self._open('GET', f"/jobs/{quote(job_id)}/events", timeout=None) as response:
+            for line in response:
+                if line.strip():
+                    yield json.loads(line)
+
+    def wait(self, job_id, progress=None, poll=0.5, timeout=None):
+        """
+        İş bitene kadar durumu sorgula
+        progress: Her sorguda progress(biten, toplam) çağrılır
+        Başarısız işte ServiceError
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.status(job_id)
+            if progress is not None and job['total']:
+                progress(job['done'], job['total'])
+            if job['status'] == DONE:
+                return job
+            if job['status'] == FAILED:
+                raise ServiceError(500, f"İş başarısız: {job['error']}")
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"İş {timeout} sn içinde bitmedi: {job_id}")
+            time.sleep(poll)
+
+    def result(self, job_id):
+        return self._json('GET', f"/jobs/{quote(job_id)}/result")
+
+    def intervals(self, job_id, category, uncertainty_samples=1000):
+        """
+        Servisteki modelden tek kategori için güven aralıklı tahmin (get_2026_forecast düzeni)
+        """
+        records = self._json(
+            'GET', f"/jobs/{quote(job_id)}/intervals",
+            {'category': category, 'samples': uncertainty_samples}
+        )
+        return pd.DataFrame(records, columns=['Month', 'Forecast', 'Lower_Bound', 'Upper_Bound'])
+
+    def export(self, job_id, target, fmt=None):
+        """
+        Detaylı tahmin dosyasını indir (format verilmezse uzantıdan)
+        """
+        fmt = fmt or os.path.splitext(os.fspath(target))[1].lstrip('.').lower()
+        with self._open('GET', f"/jobs/{quote(job_id)}/export", {'format': fmt}, timeout=None) as response:
+            with open(target, 'wb') as f:
+                for chunk in iter(lambda: response.read(1024 * 1024), b''):
+                    f.write(chunk)
+        return target
+
+    def forecaster(self, job_id):
+        """
+        Bitmiş işin yerel forecaster görünümü (RemoteForecaster)
+        """
+        return RemoteForecaster(self, job_id, self.result(job_id))
+
+
+class RemoteForecaster:
+    """
+    Serviste eğitilmiş işin yerel, salt okunur görünümü
+    Tahmin tablosu ve ölçümler yerelde (özet/karşılaştırma MLBudgetForecaster ile aynı hesap);
+    güven aralıkları servisteki modellerden hesaplanır. Modeller yerelde olmadığından
+    yeniden eğitim/güncelleme yoktur: yeni veriyle yeni iş gönderilir
+    """
+
+    def __init__(self, client, job_id, result):
+        settings = result['job']['settings']
+        self.client = client
+        self.job_id = job_id
+        self.settings = settings
+        # Tahmin tablosu üzerinden çalışan hesaplar için (model tutmaz)
+        self._local = MLBudgetForecaster(
+            engine=settings['engine'], uncertainty_samples=settings['uncertainty_samples']
+        )
+        self._local.window = ForecastWindow.from_key(result['window'])
+        self._local.forecasts = ForecastStore.from_payload(result['forecasts'])
+        self._local.last_stats = RunStats.from_dict(result['stats']) if result['stats'] else None
+
+    @property
+    def window(self):
+        return self._local.window
+
+    @property
+    def forecasts(self):
+        return self._local.forecasts
+
+    @property
+    def last_stats(self):
+        return self._local.last_stats
+
+    def get_summary(self):
+        return self._local.get_summary()
+
+    def compare_with_actuals(self, df):
+        return self._local.compare_with_actuals(df)
+
+    def portfolio_totals(self, df):
+        return self._local.portfolio_totals(df)
+
+    def memory_report(self):
+        """
+        Yerel sürecin bellek raporu (modeller serviste: model satırı yok)
+        """
+        report = self._local.memory_report()
+        return report[report['component'] != 'Modeller'].reset_index(drop=True)
+
+    def forecast_intervals(self, category, uncertainty_samples=1000):
+        return self.client.intervals(self.job_id, category, uncertainty_samples)
+
+
+if __name__ == "__main__":
+    from ml_budget_tuning import load_tuned_params
+
+    parser = argparse.ArgumentParser(description="Yerel tahmin iş servisi (HTTP)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--engine', default='prophet', choices=list(ENGINES), help="Varsayılan motor (istekte değiştirilebilir)")
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    parser.add_argument('--samples', type=int, default=1000, help="Varsayılan güven aralığı simülasyon sayısı")
+    parser.add_argument('--cache-dir', default='.ml_budget_cache')
+    parser.add_argument('--no-cache', action='store_true')
+    parser.add_argument('--tuned-params', default='tuned_params.json')
+    parser.add_argument('--max-concurrent', type=int, default=1, help="Aynı anda çalışan iş sayısı")
+    parser.add_argument('--max-jobs', type=int, default=16, help="Bellekte tutulan iş sayısı (modeller dahil)")
+    parser.add_argument('--model-retention', default='compact', choices=list(MODEL_RETENTION),
+                        help="Bitmiş işlerin modelleri: nesne (all), sıkıştırılmış (compact), cache'ten/yeniden (none)")
+    args = parser.parse_args()
+
+    service = JobService(
+        engine=args.engine,
+        n_jobs=args.n_jobs,
+        uncertainty_samples=args.samples,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        tuned_params=load_tuned_params(args.tuned_params),
+        max_concurrent=args.max_concurrent,
+        max_jobs=args.max_jobs,
+        model_retention=args.model_retention
+    )
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n👋 Servis durduruldu")
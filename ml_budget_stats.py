@@ -0,0 +1,346 @@
+import os
+import sys
+import json
+import time
+from contextlib import contextmanager
+import pandas as pd
+
+# Kategori başına ölçülen aşamalar
+CATEGORY_STAGES = ('fit', 'predict', 'postprocess', 'load', 'cache_write')
+
+
+# RunStats bellek örnekleme aralığı (saniye): kategori kayıtlarında en fazla bu sıklıkta okunur
+MEMORY_SAMPLE_INTERVAL = 0.1
+
+
+def _proc_status_mb(*fields):
+    """
+    /proc/self/status alanları (VmRSS: anlık, VmHWM: tepe) MB olarak, verilen sırayla; Linux dışında None
+    """
+    values = {}
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                name = line.split(':', 1)[0]
+                if name in fields:
+                    values[name] = int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        return None
+    if len(values) != len(fields):
+        return None
+    return [values[field] for field in fields]
+
+
+def current_rss_mb():
+    """
+    Anlık bellek (MB); Linux'ta /proc, diğerlerinde psutil, ikisi de yoksa None
+    """
+    values = _proc_status_mb('VmRSS')
+    if values is not None:
+        return values[0]
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+
+def peak_rss_mb(children=False):
+    """
+    Süreç ömrü boyunca tepe bellek (MB); bir çalıştırmanın tepesi değil (bkz. RunStats.peak_rss_mb)
+    Linux'ta current_rss_mb ile aynı kaynaktan (/proc), diğerlerinde resource
+    children=True: Beklenmiş alt süreçlerin (işçiler, cmdstan) en yükseği
+    resource modülü olmayan platformlarda None
+    """
+    if not children:
+        values = _proc_status_mb('VmHWM', 'VmRSS')
+        if values is not None:
+            # Çekirdek VmHWM'yi gecikmeli günceller: anlık RSS'in altında raporlanmaz
+            return max(values)
+    try:
+        import resource
+    except ImportError:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux KB, macOS byte döner
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def deep_sizeof(obj, seen=None):
+    """
+    Nesnenin ve eriştiği nesnelerin yaklaşık bellek boyutu (byte)
+    DataFrame/Series/ndarray kendi ölçümleriyle; modül, sınıf ve fonksiyonlar sayılmaz
+    seen: Birden çok nesnede ortak parçaların bir kez sayılması için paylaşılan küme
+    """
+    import numpy as np
+    import types
+
+    seen = set() if seen is None else seen
+    stack = [obj]
+    total = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, (type, types.ModuleType, types.FunctionType, types.MethodType)):
+            continue
+        seen.add(id(item))
+        if isinstance(item, (pd.DataFrame, pd.Series, pd.Index)):
+            usage = item.memory_usage(deep=True)
+            total += int(usage.sum() if hasattr(usage, 'sum') else usage)
+            continue
+        if isinstance(item, np.ndarray):
+            total += item.nbytes
+            continue
+        total += sys.getsizeof(item, 0)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif hasattr(item, '__dict__'):
+            stack.append(vars(item))
+    return total
+
+
+class StatsHook:
+    """
+    Metrik dışa aktarıcı arayüzü
+    Gerekli metotları ezen bir alt sınıf MLBudgetForecaster(hooks=[...]) ile verilir
+    """
+
+    def on_run_start(self, stats):
+        pass
+
+    def on_stage(self, stats, stage, seconds):
+        pass
+
+    def on_category(self, stats, record):
+        pass
+
+    def on_run_end(self, stats):
+        pass
+
+    def on_run_error(self, stats, error):
+        pass
+
+    def on_close(self, stats):
+        """
+        Çalıştırma bitince veya hatayla kesilince bir kez çağrılır (dosya vb. kaynakları bırakmak için)
+        """
+        pass
+
+
+class JsonlTraceHook(StatsHook):
+    """
+    Her olayı JSON satırı olarak dosyaya ekler (run_start, stage, category, run_end, run_error)
+    Dosya ilk olayda açılır, on_close'ta kapanır
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def _write(self, stats, event, **fields):
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        line = {'event': event, 'run_id': stats.run_id, 'time': round(time.time(), 3), **fields}
+        self._file.write(json.dumps(line, ensure_ascii=False, default=str) + '\n')
+
+    def on_run_start(self, stats):
+        self._write(stats, 'run_start', kind=stats.kind, engine=stats.engine, workers=stats.workers)
+
+    def on_stage(self, stats, stage, seconds):
+        self._write(stats, 'stage', stage=stage, seconds=seconds)
+
+    def on_category(self, stats, record):
+        self._write(stats, 'category', **record)
+
+    def on_run_end(self, stats):
+        summary = stats.to_dict()
+        summary.pop('categories')
+        self._write(stats, 'run_end', **summary)
+
+    def on_run_error(self, stats, error):
+        self._write(stats, 'run_error', error=f"{type(error).__name__}: {error}")
+
+    def on_close(self, stats):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class RunStats:
+    """
+    Tek eğitim/güncelleme çalıştırmasının ölçümleri
+    stages: Toplu aşama süreleri (saniye)
+    categories: Kategori bazlı kayıtlar (kaynak, aşama süreleri, hata)
+    start_rss_mb / peak_rss_mb: Çalıştırma başındaki ve çalıştırma boyunca örneklenen en yüksek RSS
+    process_peak_rss_mb: Süreç ömrü boyunca tepe (önceki büyük çalıştırmalar dahil)
+    with RunStats(...) as stats: Çalıştırma hatayla kesilse de hook'lar kapatılır
+    """
+
+    def __init__(self, kind, engine, workers, hooks=None):
+        self.run_id = f"{int(time.time() * 1000):x}-{os.getpid()}"
+        self.kind = kind
+        self.engine = engine
+        self.workers = workers
+        self.hooks = list(hooks or [])
+        self.started = time.time()
+        self.seconds = None
+        self.stages = {}
+        self.categories = {}
+        self.start_rss_mb = current_rss_mb()
+        self.peak_rss_mb = self.start_rss_mb
+        self.process_peak_rss_mb = None
+        self.children_peak_rss_mb = None
+        self._clock = time.perf_counter()
+        self._sampled = self._clock
+        self._closed = False
+        self._emit('on_run_start')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc is not None and not self._closed:
+            self._emit('on_run_error', exc)
+        self.close()
+        return False
+
+    def _emit(self, method, *args):
+        for hook in self.hooks:
+            try:
+                getattr(hook, method)(self, *args)
+            except Exception as e:
+                print(f"⚠️  {type(hook).__name__}.{method}: {e}")
+
+    @contextmanager
+    def stage(self, name):
+        """
+        with stats.stage('prepare'): ...
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage(name, time.perf_counter() - start)
+
+    def sample_memory(self, force=False):
+        """
+        Anlık RSS'i oku, çalıştırma tepesini güncelle (force yoksa en fazla MEMORY_SAMPLE_INTERVAL'de bir)
+        """
+        now = time.perf_counter()
+        if not force and now - self._sampled < MEMORY_SAMPLE_INTERVAL:
+            return
+        self._sampled = now
+        rss = current_rss_mb()
+        if rss is not None:
+            self.peak_rss_mb = rss if self.peak_rss_mb is None else max(self.peak_rss_mb, rss)
+
+    def add_stage(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+        self.sample_memory(force=True)
+        self._emit('on_stage', name, seconds)
+
+    def record_category(self, category, source, timings=None, error=None, route=None, reason=None):
+        """
+        source: 'fit', 'batched', 'cache' veya 'skipped'
+        route, reason: Yönlendirmeli motorda seçilen model ve gerekçesi
+        """
+        record = {'category': str(category), 'source': source, 'error': error, 'route': route, 'reason': reason}
+        record.update({stage: (timings or {}).get(stage) for stage in CATEGORY_STAGES})
+        self.categories[str(category)] = record
+        self.sample_memory()
+        self._emit('on_category', record)
+        return record
+
+    def finish(self):
+        self.seconds = time.perf_counter() - self._clock
+        self.sample_memory(force=True)
+        process_peak = peak_rss_mb()
+        if process_peak is not None and self.peak_rss_mb is not None:
+            process_peak = max(process_peak, self.peak_rss_mb)
+        self.process_peak_rss_mb = process_peak
+        self.children_peak_rss_mb = peak_rss_mb(children=True)
+        self._emit('on_run_end')
+        self.close()
+        return self
+
+    def close(self):
+        """
+        Hook kaynaklarını bırak (bir kez; finish sonrası tekrar çağrılması etkisiz)
+        """
+        if not self._closed:
+            self._closed = True
+            self._emit('on_close')
+
+    def counts(self):
+        """
+        Kaynak bazında kategori sayıları; hata alanlar 'failed' altında
+        """
+        counts = {'fit': 0, 'batched': 0, 'cache': 0, 'skipped': 0, 'failed': 0}
+        for record in self.categories.values():
+            counts['failed' if record['error'] and record['source'] != 'skipped' else record['source']] += 1
+        return counts
+
+    def category_frame(self):
+        columns = ['category', 'source', 'route', *CATEGORY_STAGES, 'error', 'reason']
+        return pd.DataFrame(list(self.categories.values()), columns=columns)
+
+    def stage_frame(self):
+        return pd.DataFrame(
+            [{'stage': name, 'seconds': seconds} for name, seconds in self.stages.items()],
+            columns=['stage', 'seconds']
+        )
+
+    def route_counts(self):
+        """
+        Model rotası bazında kategori sayıları (yönlendirmesiz motorlarda boş)
+        """
+        counts = {}
+        for record in self.categories.values():
+            if record.get('route') is not None:
+                counts[record['route']] = counts.get(record['route'], 0) + 1
+        return counts
+
+    def to_dict(self):
+        return {
+            'run_id': self.run_id,
+            'kind': self.kind,
+            'engine': self.engine,
+            'workers': self.workers,
+            'started': self.started,
+            'seconds': self.seconds,
+            'stages': dict(self.stages),
+            'counts': self.counts(),
+            'start_rss_mb': self.start_rss_mb,
+            'peak_rss_mb': self.peak_rss_mb,
+            'process_peak_rss_mb': self.process_peak_rss_mb,
+            'children_peak_rss_mb': self.children_peak_rss_mb,
+            'categories': list(self.categories.values()),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        to_dict çıktısından (ör. servisten gelen ölçümler); hook bağlanmaz
+        """
+        stats = cls(data['kind'], data['engine'], data['workers'])
+        stats.run_id = data['run_id']
+        stats.started = data['started']
+        stats.seconds = data['seconds']
+        stats.stages = dict(data.get('stages', {}))
+        stats.categories = {record['category']: record for record in data.get('categories', [])}
+        stats.start_rss_mb = data.get('start_rss_mb')
+        stats.peak_rss_mb = data.get('peak_rss_mb')
+        stats.process_peak_rss_mb = data.get('process_peak_rss_mb')
+        stats.children_peak_rss_mb = data.get('children_peak_rss_mb')
+        return stats
+
+    def summary_line(self):
+        counts = self.counts()
+        memory = f" | çalıştırma tepe bellek {self.peak_rss_mb:,.0f} MB" if self.peak_rss_mb is not None else ''
+        routes = ', '.join(f"{route} {n}" for route, n in sorted(self.route_counts().items()))
+        routes = f" | rotalar: {routes}" if routes else ''
+        return (f"⏱️  {self.seconds or 0:.1f}s | {counts['fit'] + counts['batched']} eğitildi, "
+                f"{counts['cache']} cache, {counts['failed']} hata, {counts['skipped']} atlandı{memory}{routes}")
@@ -0,0 +1,315 @@
+import zlib
+import hashlib
+from collections.abc import Mapping, MutableMapping
+import numpy as np
+import pandas as pd
+
+# Her kategori için saklanan değerler (satır sırası)
+VALUE_COLUMNS = ('Forecast', 'Lower_Bound', 'Upper_Bound')
+
+
+def frame_rows(frame, months):
+    """
+    get_2026_forecast çıktısını (3, ay) dizisine çevir: tahmin, alt sınır, üst sınır
+    Eksik aylar NaN
+    """
+    rows = np.full((len(VALUE_COLUMNS), len(months)), np.nan)
+    positions = np.searchsorted(months, frame['Month'].to_numpy())
+    rows[:, positions] = frame[list(VALUE_COLUMNS)].to_numpy(dtype=float).T
+    return rows
+
+
+class ForecastStore(Mapping):
+    """
+    Tüm kategorilerin tahminleri tek kolon bazlı tabloda: (kategori x ay) dizileri
+    forecast, lower, upper: (n_kategori, n_ay) float64
+    Mapping arayüzü eski {kategori: DataFrame} kullanımını korur; DataFrame'ler istenince üretilir
+    """
+
+    def __init__(self, categories, months, forecast, lower, upper):
+        self.index = pd.Index(categories, dtype=object)
+        self.months = np.asarray(months, dtype=np.int64)
+        self.forecast = np.asarray(forecast, dtype=float).reshape(len(self.index), len(self.months))
+        self.lower = np.asarray(lower, dtype=float).reshape(self.forecast.shape)
+        self.upper = np.asarray(upper, dtype=float).reshape(self.forecast.shape)
+
+    @classmethod
+    def empty(cls, months):
+        shape = (0, len(months))
+        return cls([], months, np.empty(shape), np.empty(shape), np.empty(shape))
+
+    @classmethod
+    def from_rows(cls, categories, rows, months):
+        """
+        rows: Her kategori için frame_rows çıktısı (3, ay)
+        """
+        if not len(categories):
+            return cls.empty(months)
+        stacked = np.stack(rows, axis=1)
+        return cls(categories, months, stacked[0], stacked[1], stacked[2])
+
+    @classmethod
+    def from_frames(cls, frames, months=None):
+        """
+        Eski {kategori: DataFrame(Month, Forecast, Lower_Bound, Upper_Bound)} yapısından
+        """
+        if months is None:
+            months = np.unique(np.concatenate([f['Month'].to_numpy() for f in frames.values()])) \
+                if frames else np.arange(1, 13)
+        return cls.from_rows(list(frames), [frame_rows(f, months) for f in frames.values()], months)
+
+    # Mapping arayüzü (uyumluluk)
+    def __getitem__(self, category):
+        return self.frame(category)
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, category):
+        return category in self.index
+
+    @property
+    def categories(self):
+        return self.index.tolist()
+
+    def _position(self, category):
+        try:
+            return self.index.get_loc(category)
+        except KeyError:
+            raise KeyError(category) from None
+
+    def row(self, category):
+        """
+        Tek kategorinin (3, ay) dizisi
+        """
+        i = self._position(category)
+        return np.stack([self.forecast[i], self.lower[i], self.upper[i]])
+
+    def frame(self, category):
+        """
+        Tek kategori için eski format: Month, Forecast, Lower_Bound, Upper_Bound
+        Tahmini olmayan aylar (NaN) dahil edilmez
+        """
+        i = self._position(category)
+        present = ~np.isnan(self.forecast[i])
+        return pd.DataFrame({
+            'Month': self.months[present],
+            'Forecast': self.forecast[i, present],
+            'Lower_Bound': self.lower[i, present],
+            'Upper_Bound': self.upper[i, present],
+        })
+
+    def to_dict(self):
+        """
+        Eski {kategori: DataFrame} görünümü
+        """
+        return {category: self.frame(category) for category in self.index}
+
+    def to_long(self):
+        """
+        Uzun tablo: Category (categorical), Month, Forecast, Lower_Bound, Upper_Bound
+        """
+        n, h = self.forecast.shape
+        return pd.DataFrame({
+            'Category': pd.Categorical.from_codes(np.repeat(np.arange(n), h), categories=self.index),
+            'Month': np.tile(self.months, n),
+            'Forecast': self.forecast.ravel(),
+            'Lower_Bound': self.lower.ravel(),
+            'Upper_Bound': self.upper.ravel(),
+        })
+
+    def reindex(self, categories):
+        """
+        Verilen kategori sırasıyla yeni tablo; olmayan kategoriler NaN
+        """
+        positions = self.index.get_indexer(pd.Index(categories, dtype=object))
+        found = positions >= 0
+
+        def take(values):
+            out = np.full((len(positions), len(self.months)), np.nan)
+            out[found] = values[positions[found]]
+            return out
+
+        return ForecastStore(categories, self.months, take(self.forecast), take(self.lower), take(self.upper))
+
+    def update(self, other):
+        """
+        Diğer tablodaki kategorileri yerinde güncelle, yenilerini sona ekle
+        """
+        if not len(other):
+            return
+        positions = self.index.get_indexer(other.index)
+        existing = positions >= 0
+        for name in ('forecast', 'lower', 'upper'):
+            values = getattr(self, name)
+            values[positions[existing]] = getattr(other, name)[existing]
+            setattr(self, name, np.concatenate([values, getattr(other, name)[~existing]]))
+        self.index = self.index.append(other.index[~existing])
+
+    def totals(self):
+        """
+        Kategori bazında yıllık toplamlar (vektörel)
+        Dönüş: Kategori indeksli Total_Forecast, Lower_Bound, Upper_Bound, Avg_Monthly
+        """
+        return pd.DataFrame({
+            'Total_Forecast': np.nansum(self.forecast, axis=1),
+            'Lower_Bound': np.nansum(self.lower, axis=1),
+            'Upper_Bound': np.nansum(self.upper, axis=1),
+            'Avg_Monthly': np.nanmean(self.forecast, axis=1) if self.forecast.size else np.empty(0),
+        }, index=self.index)
+
+    def version(self):
+        """
+        İçerik özeti (kategoriler + aylar + diziler); görünüm/grafik cache anahtarı
+        Yerinde güncellemeden (update) sonra değişir
+        """
+        digest = hashlib.sha256('\x1f'.join(map(str, self.index)).encode('utf-8'))
+        for values in (self.months, self.forecast, self.lower, self.upper):
+            digest.update(np.ascontiguousarray(values).tobytes())
+        return digest.hexdigest()[:16]
+
+    def nbytes(self):
+        """
+        Dizilerin bellek kullanımı (byte)
+        """
+        return self.forecast.nbytes + self.lower.nbytes + self.upper.nbytes + self.index.memory_usage(deep=True)
+
+    def to_payload(self):
+        """
+        JSON uyumlu sözlük (NaN -> None); servis yanıtları için
+        """
+        def values(array):
+            return np.where(np.isnan(array), None, array).tolist()
+
+        return {
+            'categories': [str(category) for category in self.index],
+            'months': self.months.tolist(),
+            'forecast': values(self.forecast),
+            'lower': values(self.lower),
+            'upper': values(self.upper),
+        }
+
+    @classmethod
+    def from_payload(cls, payload):
+        """
+        to_payload çıktısından (None -> NaN)
+        """
+        months = payload['months']
+        if not payload['categories']:
+            return cls.empty(months)
+        return cls(
+            payload['categories'], months,
+            *(np.array(payload[name], dtype=float) for name in ('forecast', 'lower', 'upper'))
+        )
+
+
+# Model saklama politikaları (bkz. ModelStore)
+MODEL_RETENTION = ('all', 'compact', 'none')
+
+
+class ModelStore(MutableMapping):
+    """
+    Eğitilmiş modeller, saklama politikasına göre
+    all: Model nesneleri (en hızlı erişim, en çok bellek)
+    compact: zlib ile sıkıştırılmış model JSON'u; erişimde motorla yeniden kurulur
+    none: Sadece kategori adı; erişimde loader(kategori, refit) ile diskten yüklenir
+          veya yeniden eğitilir, sonuç saklanmaz
+    """
+
+    def __init__(self, engine, policy='all', loader=None):
+        if policy not in MODEL_RETENTION:
+            raise ValueError(f"Bilinmeyen model saklama politikası: {policy} (seçenekler: {', '.join(MODEL_RETENTION)})")
+        self.engine = engine
+        self.policy = policy
+        self.loader = loader
+        self._models = {}
+
+    def put(self, category, model=None, model_json=None):
+        """
+        Modeli politikaya göre sakla; model_json verilirse yeniden serileştirilmez
+        (all politikasında model yoksa JSON'dan kurulur)
+        """
+        if self.policy == 'all':
+            self._models[category] = model if model is not None else self.engine.from_json(model_json)
+        elif self.policy == 'compact':
+            model_json = model_json if model_json is not None else self.engine.to_json(model)
+            self._models[category] = zlib.compress(model_json.encode('utf-8'))
+        else:
+            self._models[category] = None
+
+    def __setitem__(self, category, model):
+        self.put(category, model)
+
+    def get(self, category, default=None, refit=True):
+        """
+        refit=False: none politikasında sadece diskten yüklenebiliyorsa döner (ör. warm start için)
+        """
+        if category not in self._models:
+            return default
+        value = self._models[category]
+        if value is None:
+            model = self.loader(category, refit) if self.loader is not None else None
+            return default if model is None else model
+        if isinstance(value, bytes):
+            return self.engine.from_json(zlib.decompress(value).decode('utf-8'))
+        return value
+
+    def __getitem__(self, category):
+        model = self.get(category)
+        if model is None:
+            raise KeyError(category)
+        return model
+
+    def __delitem__(self, category):
+        del self._models[category]
+
+    def __iter__(self):
+        return iter(self._models)
+
+    def __len__(self):
+        return len(self._models)
+
+    def __contains__(self, category):
+        return category in self._models
+
+    def clear(self):
+        self._models.clear()
+
+    def set_policy(self, policy):
+        """
+        Saklanan modelleri yeni politikaya çevir (none'a düşen modeller geri gelmez,
+        erişimde loader kullanılır)
+        """
+        if policy not in MODEL_RETENTION:
+            raise ValueError(f"Bilinmeyen model saklama politikası: {policy}")
+        self.policy = policy
+        for category, value in self._models.items():
+            if value is None:
+                continue
+            if policy == 'none':
+                self._models[category] = None
+            elif policy == 'compact' and not isinstance(value, bytes):
+                self._models[category] = zlib.compress(self.engine.to_json(value).encode('utf-8'))
+            elif policy == 'all' and isinstance(value, bytes):
+                self._models[category] = self.engine.from_json(zlib.decompress(value).decode('utf-8'))
+
+    def nbytes(self, sample=100):
+        """
+        Saklanan modellerin bellek kullanımı (byte)
+        Sıkıştırılmış modeller tam ölçülür, nesneler ilk sample model üzerinden tahmin edilir
+        Dönüş: (byte, tam ölçüm mü)
+        """
+        from ml_budget_stats import deep_sizeof
+
+        compact = [value for value in self._models.values() if isinstance(value, bytes)]
+        objects = [value for value in self._models.values() if value is not None and not isinstance(value, bytes)]
+        total = sum(len(value) for value in compact)
+        if not objects:
+            return total, True
+
+        seen = set()
+        measured = sum(deep_sizeof(model, seen) for model in objects[:sample])
+        return total + measured * len(objects) / min(len(objects), sample), len(objects) <= sample
@@ -0,0 +1,192 @@
+import os
+import json
+import math
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from ml_budget_forecaster import MLBudgetForecaster, resolve_n_jobs
+from ml_budget_backtest import evaluate_holdout
+from ml_budget_data import load_workbook
+
+# Varsayılan arama uzayı
+DEFAULT_GRID = {
+    'changepoint_prior_scale': [0.001, 0.01, 0.05, 0.1, 0.5],
+    'seasonality_mode': ['additive', 'multiplicative'],
+}
+
+
+def load_tuned_params(path='tuned_params.json'):
+    """
+    Kaydedilmiş kategori bazlı parametreler: {kategori: {...}}
+    Dosya yoksa boş sözlük
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        store = json.load(f)
+    return {category: entry['params'] for category, entry in store.items()}
+
+
+def _score_candidate(task):
+    """
+    İşçi süreçte tek (kategori, aday) çiftini holdout üzerinde skorla (sMAPE)
+    Hata veren aday sonsuz skor alır ve elenir
+    """
+    category, candidate, engine, params, train, test = task
+    try:
+        _, smape, _, _, _ = evaluate_holdout(engine, params, train, test)
+    except Exception:
+        smape = np.inf
+    return category, candidate, smape if np.isfinite(smape) else np.inf
+
+
+class HyperparameterTuner:
+    """
+    Kategori bazlı Prophet parametre araması
+    Izgara veya rastgele arama; son aylar holdout olarak skorlanır
+    Her turda daha eski bir holdout penceresi eklenir, kötü adaylar elenir (successive halving)
+    Kazanan parametreler JSON'a yazılır, sonraki çalıştırmalar aramayı tekrarlamaz
+    """
+
+    def __init__(self, forecaster=None, grid=None, n_iter=None, holdout=3, n_rounds=2,
+                 keep_fraction=0.5, min_train=12, n_jobs=1, store_path='tuned_params.json',
+                 random_state=0):
+        """
+        grid: {parametre: [değerler]} (varsayılan: DEFAULT_GRID)
+        n_iter: Verilirse ızgaradan rastgele n_iter aday seçilir
+        holdout: Her turda skorlanan ay sayısı
+        n_rounds: Holdout pencere sayısı (her turda adayların keep_fraction'ı kalır)
+        min_train: Aramaya girmek için gereken en kısa eğitim serisi (ay)
+        """
+        self.forecaster = forecaster or MLBudgetForecaster()
+        self.grid = grid or DEFAULT_GRID
+        self.n_iter = n_iter
+        self.holdout = holdout
+        self.n_rounds = n_rounds
+        self.keep_fraction = keep_fraction
+        self.min_train = min_train
+        self.n_jobs = n_jobs
+        self.store_path = store_path
+        self.random_state = random_state
+
+    def candidates(self):
+        """
+        Aranacak parametre kombinasyonları
+        """
+        names = sorted(self.grid)
+        combos = [dict(zip(names, values)) for values in itertools.product(*(self.grid[n] for n in names))]
+
+        if self.n_iter is not None and self.n_iter < len(combos):
+            rng = np.random.default_rng(self.random_state)
+            chosen = rng.choice(len(combos), size=self.n_iter, replace=False)
+            combos = [combos[i] for i in sorted(chosen)]
+
+        return combos
+
+    def _window(self, prophet_data, round_index):
+        """
+        round_index. holdout penceresi (0: en son aylar)
+        """
+        dates = np.sort(prophet_data['ds'].unique())
+        end = len(dates) - self.holdout * round_index
+        start = end - self.holdout
+        train = prophet_data[prophet_data['ds'] < dates[start]]
+        test = prophet_data[prophet_data['ds'].isin(dates[start:end])]
+        return train, test
+
+    def _load_store(self):
+        if not os.path.exists(self.store_path):
+            return {}
+        with open(self.store_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_store(self, store):
+        tmp_path = f"{self.store_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(store, f, ensure_ascii=False, indent=2, default=str)
+        os.replace(tmp_path, self.store_path)
+
+    def tune(self, df, force=False):
+        """
+        Tüm kategoriler için en iyi parametreleri bul ve kaydet
+        force=False: Daha önce ayarlanmış kategoriler atlanır
+        Dönüş: {kategori: parametreler} (kaydedilmiş olanlar dahil)
+        """
+        store = self._load_store()
+        combos = self.candidates()
+        engine = self.forecaster.engine
+        all_series = self.forecaster.prepare_all_categories(df)
+
+        # Arama için yeterli geçmişi olan ve henüz ayarlanmamış kategoriler
+        needed = self.min_train + self.holdout * self.n_rounds
+        pending = [
+            category for category, prophet_data in all_series.items()
+            if (force or str(category) not in store) and prophet_data['ds'].nunique() >= needed
+        ]
+
+        print(f"🎛️  {len(pending)} kategori için {len(combos)} aday aranıyor "
+              f"({len(store)} kategori daha önce ayarlanmış)\n")
+
+        alive = {category: list(range(len(combos))) for category in pending}
+        scores = {category: {c: [] for c in range(len(combos))} for category in pending}
+        workers = resolve_n_jobs(self.n_jobs)
+
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            for round_index in range(self.n_rounds):
+                tasks = []
+                for category in pending:
+                    train, test = self._window(all_series[category], round_index)
+                    for candidate in alive[category]:
+                        params = dict(self.forecaster.model_params, **combos[candidate])
+                        tasks.append((category, candidate, engine, params, train, test))
+
+                results = executor.map(_score_candidate, tasks) if executor else map(_score_candidate, tasks)
+                for category, candidate, smape in results:
+                    scores[category][candidate].append(smape)
+
+                # Ortalama skoru kötü olan adayları ele (son turda budama yok)
+                if round_index < self.n_rounds - 1:
+                    for category in pending:
+                        ranked = sorted(alive[category], key=lambda c: np.mean(scores[category][c]))
+                        keep = max(1, math.ceil(len(ranked) * self.keep_fraction))
+                        alive[category] = ranked[:keep]
+        finally:
+            if executor:
+                executor.shutdown()
+
+        for category in pending:
+            best = min(alive[category], key=lambda c: np.mean(scores[category][c]))
+            best_score = float(np.mean(scores[category][best]))
+            store[str(category)] = {
+                'params': combos[best],
+                'smape': best_score if np.isfinite(best_score) else None,
+                'rounds': self.n_rounds,
+                'holdout': self.holdout,
+            }
+            print(f"✅ {str(category):20s} - {combos[best]}  sMAPE: {best_score:6.2f}")
+
+        self._save_store(store)
+        return {category: entry['params'] for category, entry in store.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kategori bazlı Prophet parametre araması")
+    parser.add_argument('input', help="Veri dosyası (.xlsx Sayfa1 düzeni veya temiz .csv)")
+    parser.add_argument('--store', default='tuned_params.json')
+    parser.add_argument('--n-iter', type=int, default=None, help="Rastgele arama aday sayısı")
+    parser.add_argument('--holdout', type=int, default=3)
+    parser.add_argument('--rounds', type=int, default=2)
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    parser.add_argument('--force', action='store_true', help="Ayarlanmış kategorileri de yeniden ara")
+    args = parser.parse_args()
+
+    tuner = HyperparameterTuner(
+        n_iter=args.n_iter,
+        holdout=args.holdout,
+        n_rounds=args.rounds,
+        n_jobs=args.n_jobs,
+        store_path=args.store
+    )
+    tuner.tune(load_workbook(args.input), force=args.force)
@@ -0,0 +1,199 @@
+import math
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+# Grafikte tek tek gösterilen kategori sayısı; kalanlar tek "Diğer" çubuğunda
+DEFAULT_TOP_N = 20
+# Tablo sayfası başına satır
+DEFAULT_PAGE_SIZE = 50
+# Seçim kutularında istemciye gönderilen en fazla seçenek
+MAX_OPTIONS = 200
+OTHER_LABEL = 'Diğer'
+
+
+class FigureCache:
+    """
+    Süreç içi LRU grafik cache'i: anahtar -> Plotly figür JSON'u
+    Anahtar tahmin sürümünü (ForecastStore.version) içerdiğinden eski tahminlerin
+    grafikleri yeniden kullanılmaz, sadece LRU ile düşer
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key, build):
+        """
+        Cache'te yoksa build() ile figürü üret, JSON'unu sakla
+        Dönüş: Figür JSON'u (str)
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+        figure_json = build().to_json()
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = figure_json
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return figure_json
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ComparisonView:
+    """
+    Kategori karşılaştırmasının sunucu tarafı görünümü
+    Tablo tahmin sürümü başına bir kez hesaplanır; istemciye sadece grafik için ilk N + "Diğer"
+    satırları, tablo için istenen sayfa gider. Sıralamalar kolon başına bir kez hesaplanıp saklanır
+    """
+
+    def __init__(self, table, value_columns, growth_column, weight_column, version):
+        """
+        table: Kategori kolonu + değer kolonları + büyüme kolonları
+        value_columns: Grafikte gösterilen, "Diğer" satırında toplanan kolonlar
+        growth_column: Son kolon olarak gösterilen büyüme (%); "Diğer"de weight_column ağırlıklı
+        version: Tahmin sürümü (figür cache anahtarı)
+        """
+        self.table = table.reset_index(drop=True)
+        self.value_columns = list(value_columns)
+        self.growth_column = growth_column
+        self.weight_column = weight_column
+        self.version = version
+        self._orders = {}
+        self._names = None
+
+    @classmethod
+    def from_forecaster(cls, forecaster, df):
+        """
+        compare_with_actuals çıktısından uygulama etiketleriyle görünüm
+        Kolonlar: Kategori, önceki yıl, son yıl (tam yıla çevrilmiş), tahmin, yıllık tahmin, büyüme %
+        Büyüme son yıl ile yıllık tahmin arasındadır (pencere 12 aydan kısaysa tahmin x12/ay)
+        """
+        comparison = forecaster.compare_with_actuals(df)
+        comparison = comparison[comparison.columns[[0, 1, 2, 3, 4, 6]]]
+        last_year = int(comparison.columns[2].split('_')[1])
+        window = forecaster.window.label
+        value_columns = [str(last_year - 1), str(last_year), f"{window} ML", f"{window} ML (yıllık)"]
+        comparison.columns = ['Kategori', *value_columns, 'Büyüme %']
+        # Aynı tahmin farklı gerçekleşmelerle karşılaştırılabilir: sürüme tablo özeti de girer
+        actuals = pd.util.hash_pandas_object(comparison, index=False).to_numpy().tobytes()
+        version = f"{forecaster.forecasts.version()}-{hashlib.sha256(actuals).hexdigest()[:8]}"
+        return cls(comparison, value_columns, 'Büyüme %', value_columns[1], version)
+
+    def __len__(self):
+        return len(self.table)
+
+    @property
+    def sort_columns(self):
+        return [*self.value_columns, self.growth_column]
+
+    def order(self, by=None, ascending=False):
+        """
+        Satır sırası (pozisyonlar); NaN'lar sonda, eşitlikte kategori sırası korunur
+        """
+        by = by or self.value_columns[-1]
+        key = (by, ascending)
+        if key not in self._orders:
+            values = self.table[by].to_numpy(dtype=float)
+            values = np.where(np.isnan(values), np.inf if ascending else -np.inf, values)
+            self._orders[key] = np.argsort(values if ascending else -values, kind='stable')
+        return self._orders[key]
+
+    def top(self, n=DEFAULT_TOP_N, by=None):
+        """
+        En büyük n kategori + kalanların toplamı ("Diğer (k kategori)" satırı)
+        """
+        positions = self.order(by)
+        head = self.table.iloc[positions[:n]]
+        rest = self.table.iloc[positions[n:]]
+        if rest.empty:
+            return head.reset_index(drop=True)
+
+        other = {'Kategori': f"{OTHER_LABEL} ({len(rest):,} kategori)"}
+        for column in self.value_columns:
+            other[column] = rest[column].sum()
+        # Büyüme: son yıl ağırlıklı ortalama (grubun toplamlar üzerinden büyümesine eşit)
+        weights = rest[self.weight_column].to_numpy(dtype=float)
+        total = weights.sum()
+        other[self.growth_column] = (
+            float(np.dot(weights, rest[self.growth_column].to_numpy(dtype=float)) / total) if total > 0 else 0.0
+        )
+        return pd.concat([head, pd.DataFrame([other])], ignore_index=True)
+
+    def _matches(self, query):
+        if self._names is None:
+            self._names = self.table['Kategori'].astype(str).str.casefold()
+        return self._names.str.contains(query.casefold(), regex=False).to_numpy()
+
+    def count(self, query=None):
+        """
+        Aramayla eşleşen satır sayısı (query yoksa tümü)
+        """
+        return int(self._matches(query).sum()) if query else len(self.table)
+
+    def page(self, number=1, size=DEFAULT_PAGE_SIZE, by=None, ascending=False, query=None):
+        """
+        Sıralı (ve aramaya göre süzülmüş) tablonun tek sayfası
+        Sayfa numarası 1..pages(size, query) aralığına çekilir
+        """
+        positions = self.order(by, ascending)
+        if query:
+            positions = positions[self._matches(query)[positions]]
+        number = min(max(1, number), self.pages(size, query))
+        rows = positions[(number - 1) * size:number * size]
+        return self.table.iloc[rows].reset_index(drop=True)
+
+    def pages(self, size=DEFAULT_PAGE_SIZE, query=None):
+        return max(1, math.ceil(self.count(query) / size))
+
+    def options(self, query=None, limit=MAX_OPTIONS):
+        """
+        Seçim kutusu seçenekleri: tahmini en büyük (veya aramayla eşleşen) ilk limit kategori
+        """
+        positions = self.order()
+        if query:
+            positions = positions[self._matches(query)[positions]]
+        return self.table['Kategori'].to_numpy()[positions[:limit]].tolist()
+
+    def figure(self, n=DEFAULT_TOP_N, by=None, cache=None):
+        """
+        İlk n + "Diğer" gruplu çubuk grafik
+        cache verilirse JSON'u (sürüm, n, sıralama) anahtarıyla saklanır; dönüş her durumda Figure
+        """
+        import plotly.io as pio
+
+        by = by or self.value_columns[-1]
+        key = ('comparison', self.version, n, by)
+        if cache is None:
+            return self._build_figure(n, by)
+        return pio.from_json(cache.get_or_build(key, lambda: self._build_figure(n, by)))
+
+    def _build_figure(self, n, by):
+        import plotly.express as px
+
+        data = self.top(n, by)
+        title = "Kategori Bazında Yıllık Karşılaştırma"
+        if len(self.table) > n:
+            title += f" (ilk {n}, {by} sırasıyla)"
+        fig = px.bar(
+            data,
+            x='Kategori',
+            y=self.value_columns,
+            title=title,
+            barmode='group',
+            height=500
+        )
+        # Kategori sırası tablo sırası ("Diğer" en sonda)
+        fig.update_xaxes(type='category', categoryorder='array', categoryarray=data['Kategori'].tolist())
+        return fig
@@ -0,0 +1,53 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+# Modüller depo kökünde (paket değil): testler kökten import eder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def make_series():
+    """
+    Aylık (ds, y) serisi üretir
+    values verilmezse: level + trend * t + season * sin(2πt/12) + N(0, noise) (seed ile tekrarlanabilir)
+    """
+    def make(values=None, months=21, start='2024-01-01', level=100.0, trend=2.0, season=0.0, noise=0.0, seed=0):
+        if values is None:
+            rng = np.random.default_rng(seed)
+            t = np.arange(months)
+            values = level + trend * t + season * np.sin(2 * np.pi * t / 12) + rng.normal(0, noise, months)
+        values = np.asarray(values, dtype=float)
+        return pd.DataFrame({
+            'ds': pd.date_range(start, periods=len(values), freq='MS'),
+            'y': values,
+        })
+
+    return make
+
+
+@pytest.fixture(scope='session')
+def make_sales():
+    """
+    Sayfa1 düzeninde satış tablosu (Month, MainGroupDesc, Sales_2024, Sales_2025)
+    2025 verisi ilk actual_months ay için dolu, sonrası NaN; shift tüm 2025 değerlerine eklenir
+    """
+    def make(categories=('Gıda', 'İçecek', 'Temizlik'), actual_months=9, shift=0.0, noise=0.0, seed=0):
+        rng = np.random.default_rng(seed)
+        rows = []
+        for category in categories:
+            base = rng.uniform(100, 200)
+            for month in range(1, 13):
+                season = 1 + 0.3 * np.sin(2 * np.pi * month / 12)
+                rows.append({
+                    'Month': month,
+                    'MainGroupDesc': category,
+                    'Sales_2024': base * season,
+                    'Sales_2025': base * season * 1.1 + shift + rng.normal(0, noise)
+                    if month <= actual_months else np.nan,
+                })
+        return pd.DataFrame(rows)
+
+    return make
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import ml_budget_backtest
+from ml_budget_backtest import Backtester, forecast_metrics
+from ml_budget_forecaster import MLBudgetForecaster
+
+CATEGORIES = ('Gıda', 'İçecek', 'Temizlik')
+
+
+@pytest.fixture
+def backtester():
+    return Backtester(MLBudgetForecaster(engine='seasonal_naive'), horizon=3, min_train=12, step=3)
+
+
+def test_folds_roll_without_leakage(backtester, make_series):
+    series = make_series(months=21)
+    folds = backtester.make_folds(series)
+    assert [origin for origin, _, _ in folds] == [12, 15, 18]
+    for origin, train, test in folds:
+        assert len(train) == origin
+        assert len(test) == 3
+        # Test ayları eğitimin hemen ardından, eğitime sızmadan
+        assert train['ds'].max() < test['ds'].min()
+        assert (test['ds'].to_numpy() == series['ds'].to_numpy()[origin:origin + 3]).all()
+
+    # Son origin'de ufuktan az ay kalırsa kalanlar skorlanır
+    assert [len(test) for _, _, test in Backtester(horizon=3, min_train=19).make_folds(series)] == [2, 1]
+
+
+def test_metrics():
+    mape, smape, bias = forecast_metrics([100, 0, 200], [110, 10, 180])
+    assert mape == pytest.approx(10.0)
+    assert smape == pytest.approx((2 * 10 / 210 + 2 + 2 * 20 / 380) / 3 * 100)
+    assert bias == pytest.approx(0.0)
+
+
+def test_seasonal_naive_metrics(backtester, make_sales):
+    # 2025 = 1.1 x 2024: ilk origin'de (sadece 2024) büyüme bilinmez, sonrakilerde tahmin birebir
+    results = backtester.run(make_sales())
+    assert len(results) == len(CATEGORIES) * 3
+    assert (results['error'] == '').all()
+    assert (results['n_test'] == 3).all()
+
+    first = results[results['origin'] == 12]
+    np.testing.assert_allclose(first['mape'].astype(float), (1 - 1 / 1.1) * 100)
+    np.testing.assert_allclose(first['smape'].astype(float), 0.2 / 2.1 * 100)
+    np.testing.assert_allclose(first['bias'].astype(float), (1 / 1.1 - 1) * 100)
+    assert (first['train_end'] == '2024-12-01').all()
+
+    later = results[results['origin'] > 12]
+    np.testing.assert_allclose(later[['mape', 'smape', 'bias']].astype(float), 0.0, atol=1e-9)
+
+    summary = Backtester.summarize(results).set_index('config')
+    assert summary.loc['seasonal_naive', 'Folds'] == 9
+    assert summary.loc['seasonal_naive', 'Categories'] == 3
+    assert summary.loc['seasonal_naive', 'MAPE'] == pytest.approx((1 - 1 / 1.1) * 100 / 3)
+
+
+@pytest.mark.parametrize('extension', ['csv', 'parquet'])
+def test_resumes_from_partial_results(backtester, make_sales, tmp_path, monkeypatch, extension):
+    if extension == 'parquet':
+        pytest.importorskip('pyarrow')
+    df = make_sales()
+    path = str(tmp_path / f'sonuclar.{extension}')
+    full = backtester.run(df)
+
+    # Yarıda kesilen çalıştırma: ilk 4 fold yazılmış
+    calls = []
+    run_fold = ml_budget_backtest._run_fold
+
+    def interrupted(task):
+        if len(calls) == 4:
+            raise KeyboardInterrupt
+        calls.append(task)
+        return run_fold(task)
+
+    monkeypatch.setattr(ml_budget_backtest, '_run_fold', interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        backtester.run(df, results_path=path)
+
+    # Devamda sadece kalan fold'lar çalışır, sonuç tam çalıştırmayla aynı
+    calls.clear()
+    monkeypatch.setattr(ml_budget_backtest, '_run_fold', lambda task: calls.append(task) or run_fold(task))
+    resumed = backtester.run(df, results_path=path)
+    assert len(calls) == len(full) - 4
+    columns = ['config', 'category', 'origin', 'train_end', 'n_test', 'mape', 'smape', 'bias']
+    pd.testing.assert_frame_equal(resumed[columns], full[columns], check_dtype=False)
+
+    # Tamamlanmış sonuçlarla yeni fold yok
+    calls.clear()
+    backtester.run(df, results_path=path)
+    assert calls == []
+
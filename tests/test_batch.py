@@ -0,0 +1,68 @@
+import json
+import os
+
+import pytest
+
+from ml_budget_batch import MANIFEST, BatchRunner, expand_inputs
+
+
+@pytest.fixture
+def inputs(tmp_path, make_sales):
+    folder = tmp_path / 'bolgeler'
+    folder.mkdir()
+    for seed, name in enumerate(['ege', 'marmara', 'akdeniz']):
+        make_sales(seed=seed).to_csv(folder / f'{name}.csv', index=False)
+    # Kilit dosyası ve desteklenmeyen uzantı atlanır
+    (folder / '~$ege.xlsx').write_bytes(b'')
+    (folder / 'notlar.txt').write_text('-')
+    return expand_inputs([str(folder)])
+
+
+def _runner(out_dir, **settings):
+    return BatchRunner(
+        str(out_dir), engine='seasonal_naive', n_jobs=1, uncertainty_samples=0,
+        cache_dir=None, formats=('csv',), **settings
+    )
+
+
+def _statuses(report):
+    return dict(zip(report['input'].map(os.path.basename), report['status']))
+
+
+def test_outputs_and_resume(tmp_path, make_sales, inputs):
+    out_dir = tmp_path / 'sonuclar'
+    assert [os.path.basename(path) for path in inputs] == ['akdeniz.csv', 'ege.csv', 'marmara.csv']
+
+    report = _runner(out_dir).run(inputs)
+    assert set(report['status']) == {'done'}
+    assert (report['categories'] == 3).all()
+    for name in ['akdeniz', 'ege', 'marmara']:
+        files = sorted(os.listdir(out_dir / name))
+        assert files == sorted([MANIFEST, 'summary.csv', 'comparison.csv', 'detailed.csv'])
+        with open(out_dir / name / MANIFEST, encoding='utf-8') as f:
+            assert json.load(f)['outputs'] == ['summary.csv', 'comparison.csv', 'detailed.csv']
+    assert (out_dir / 'batch_report.csv').exists()
+
+    # İkinci çalıştırma: hepsi tamamlanmış
+    assert set(_runner(out_dir).run(inputs)['status']) == {'skipped'}
+
+    # Değişen girdi ve manifesti olmayan çıktı yeniden işlenir
+    make_sales(seed=0, shift=10.0).to_csv(inputs[1], index=False)
+    os.remove(out_dir / 'marmara' / MANIFEST)
+    assert _statuses(_runner(out_dir).run(inputs)) == {
+        'akdeniz.csv': 'skipped', 'ege.csv': 'done', 'marmara.csv': 'done'
+    }
+
+    # Ayar değişikliği ve force tamamlanmışları da yeniden işler
+    assert set(_runner(out_dir, horizon=6).run(inputs)['status']) == {'done'}
+    assert set(_runner(out_dir, horizon=6).run(inputs, force=True)['status']) == {'done'}
+
+
+def test_failed_input_does_not_stop_batch(tmp_path, inputs):
+    broken = tmp_path / 'bolgeler' / 'bozuk.csv'
+    broken.write_text('a,b\n1,2\n')
+    report = _runner(tmp_path / 'sonuclar').run([str(broken), *inputs])
+    statuses = _statuses(report)
+    assert statuses.pop('bozuk.csv') == 'failed'
+    assert set(statuses.values()) == {'done'}
+    assert not (tmp_path / 'sonuclar' / 'bozuk').exists()
@@ -0,0 +1,134 @@
+import json
+import os
+import threading
+
+import pandas as pd
+
+import ml_budget_cache
+from ml_budget_cache import ForecastCache
+from ml_budget_engines import MeanEngine
+from ml_budget_forecaster import MLBudgetForecaster
+
+PARAMS = {'seasonality_mode': 'additive', 'changepoint_prior_scale': 0.05}
+
+
+def test_key_stable_for_same_input(tmp_path, make_series):
+    cache = ForecastCache(str(tmp_path))
+    key = cache.make_key('Gıda', make_series(), PARAMS)
+    # Parametre sırası ve yeni DataFrame nesnesi anahtarı değiştirmez
+    reordered = dict(reversed(list(PARAMS.items())))
+    assert cache.make_key('Gıda', make_series(), reordered) == key
+    assert ForecastCache(str(tmp_path)).make_key('Gıda', make_series(), PARAMS) == key
+
+
+def test_key_changes_with_input(tmp_path, monkeypatch, make_series):
+    cache = ForecastCache(str(tmp_path))
+    data = make_series()
+    key = cache.make_key('Gıda', data, PARAMS)
+
+    changed = data.copy()
+    changed.loc[5, 'y'] += 1
+    assert cache.make_key('Gıda', changed, PARAMS) != key
+    assert cache.make_key('İçecek', data, PARAMS) != key
+    assert cache.make_key('Gıda', data, {**PARAMS, 'changepoint_prior_scale': 0.5}) != key
+    assert cache.make_key('Gıda', make_series(months=20), PARAMS) != key
+
+    monkeypatch.setattr(ml_budget_cache, 'CACHE_VERSION', ml_budget_cache.CACHE_VERSION + 1)
+    assert cache.make_key('Gıda', data, PARAMS) != key
+
+
+def test_put_get_round_trip(tmp_path, make_series):
+    cache = ForecastCache(str(tmp_path))
+    key = cache.make_key('Gıda', make_series(), PARAMS)
+    assert cache.get(key) is None
+
+    forecast = pd.DataFrame({'Month': [1, 2], 'Forecast': [10.0, 11.5]})
+    forecast.attrs['uncertainty_samples'] = 100
+    cache.put(key, '{"model": 1}', forecast)
+    model_json, cached = cache.get(key)
+    assert model_json == '{"model": 1}'
+    pd.testing.assert_frame_equal(cached, forecast)
+    assert cached.attrs == {'uncertainty_samples': 100}
+
+    cache.clear()
+    assert cache.get(key) is None
+
+
+def test_evicts_oldest_over_limit(tmp_path):
+    cache = ForecastCache(str(tmp_path), max_bytes=1)
+    forecast = pd.DataFrame({'Month': [1], 'Forecast': [1.0]})
+    cache.put('eski', '{}', forecast)
+    cache.put('yeni', '{}', forecast)
+    # Sınır tek kaydın altında: her yazımda eskiler silinir
+    assert cache.get('eski') is None
+
+
+class SimulatedEngine(MeanEngine):
+    """
+    Kategori kategori eğitilen, aralıkları simülasyonlu sayılan motor; fit ve predict çağrılarını sayar
+    """
+    batched = False
+    simulated = True
+
+    def __init__(self):
+        super().__init__()
+        self.fits = 0
+        self.samples = []
+
+    def fit(self, category_data, params, init=None):
+        self.fits += 1
+        return super().fit(category_data, params, init=init)
+
+    def predict(self, model, periods, uncertainty_samples=None):
+        self.samples.append(uncertainty_samples)
+        return super().predict(model, periods, uncertainty_samples)
+
+
+def test_sample_count_not_in_key():
+    point = MLBudgetForecaster(engine='seasonal_naive', uncertainty_samples=0)
+    full = MLBudgetForecaster(engine='seasonal_naive', uncertainty_samples=1000)
+    assert point.cache_params('Gıda') == full.cache_params('Gıda')
+
+
+def test_other_sample_count_predicts_from_cached_model(tmp_path, make_sales):
+    df = make_sales()
+    cache = ForecastCache(str(tmp_path))
+    MLBudgetForecaster(engine=SimulatedEngine(), cache=cache, uncertainty_samples=0).train_all_categories(df)
+
+    engine = SimulatedEngine()
+    forecaster = MLBudgetForecaster(engine=engine, cache=cache, uncertainty_samples=100)
+    forecaster.train_all_categories(df)
+    # Model cache'ten: eğitim yok, tahmin yeni simülasyon sayısıyla
+    assert forecaster.last_stats.counts()['cache'] == 3
+    assert engine.fits == 0
+    assert engine.samples == [100] * 3
+
+    # Yenilenen tahmin cache'e yazıldı: aynı sayıyla tekrar tahmin de yok
+    engine.samples.clear()
+    forecaster.train_all_categories(df)
+    assert engine.fits == 0 and engine.samples == []
+
+
+def test_concurrent_puts_same_key(tmp_path):
+    cache = ForecastCache(str(tmp_path))
+    errors = []
+
+    def write(n):
+        forecast = pd.DataFrame({'Month': list(range(1000)), 'Forecast': [float(n)] * 1000})
+        try:
+            for _ in range(20):
+                cache.put('ortak', json.dumps({'thread': n}), forecast)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    # Son yazılan kayıt bütün: model ve tahmin aynı thread'den
+    model_json, forecast = cache.get('ortak')
+    assert set(forecast['Forecast']) == {float(json.loads(model_json)['thread'])}
+    assert os.listdir(tmp_path) == ['ortak.json']
@@ -0,0 +1,110 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+import ml_budget_data
+from ml_budget_data import load_workbook, read_long, read_workbook
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'veri.csv'
+    pd.DataFrame({
+        'Month': np.tile(np.arange(1, 13), 2),
+        'MainGroupDesc': np.repeat(['Gıda', 'İçecek'], 12),
+        'Sales_2024': np.arange(24, dtype=float),
+        'Sales_2025': np.where(np.tile(np.arange(1, 13), 2) <= 9, np.arange(24, dtype=float), np.nan),
+    }).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def long_rows():
+    """
+    Düzensiz başlayıp biten seriler, karışık sırada; B'de aynı ay iki satır (mağazalar)
+    """
+    rows = pd.DataFrame({
+        'series_id': ['A'] * 30 + ['B'] * 12 + ['B', 'C'],
+        'period': [f"{2022 + m // 12}-{m % 12 + 1:02d}" for m in range(30)]
+                  + [f"2023-{m:02d}-15" for m in range(1, 13)] + ['2023-05', '2024-01'],
+        'value': np.r_[np.arange(30.0), np.full(12, 10.0), 5.0, 7.0],
+    })
+    return rows.sample(frac=1.0, random_state=0).reset_index(drop=True)
+
+
+def test_sheet_csv_is_compact(csv_path):
+    data = read_workbook(csv_path)
+    assert list(data.columns) == ['Month', 'MainGroupDesc', 'Sales_2024', 'Sales_2025']
+    assert data['MainGroupDesc'].dtype == 'category'
+    assert data['Sales_2025'].isna().sum() == 6
+
+
+def test_long_csv_chunks_match_single_read(tmp_path, long_rows):
+    path = str(tmp_path / 'uzun.csv')
+    long_rows.to_csv(path, index=False)
+
+    whole = read_workbook(path)
+    chunked = read_long(path, chunksize=7)
+    pd.testing.assert_frame_equal(chunked, whole)
+
+    assert list(whole.columns) == ['MainGroupDesc', 'ds', 'y']
+    assert whole['MainGroupDesc'].dtype == 'category'
+    # Seri ve ay sıralı, ay başına çevrilmiş
+    assert whole['MainGroupDesc'].astype(str).tolist() == ['A'] * 30 + ['B'] * 12 + ['C']
+    assert (whole['ds'].dt.day == 1).all()
+    assert whole.groupby('MainGroupDesc', observed=True)['ds'].is_monotonic_increasing.all()
+
+
+def test_long_duplicate_months_summed(tmp_path, long_rows):
+    path = str(tmp_path / 'uzun.csv')
+    long_rows.to_csv(path, index=False)
+    data = read_workbook(path).set_index(['MainGroupDesc', 'ds'])['y']
+
+    assert data[('B', pd.Timestamp('2023-05-01'))] == 15.0
+    assert data[('B', pd.Timestamp('2023-04-01'))] == 10.0
+    assert len(data.loc['B']) == 12
+
+
+def test_long_yyyymm_and_invalid_rows(tmp_path):
+    path = str(tmp_path / 'uzun.csv')
+    pd.DataFrame({
+        'Category': ['A', 'A', 'A', None],
+        'Date': [202401, 202402, 202403, 202401],
+        'Sales': [1.0, np.nan, 3.0, 4.0],
+    }).to_csv(path, index=False)
+
+    data = read_workbook(path)
+    assert data['ds'].tolist() == [pd.Timestamp('2024-01-01'), pd.Timestamp('2024-03-01')]
+    assert data['y'].tolist() == [1.0, 3.0]
+
+
+def test_long_parquet_matches_csv(tmp_path, long_rows):
+    pytest.importorskip('pyarrow')
+    csv = str(tmp_path / 'uzun.csv')
+    parquet = str(tmp_path / 'uzun.parquet')
+    long_rows.to_csv(csv, index=False)
+    long_rows.to_parquet(parquet, index=False)
+
+    pd.testing.assert_frame_equal(read_long(parquet, chunksize=5), read_workbook(csv))
+
+
+def test_ingest_cache_reused(tmp_path, csv_path):
+    pytest.importorskip('pyarrow')
+    cache_dir = str(tmp_path / 'ingest')
+    first = load_workbook(csv_path, cache_dir=cache_dir)
+    assert len(os.listdir(cache_dir)) == 1
+    second = load_workbook(csv_path, cache_dir=cache_dir)
+    pd.testing.assert_frame_equal(first, second)
+    assert len(os.listdir(cache_dir)) == 1
+
+
+def test_ingest_version_invalidates_cache(tmp_path, csv_path, monkeypatch):
+    pytest.importorskip('pyarrow')
+    cache_dir = str(tmp_path / 'ingest')
+    load_workbook(csv_path, cache_dir=cache_dir)
+    old = set(os.listdir(cache_dir))
+
+    monkeypatch.setattr(ml_budget_data, 'INGEST_VERSION', ml_budget_data.INGEST_VERSION + 1)
+    load_workbook(csv_path, cache_dir=cache_dir)
+    assert len(set(os.listdir(cache_dir)) - old) == 1
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def series(make_series):
+    def make(seed=0):
+        return make_series(season=30.0, noise=3.0, seed=seed)
+    return make
+
+
+def test_prophet_predict_does_not_change_model_samples(series):
+    pytest.importorskip('prophet')
+    from ml_budget_engines import ProphetEngine
+
+    engine = ProphetEngine()
+    model = engine.fit(series(), {'uncertainty_samples': 0})
+
+    point = engine.predict(model, 3)
+    engine.predict(model, 3, uncertainty_samples=50)
+    assert model.uncertainty_samples == 0
+    # Sonraki nokta tahmini simülasyon yapmaz
+    again = engine.predict(model, 3)
+    np.testing.assert_allclose(again['yhat'], point['yhat'])
+    assert engine.from_json(engine.to_json(model)).uncertainty_samples == 0
+
+
+ENGINE_NAMES = ['prophet', 'seasonal_naive', 'global', 'mean', 'zero', 'auto']
+
+
+@pytest.fixture(params=ENGINE_NAMES)
+def engine(request):
+    if request.param == 'prophet':
+        pytest.importorskip('prophet')
+    from ml_budget_engines import get_engine
+    return get_engine(request.param)
+
+
+def test_fit_predict_contract(engine, series):
+    model = engine.fit(series(), {'uncertainty_samples': 0})
+    # Simülasyon kapalıyken Prophet sınır kolonlarını üretmez; analitik motorlar ayarı yok sayar
+    forecast = engine.predict(model, 15, uncertainty_samples=50)
+
+    assert {'ds', 'yhat', 'yhat_lower', 'yhat_upper'} <= set(forecast.columns)
+    assert len(forecast) == 15
+    assert forecast['ds'].iloc[0] == pd.Timestamp('2025-10-01')
+    assert forecast['ds'].is_monotonic_increasing
+    assert forecast[['yhat', 'yhat_lower', 'yhat_upper']].notna().all().all()
+    assert (forecast['yhat_lower'] <= forecast['yhat_upper']).all()
+
+
+def test_json_round_trip(engine, series):
+    model = engine.fit(series(), {'uncertainty_samples': 0})
+    restored = engine.from_json(engine.to_json(model))
+    np.testing.assert_allclose(engine.predict(restored, 6)['yhat'], engine.predict(model, 6)['yhat'])
+
+
+def test_fit_predict_all_keeps_order(engine, series):
+    all_series = {f"K{i}": series(seed=i) for i in range(3)}
+    results = engine.fit_predict_all(all_series, {'uncertainty_samples': 0}, 15)
+    assert list(results) == list(all_series)
+    for model, forecast in results.values():
+        assert len(forecast) == 15
+
+
+def test_global_engine_is_pooled(series, make_series):
+    from ml_budget_engines import GlobalEngine, SeasonalNaiveEngine
+
+    assert GlobalEngine.pooled and not SeasonalNaiveEngine.pooled
+    engine = GlobalEngine()
+    base = {'A': series(seed=0), 'B': series(seed=1)}
+    other = dict(base, B=make_series(trend=0.0, season=-30.0))
+    first = engine.fit_predict_all(base, {}, 15)['A'][1]
+    second = engine.fit_predict_all(other, {}, 15)['A'][1]
+    # Ortak parametreler: B'nin verisi A'nın tahminini etkiler
+    assert not np.allclose(first['yhat'], second['yhat'])
+
+
+def test_batched_engine_uses_category_params(make_sales):
+    from ml_budget_engines import MeanEngine
+    from ml_budget_forecaster import MLBudgetForecaster
+
+    class ScaledMeanEngine(MeanEngine):
+        calls = []
+
+        def fit_predict_all(self, all_series, params, periods):
+            self.calls.append((sorted(all_series), params.get('scale', 1.0)))
+            results = super().fit_predict_all(all_series, params, periods)
+            scale = params.get('scale', 1.0)
+            return {c: (model, f.assign(yhat=f['yhat'] * scale)) for c, (model, f) in results.items()}
+
+    df = make_sales()
+    base = MLBudgetForecaster(engine=ScaledMeanEngine()).train_all_categories(df)
+    ScaledMeanEngine.calls.clear()
+    tuned = MLBudgetForecaster(
+        engine=ScaledMeanEngine(), category_params={'Gıda': {'scale': 2.0}}
+    ).train_all_categories(df)
+
+    # Aynı parametreli kategoriler tek çağrıda
+    assert sorted(ScaledMeanEngine.calls) == [(['Gıda'], 2.0), (['Temizlik', 'İçecek'], 1.0)]
+    assert tuned.categories == base.categories
+    np.testing.assert_allclose(tuned['Gıda']['Forecast'], 2 * base['Gıda']['Forecast'])
+    np.testing.assert_allclose(tuned['İçecek']['Forecast'], base['İçecek']['Forecast'])
+
+
+def test_unknown_engine_rejected():
+    from ml_budget_engines import get_engine
+
+    with pytest.raises(ValueError):
+        get_engine('arima')
@@ -0,0 +1,111 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml_budget_export import (
+    INDEX_SHEET, LONG_COLUMNS, MAX_SHEET_NAME, export_file, export_forecasts, sheet_names, write_workbook
+)
+from ml_budget_store import ForecastStore
+
+MONTHS = np.arange(1, 13)
+PREFIX = 'Kişisel Bakım ve Kozmetik Ürünleri'  # 31 karakterden uzun
+
+
+@pytest.fixture
+def store():
+    categories = [f'{PREFIX} - Şampuan', f'{PREFIX} - Sabun', 'Gıda/İçecek: [Soğuk]']
+    forecast = 100 + np.arange(len(categories) * len(MONTHS), dtype=float).reshape(len(categories), -1)
+    # Eksik aylar dışa aktarılmaz
+    forecast[1, :3] = np.nan
+    return ForecastStore(categories, MONTHS, forecast, forecast - 5, forecast + 5)
+
+
+def _expected_long(store):
+    long = store.to_long()
+    long = long[long['Forecast'].notna()].reset_index(drop=True)
+    return long.assign(Category=long['Category'].astype(str))
+
+
+def test_sheet_names_unique_after_truncation():
+    names = sheet_names([f'{PREFIX} A', f'{PREFIX} B', f'{PREFIX} C'])
+    assert all(len(name) <= MAX_SHEET_NAME for name in names)
+    assert names[0] == PREFIX[:MAX_SHEET_NAME].rstrip()
+    assert names[1].endswith(' (2)') and names[2].endswith(' (3)')
+    # Excel sayfa adlarını büyük/küçük harf duyarsız karşılaştırır
+    assert len({name.casefold() for name in names}) == 3
+    assert sheet_names(['Özet'], reserved=['özet']) == ['Özet (2)']
+
+
+def test_sheet_names_replace_invalid_characters():
+    assert sheet_names(['Gıda/İçecek: [Soğuk]', 'a*b?c\\d', "'Tırnak'", '']) == [
+        'Gıda_İçecek_ _Soğuk_', 'a_b_c_d', 'Tırnak', 'Kategori'
+    ]
+
+
+def test_workbook_round_trip(store, tmp_path):
+    openpyxl = pytest.importorskip('openpyxl')
+    path = tmp_path / 'tahmin.xlsx'
+    summary = pd.DataFrame({'Category': list(store.index), 'Total': store.forecast.sum(axis=1)})
+    write_workbook(store, path, sheets={'Özet': summary})
+
+    wb = openpyxl.load_workbook(path, read_only=True)
+    names = sheet_names(store.index, reserved=['Özet', INDEX_SHEET])
+    assert wb.sheetnames == ['Özet', INDEX_SHEET, *names]
+
+    index = list(wb[INDEX_SHEET].values)
+    assert index == [('Sheet', 'Category'), *zip(names, map(str, store.index))]
+
+    for i, name in enumerate(names):
+        rows = list(wb[name].values)
+        assert rows[0] == ('Month', 'Forecast', 'Lower_Bound', 'Upper_Bound')
+        present = ~np.isnan(store.forecast[i])
+        np.testing.assert_array_equal([row[0] for row in rows[1:]], MONTHS[present])
+        np.testing.assert_allclose([row[1:] for row in rows[1:]], np.column_stack([
+            store.forecast[i, present], store.lower[i, present], store.upper[i, present]
+        ]))
+    wb.close()
+
+
+def test_workbook_long_layout(store):
+    openpyxl = pytest.importorskip('openpyxl')
+    buffer = io.BytesIO()
+    export_forecasts(store, buffer, fmt='xlsx', layout='long', chunk_size=1)
+
+    rows = list(openpyxl.load_workbook(buffer, read_only=True)['Tahminler'].values)
+    assert list(rows[0]) == LONG_COLUMNS
+    pd.testing.assert_frame_equal(
+        pd.DataFrame(rows[1:], columns=LONG_COLUMNS), _expected_long(store), check_dtype=False
+    )
+
+
+def test_csv_matches_to_long(store, tmp_path):
+    path = tmp_path / 'tahmin.csv'
+    # Küçük bloklarla da tek başlık, aynı satırlar
+    export_forecasts(store, path, chunk_size=2)
+    pd.testing.assert_frame_equal(pd.read_csv(path), _expected_long(store), check_dtype=False)
+
+
+def test_parquet_matches_to_long(store, tmp_path):
+    pytest.importorskip('pyarrow')
+    path = tmp_path / 'tahmin.parquet'
+    export_forecasts(store, path, chunk_size=2)
+    result = pd.read_parquet(path)
+    pd.testing.assert_frame_equal(
+        result.assign(Category=result['Category'].astype(str)), _expected_long(store), check_dtype=False
+    )
+
+
+def test_export_file_is_readable_handle(store):
+    # st.download_button io.BufferedReader kabul eder; dosya başa sarılmış döner
+    with export_file(store, 'csv') as f:
+        assert isinstance(f, io.BufferedReader)
+        result = pd.read_csv(f)
+    pd.testing.assert_frame_equal(result, _expected_long(store), check_dtype=False)
+
+
+def test_empty_store_writes_header(tmp_path):
+    path = tmp_path / 'bos.csv'
+    export_forecasts(ForecastStore.empty(MONTHS), path)
+    assert path.read_text(encoding='utf-8').strip() == ','.join(LONG_COLUMNS)
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('scipy')
+
+from ml_budget_hierarchy import Hierarchy, TOTAL_NODE
+
+
+def _tree():
+    leaves = pd.DataFrame({
+        'MainGroupDesc': ['Gıda', 'Gıda', 'Temizlik'],
+        'SubGroupDesc': ['Süt', 'Et', 'Deterjan'],
+    })
+    return Hierarchy(['MainGroupDesc', 'SubGroupDesc'], leaves)
+
+
+def _base(hierarchy, widths, padded=3):
+    """
+    Tutarsız temel tahminler; son padded ay (2026 penceresindeki gibi) NaN
+    """
+    rng = np.random.default_rng(0)
+    months = 12
+    leaf_mean = rng.uniform(50, 150, size=(hierarchy.n_leaves, months))
+    mean = hierarchy.S @ leaf_mean + rng.normal(0, 20, size=(hierarchy.n_nodes, months))
+    mean[:, months - padded:] = np.nan
+    half = np.asarray(widths, dtype=float)[:, None] * np.ones(months)
+    return mean, mean - half, mean + half
+
+
+def test_bottom_up_sums_leaves():
+    hierarchy = _tree()
+    mean, lower, upper = _base(hierarchy, [10] * 6)
+    reconciled, _, _ = hierarchy.reconcile(mean, lower, upper, 'bottom_up')
+
+    leaves = slice(hierarchy.n_nodes - hierarchy.n_leaves, hierarchy.n_nodes)
+    np.testing.assert_allclose(reconciled[:, :9], hierarchy.S @ mean[leaves, :9])
+    np.testing.assert_allclose(reconciled[leaves, :9], mean[leaves, :9])
+    assert np.isnan(reconciled[:, 9:]).all()
+
+
+def test_mint_uses_interval_weights_on_padded_window():
+    hierarchy = _tree()
+    assert hierarchy.nodes['Node'].iloc[0] == TOTAL_NODE
+    # Toplam düğümün aralığı çok dar: MinT toplamı temel tahmine çekmeli
+    widths = [0.01, 10, 10, 10, 10, 10]
+    mean, lower, upper = _base(hierarchy, widths)
+
+    mint, _, _ = hierarchy.reconcile(mean, lower, upper, 'mint')
+    S = hierarchy.S.toarray()
+    ols = S @ np.linalg.lstsq(S, mean[:, :9], rcond=None)[0]
+
+    assert np.isnan(mint[:, 9:]).all()
+    np.testing.assert_allclose(mint[0, :9], mean[0, :9], rtol=1e-4)
+    assert not np.allclose(mint[:, :9], ols)
+    # Tutarlılık: her düğüm yapraklarının toplamı
+    leaves = slice(hierarchy.n_nodes - hierarchy.n_leaves, hierarchy.n_nodes)
+    np.testing.assert_allclose(mint[:, :9], S @ mint[leaves, :9])
+
+
+def test_mint_equal_widths_matches_ols():
+    hierarchy = _tree()
+    mean, lower, upper = _base(hierarchy, [10] * 6)
+
+    mint, _, _ = hierarchy.reconcile(mean, lower, upper, 'mint')
+    S = hierarchy.S.toarray()
+    ols = S @ np.linalg.lstsq(S, mean[:, :9], rcond=None)[0]
+
+    np.testing.assert_allclose(mint[:, :9], ols, rtol=1e-6)
+
+
+def test_mint_missing_node_month_is_ignored():
+    hierarchy = _tree()
+    mean, lower, upper = _base(hierarchy, [0.01, 10, 10, 10, 10, 10])
+    # Toplam düğümün ilk ayda tahmini yok: o ay yapraklar belirler, diğer aylar etkilenmez
+    mean[0, 0] = lower[0, 0] = upper[0, 0] = np.nan
+
+    mint, _, _ = hierarchy.reconcile(mean, lower, upper, 'mint')
+
+    assert np.isfinite(mint[:, :9]).all()
+    np.testing.assert_allclose(mint[0, 1:9], mean[0, 1:9], rtol=1e-4)
+
+
+def test_unknown_method():
+    hierarchy = _tree()
+    mean, lower, upper = _base(hierarchy, [10] * 6)
+    with pytest.raises(ValueError):
+        hierarchy.reconcile(mean, lower, upper, 'ols')
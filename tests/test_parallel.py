@@ -0,0 +1,93 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from ml_budget_engines import MeanEngine
+from ml_budget_forecaster import MLBudgetForecaster
+
+
+class NoisyMeanEngine(MeanEngine):
+    """
+    Kategori kategori eğitilen, tahminine global np.random'dan gürültü ekleyen motor (Prophet simülasyonu gibi)
+    """
+    batched = False
+    simulated = True
+
+    def predict(self, model, periods, uncertainty_samples=None):
+        forecast = super().predict(model, periods, uncertainty_samples)
+        return forecast.assign(yhat=forecast['yhat'] + np.random.normal(0, 1, len(forecast)))
+
+
+def test_parallel_matches_serial(make_sales):
+    pytest.importorskip('prophet')
+    df = make_sales(noise=5.0)
+    results = {}
+    for n_jobs in (1, 2):
+        forecaster = MLBudgetForecaster(engine='prophet', uncertainty_samples=50)
+        forecaster.train_all_categories(df, n_jobs=n_jobs)
+        assert forecaster.last_stats.workers == n_jobs
+        assert forecaster.last_stats.counts()['fit'] == 3
+        results[n_jobs] = forecaster
+
+    serial, parallel = results[1], results[2]
+    assert parallel.forecasts.categories == serial.forecasts.categories
+    # Aynı kategori seed'i: aralık simülasyonu da aynı
+    for name in ('forecast', 'lower', 'upper'):
+        np.testing.assert_allclose(getattr(parallel.forecasts, name), getattr(serial.forecasts, name), rtol=1e-6)
+    assert set(parallel.models) == set(serial.models)
+
+
+def test_parallel_matches_serial_without_prophet(make_sales):
+    df = make_sales()
+    results = {}
+    for n_jobs in (1, 2):
+        forecaster = MLBudgetForecaster(engine=NoisyMeanEngine())
+        forecaster.train_all_categories(df, n_jobs=n_jobs)
+        assert forecaster.last_stats.workers == n_jobs
+        results[n_jobs] = forecaster.forecasts
+
+    assert results[2].categories == results[1].categories
+    for name in ('forecast', 'lower', 'upper'):
+        np.testing.assert_array_equal(getattr(results[2], name), getattr(results[1], name))
+
+
+def test_concurrent_intervals_match_serial(make_sales):
+    forecaster = MLBudgetForecaster(engine=NoisyMeanEngine())
+    forecaster.train_all_categories(make_sales())
+    categories = list(forecaster.models) * 20
+    expected = [forecaster.forecast_intervals(category) for category in categories]
+
+    # Paylaşılan forecaster'a thread'lerden (Streamlit oturumları, JobService) aynı anda istek
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(forecaster.forecast_intervals, categories))
+    for result, frame in zip(results, expected):
+        np.testing.assert_array_equal(result['Forecast'], frame['Forecast'])
+
+
+def test_shared_executor_reused(make_sales):
+    pytest.importorskip('prophet')
+    df = make_sales()
+    forecaster = MLBudgetForecaster(engine='prophet', uncertainty_samples=0, n_jobs=2)
+    with forecaster.create_executor() as executor:
+        forecaster.executor = executor
+        first = forecaster.train_all_categories(df)
+        second = forecaster.train_all_categories(df)
+    np.testing.assert_allclose(second.forecast, first.forecast, equal_nan=True)
+
+
+def test_category_seed_keeps_caller_random_state(make_sales):
+    df = make_sales()
+    np.random.seed(7)
+    expected = np.random.random(3)
+
+    np.random.seed(7)
+    forecaster = MLBudgetForecaster(engine=NoisyMeanEngine())
+    first = forecaster.train_all_categories(df)
+    forecaster.forecast_intervals('Gıda')
+    # Kategori seed'leri çağıranın RNG akışını değiştirmez
+    np.testing.assert_array_equal(np.random.random(3), expected)
+
+    # Global durumdan bağımsız: aynı kategori aynı simülasyon
+    again = MLBudgetForecaster(engine=NoisyMeanEngine()).train_all_categories(df)
+    np.testing.assert_array_equal(again.forecast, first.forecast)
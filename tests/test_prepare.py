@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from ml_budget_forecaster import MLBudgetForecaster, prepare_all_series
+
+
+def _per_category(df, category):
+    """
+    Eski hesap: kategori filtrelenir, yıl kolonları ayrı ayrı uzun formata çevrilir, tarih metinden kurulur
+    """
+    df = df[df['MainGroupDesc'] == category].copy()
+    frames = []
+    for year in (2024, 2025):
+        data = df[df[f'Sales_{year}'].notna()][['Month', f'Sales_{year}']].copy()
+        data['Year'] = year
+        frames.append(data.rename(columns={f'Sales_{year}': 'Sales'}))
+    combined = pd.concat(frames, ignore_index=True)
+    combined['Month'] = combined['Month'].astype(int)
+    combined['ds'] = pd.to_datetime(
+        combined['Year'].astype(str) + '-' + combined['Month'].astype(str).str.zfill(2) + '-01'
+    )
+    combined['y'] = combined['Sales']
+    return combined[['ds', 'y']].sort_values('ds')
+
+
+def test_one_pass_matches_per_category(make_sales):
+    df = make_sales(categories=('Gıda', 'İçecek', 'Temizlik', 'Kozmetik'), actual_months=7, noise=5.0)
+    # Sıfır satışlı aylar seride kalır, boş hücreler düşer
+    df.loc[(df['MainGroupDesc'] == 'İçecek') & df['Month'].isin([2, 3]), 'Sales_2024'] = 0.0
+    df.loc[(df['MainGroupDesc'] == 'Kozmetik') & (df['Month'] == 5), 'Sales_2025'] = 0.0
+    df.loc[(df['MainGroupDesc'] == 'Temizlik') & (df['Month'] == 4), 'Sales_2024'] = np.nan
+    # Satır sırası karışık: kategoriler ve aylar iç içe
+    df = df.sample(frac=1, random_state=0).reset_index(drop=True)
+
+    series = prepare_all_series(df)
+    assert list(series) == list(pd.unique(df['MainGroupDesc']))
+    for category, frame in series.items():
+        expected = _per_category(df, category)
+        assert list(frame.columns) == ['ds', 'y']
+        assert frame['ds'].is_monotonic_increasing
+        np.testing.assert_array_equal(frame['ds'].to_numpy(), expected['ds'].to_numpy())
+        np.testing.assert_array_equal(frame['y'].to_numpy(), expected['y'].to_numpy())
+
+    assert (series['İçecek']['y'] == 0).sum() == 2
+    assert len(series['Temizlik']) == 12 + 7 - 1
+
+    # Kategori bazlı yol da aynı seriyi verir
+    forecaster = MLBudgetForecaster(engine='seasonal_naive')
+    for category, frame in series.items():
+        single = forecaster.prepare_data_for_prophet(df, category)
+        np.testing.assert_array_equal(single['ds'].to_numpy(), frame['ds'].to_numpy())
+        np.testing.assert_array_equal(single['y'].to_numpy(), frame['y'].to_numpy())
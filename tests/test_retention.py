@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml_budget_cache import ForecastCache
+from ml_budget_engines import MeanEngine, SeasonalNaiveEngine
+from ml_budget_forecaster import MLBudgetForecaster
+from ml_budget_store import ModelStore
+
+
+class CountingEngine(MeanEngine):
+    """
+    Kategori kategori (seri yol) eğitilen, to_json çağrılarını sayan motor
+    """
+    batched = False
+
+    def __init__(self):
+        super().__init__()
+        self.serialized = 0
+
+    def to_json(self, model):
+        self.serialized += 1
+        return super().to_json(model)
+
+
+@pytest.fixture
+def series(make_series):
+    return make_series(trend=1.0)
+
+
+def test_model_store_policies(series):
+    engine = SeasonalNaiveEngine()
+    model = engine.fit(series, {})
+
+    store = ModelStore(engine, 'all')
+    store['Gıda'] = model
+    assert store['Gıda'] is model
+
+    store.set_policy('compact')
+    assert isinstance(store._models['Gıda'], bytes)
+    np.testing.assert_allclose(store['Gıda'].history['y'], model.history['y'])
+    assert store.nbytes() == (len(store._models['Gıda']), True)
+
+    store.set_policy('all')
+    assert not isinstance(store._models['Gıda'], bytes)
+
+    store.set_policy('none')
+    # Loader yok: kategori bilinir ama model geri gelmez
+    assert 'Gıda' in store
+    assert store.get('Gıda') is None
+    with pytest.raises(KeyError):
+        store['Gıda']
+    assert store.nbytes() == (0, True)
+
+
+def test_model_store_none_uses_loader(series):
+    engine = SeasonalNaiveEngine()
+    calls = []
+
+    def loader(category, refit):
+        calls.append((category, refit))
+        return engine.fit(series, {}) if refit else None
+
+    store = ModelStore(engine, 'none', loader=loader)
+    store.put('Gıda', engine.fit(series, {}))
+    assert store.get('Gıda', refit=False) is None
+    assert store['Gıda'] is not None
+    assert calls == [('Gıda', False), ('Gıda', True)]
+
+
+def test_unknown_policy_rejected():
+    with pytest.raises(ValueError):
+        ModelStore(SeasonalNaiveEngine(), 'hepsi')
+    with pytest.raises(ValueError):
+        ModelStore(SeasonalNaiveEngine()).set_policy('hepsi')
+    with pytest.raises(ValueError):
+        MLBudgetForecaster(engine='seasonal_naive', model_retention='hepsi')
+
+
+def test_none_policy_rejected_for_pooled_engine():
+    with pytest.raises(ValueError):
+        MLBudgetForecaster(engine='global', model_retention='none')
+
+
+def test_intervals_same_across_policies(make_sales):
+    df = make_sales(noise=5.0)
+    results = {}
+    for policy in ('all', 'compact', 'none'):
+        forecaster = MLBudgetForecaster(engine='seasonal_naive', model_retention=policy)
+        forecaster.train_all_categories(df, n_jobs=1)
+        assert len(forecaster.models) == 3
+        results[policy] = forecaster.forecast_intervals('İçecek')
+
+    pd.testing.assert_frame_equal(results['compact'], results['all'])
+    pd.testing.assert_frame_equal(results['none'], results['all'])
+
+
+@pytest.mark.parametrize('use_cache', [False, True])
+def test_compact_serializes_each_model_once(tmp_path, make_sales, use_cache):
+    engine = CountingEngine()
+    cache = ForecastCache(str(tmp_path)) if use_cache else None
+    forecaster = MLBudgetForecaster(engine=engine, model_retention='compact', cache=cache)
+    forecaster.train_all_categories(make_sales(), n_jobs=1)
+
+    # Tek JSON hem cache'e hem sıkıştırılmış ModelStore'a yazılır
+    assert engine.serialized == 3
+    assert all(isinstance(value, bytes) for value in forecaster.models._models.values())
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml_budget_engines import AutoEngine
+from ml_budget_routing import ROUTING_THRESHOLDS, profile_series, route_series
+
+
+@pytest.fixture
+def seasonal(make_series):
+    def make(noise=0.0):
+        return make_series(trend=0.0, season=40.0, noise=noise)
+    return make
+
+
+@pytest.fixture
+def trending(make_series):
+    # Sayfa1 düzeni: 21 ay, sezonsuz gürültülü trend -> Prophet
+    return make_series(level=200.0, trend=3.0, noise=30.0)
+
+
+@pytest.fixture
+def routes(make_series, seasonal, trending):
+    rng = np.random.default_rng(1)
+    all_series = {
+        'sıfır': make_series(np.r_[rng.uniform(10, 20, 9), np.zeros(12)]),
+        'kısa': make_series(rng.uniform(50, 150, 8)),
+        'seyrek': make_series(np.where(np.arange(21) % 3 == 0, 100.0, 0.0)),
+        'düz': make_series(100 + rng.normal(0, 1, 21)),
+        'sezonlu': seasonal(noise=1),
+        'trendli': trending,
+    }
+    return route_series(profile_series(all_series))
+
+
+def test_routes_by_profile(routes):
+    assert routes['model'].to_dict() == {
+        'sıfır': 'zero',
+        'kısa': 'mean',
+        'seyrek': 'mean',
+        'düz': 'mean',
+        'sezonlu': 'seasonal_naive',
+        'trendli': 'prophet',
+    }
+    assert routes['reason'].notna().all()
+
+
+def test_sheet_layout_reaches_prophet():
+    # 2024 + 2025'in 9 ayı: Prophet eşiğine ulaşmalı
+    assert ROUTING_THRESHOLDS['min_prophet_length'] <= 21
+
+
+def test_threshold_override(trending):
+    routes = route_series(profile_series({'trendli': trending}), {'min_prophet_length': 24})
+    assert routes.at['trendli', 'model'] != 'prophet'
+
+
+def test_profile_depends_only_on_own_series(make_series, seasonal):
+    a = {'a': seasonal(noise=5)}
+    b = dict(a, b=make_series(np.arange(40.0), start='2020-01-01'))
+    pd.testing.assert_series_equal(profile_series(a).loc['a'], profile_series(b).loc['a'])
+
+
+def test_auto_engine_fit_matches_batched_route(make_series, seasonal):
+    engine = AutoEngine()
+    all_series = {'sezonlu': seasonal(noise=1), 'kısa': make_series(np.arange(1.0, 9.0))}
+    batched = engine.fit_predict_all(all_series, {}, 12)
+    for category, series in all_series.items():
+        model = engine.fit(series, {})
+        assert model.route == batched[category][0].route
+        forecast = engine.predict(model, 12)
+        np.testing.assert_allclose(forecast['yhat'], batched[category][1]['yhat'])
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml_budget_scenario import BASE_SCENARIO, ScenarioEngine
+from ml_budget_store import ForecastStore
+
+MONTHS = np.arange(1, 13)
+CATEGORIES = ['Gıda', 'İçecek', 'Temizlik', 'Kozmetik']
+
+# (kategoriler, büyüme %, sezonsellik, aylar) ayarları sırayla uygulanır
+ADJUSTMENTS = [
+    (['Gıda', 'İçecek'], 10, 1.0, None),
+    (['İçecek'], None, 1.5, [6, 7, 8]),
+    (['Temizlik'], -20, 0.8, [12]),
+    (['Gıda'], 5, None, None),
+]
+
+
+@pytest.fixture
+def store():
+    rng = np.random.default_rng(0)
+    forecast = rng.uniform(50, 150, (len(CATEGORIES), len(MONTHS)))
+    # Tahmini olmayan aylar toplamlara girmez
+    forecast[3, :4] = np.nan
+    return ForecastStore(CATEGORIES, MONTHS, forecast, forecast * 0.9, forecast * 1.1)
+
+
+def _pandas_adjusted(store):
+    """
+    Eski hibrit mod hesabı: kategori kategori DataFrame üzerinde
+    Adjusted = Forecast * (1 + büyüme/100) * sezonsellik (sezonsellik sadece seçili aylarda)
+    """
+    growth = {category: 0.0 for category in CATEGORIES}
+    season = {category: pd.Series(1.0, index=MONTHS) for category in CATEGORIES}
+    for categories, growth_rate, seasonality, months in ADJUSTMENTS:
+        for category in categories:
+            if growth_rate is not None:
+                growth[category] = growth_rate
+            if seasonality is not None:
+                season[category].loc[months if months is not None else MONTHS] = seasonality
+
+    frames = {}
+    for category in CATEGORIES:
+        frame = store[category].copy()
+        factor = frame['Month'].map(season[category]).to_numpy()
+        frame['Adjusted'] = frame['Forecast'] * (1 + growth[category] / 100) * factor
+        frames[category] = frame
+    return frames
+
+
+@pytest.fixture
+def engine(store):
+    engine = ScenarioEngine(store)
+    engine.create('İyimser')
+    for categories, growth, seasonality, months in ADJUSTMENTS:
+        engine.adjust('İyimser', categories, growth=growth, seasonality=seasonality, months=months)
+    return engine
+
+
+def test_matches_per_category_pandas(store, engine):
+    expected = _pandas_adjusted(store)
+    applied = engine.apply('İyimser')
+    for category, frame in expected.items():
+        rows = engine.rows('İyimser', category)
+        np.testing.assert_allclose(rows['Adjusted'], frame['Adjusted'])
+        np.testing.assert_allclose(applied[category]['Forecast'], frame['Adjusted'])
+        # Aralık sınırları aynı çarpanla
+        np.testing.assert_allclose(applied[category]['Upper_Bound'], frame['Upper_Bound'] * frame['Adjusted'] / frame['Forecast'])
+
+    # Temel senaryo ML tahmini
+    np.testing.assert_allclose(engine.apply(BASE_SCENARIO).forecast, store.forecast)
+
+
+def test_portfolio_totals(store, engine):
+    expected = pd.concat(_pandas_adjusted(store).values())
+    portfolio = engine.portfolio('İyimser')
+    assert portfolio['ml_total'] == pytest.approx(expected['Forecast'].sum())
+    assert portfolio['adjusted_total'] == pytest.approx(expected['Adjusted'].sum())
+    assert portfolio['adjusted_categories'] == 3
+
+    # Birikimli aylık toplamlar baştan hesapla aynı
+    monthly = engine.monthly(['İyimser'])
+    np.testing.assert_allclose(monthly['İyimser'], expected.groupby('Month')['Adjusted'].sum().to_numpy())
+    engine.refresh()
+    np.testing.assert_allclose(engine.monthly(['İyimser'])['İyimser'], monthly['İyimser'])
+
+    totals = engine.category_totals('İyimser').set_index('Category')
+    assert totals['Adjusted_Total'].sum() == pytest.approx(portfolio['adjusted_total'])
+
+    engine.reset('İyimser')
+    assert engine.portfolio('İyimser')['adjusted_total'] == pytest.approx(portfolio['ml_total'])
+    assert engine.portfolio('İyimser')['adjusted_categories'] == 0
+
+
+def test_save_load_and_compare(store, engine, tmp_path):
+    engine.create('Kötümser', source='İyimser')
+    engine.adjust('Kötümser', growth=-10)
+    path = tmp_path / 'senaryolar.json'
+    engine.save(path)
+
+    loaded = ScenarioEngine(store)
+    assert loaded.load(path) == [BASE_SCENARIO, 'İyimser', 'Kötümser']
+    for name in engine.names():
+        np.testing.assert_allclose(loaded.scenarios[name].multipliers, engine.scenarios[name].multipliers)
+    pd.testing.assert_frame_equal(loaded.compare(), engine.compare())
+    pd.testing.assert_frame_equal(loaded.monthly(), engine.monthly())
+
+    compared = engine.compare(['İyimser', 'Kötümser']).set_index('scenario')
+    assert compared.loc['Kötümser', 'adjusted_total'] < compared.loc['İyimser', 'adjusted_total']
+    assert compared.loc['Kötümser', 'adjusted_categories'] == len(CATEGORIES)
+
+
+def test_invalid_input(engine):
+    with pytest.raises(KeyError):
+        engine.adjust('İyimser', ['Yok'], growth=5)
+    with pytest.raises(ValueError):
+        engine.adjust('İyimser', seasonality=1.2, months=[13])
+    with pytest.raises(ValueError):
+        engine.adjust('İyimser', seasonality=0)
+    with pytest.raises(KeyError):
+        engine.portfolio('Yok')
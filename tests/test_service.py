@@ -0,0 +1,134 @@
+import io
+import socket
+import contextlib
+import asyncio
+import threading
+import pytest
+
+from ml_budget_service import JobService, ServiceClient, ServiceError, RemoteForecaster
+
+
+@pytest.fixture(scope='module')
+def csv_bytes(make_sales):
+    def make(shift=0.0):
+        buffer = io.BytesIO()
+        make_sales(shift=shift).to_csv(buffer, index=False)
+        return buffer.getvalue()
+    return make
+
+
+@contextlib.contextmanager
+def _serving(**settings):
+    """
+    Servisi boş bir portta ayrı thread'deki olay döngüsünde çalıştır, istemci döndür
+    """
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+
+    service = JobService(n_jobs=1, uncertainty_samples=0, cache_dir=None, **settings)
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(service.serve('127.0.0.1', port))
+
+    def run():
+        try:
+            loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+
+    client = ServiceClient(f"http://127.0.0.1:{port}", timeout=30)
+    for _ in range(100):
+        try:
+            client.health()
+            break
+        except (OSError, ServiceError):
+            threading.Event().wait(0.05)
+    try:
+        yield client
+    finally:
+        loop.call_soon_threadsafe(task.cancel)
+        thread.join(timeout=5)
+
+
+@pytest.fixture(scope='module')
+def client():
+    with _serving(engine='seasonal_naive') as client:
+        yield client
+
+
+@pytest.fixture(scope='module')
+def job(client, csv_bytes):
+    job = client.submit(csv_bytes(), name='veri.csv')
+    client.wait(job['id'], timeout=60)
+    return job
+
+
+def test_same_data_and_settings_deduplicated(client, job, csv_bytes):
+    again = client.submit(csv_bytes(), name='baska_ad.csv')
+    assert again['id'] == job['id']
+    assert again['deduplicated'] is True
+
+    other_data = client.submit(csv_bytes(shift=1.0), name='veri.csv')
+    other_settings = client.submit(csv_bytes(), name='veri.csv', uncertainty_samples=10)
+    assert len({job['id'], other_data['id'], other_settings['id']}) == 3
+    assert other_data['deduplicated'] is False
+    for other in (other_data, other_settings):
+        client.wait(other['id'], timeout=60)
+
+
+def test_result_and_intervals(client, job):
+    forecaster = client.forecaster(job['id'])
+    assert isinstance(forecaster, RemoteForecaster)
+    assert not hasattr(forecaster, 'update_with_actuals')
+    assert len(forecaster.forecasts) == 3
+    assert set(forecaster.get_summary()['Category']) == {'Gıda', 'İçecek', 'Temizlik'}
+
+    intervals = forecaster.forecast_intervals('Gıda', 20)
+    assert list(intervals.columns) == ['Month', 'Forecast', 'Lower_Bound', 'Upper_Bound']
+    assert (intervals['Upper_Bound'] >= intervals['Lower_Bound']).all()
+
+
+@pytest.mark.parametrize('params, status', [
+    ({'category': 'Gıda', 'samples': 'abc'}, 400),
+    ({'category': 'Gıda', 'samples': -5}, 400),
+    ({'samples': 10}, 400),
+    ({'category': 'Yok', 'samples': 10}, 404),
+])
+def test_interval_errors(client, job, params, status):
+    with pytest.raises(ServiceError) as error:
+        client._json('GET', f"/jobs/{job['id']}/intervals", params)
+    assert error.value.status == status
+
+
+@pytest.mark.parametrize('params, empty, status', [
+    ({'samples': 'abc'}, False, 400),
+    ({'samples': -1}, False, 400),
+    ({'engine': 'yok'}, False, 400),
+    ({}, True, 400),
+])
+def test_submit_errors(client, csv_bytes, params, empty, status):
+    data = b'' if empty else csv_bytes()
+    with pytest.raises(ServiceError) as error:
+        client._json('POST', '/jobs', dict(params, name='veri.csv'), data)
+    assert error.value.status == status
+
+
+def test_unknown_job_and_route(client):
+    for path in ('/jobs/yok', '/bilinmeyen'):
+        with pytest.raises(ServiceError) as error:
+            client._json('GET', path)
+        assert error.value.status == 404
+
+
+def test_pooled_engine_keeps_models_without_retention(csv_bytes):
+    # 'none' ortak parametreli motorda kullanılamaz: iş başına 'compact'a çıkar (bkz. BatchRunner)
+    with _serving(engine='seasonal_naive', model_retention='none') as client:
+        for engine in ('global', 'seasonal_naive'):
+            job = client.submit(csv_bytes(), name='veri.csv', engine=engine)
+            client.wait(job['id'], timeout=60)
+            forecaster = client.forecaster(job['id'])
+            intervals = forecaster.forecast_intervals('Gıda', 20)
+            assert intervals['Month'].tolist() == forecaster.forecasts['Gıda']['Month'].tolist()
@@ -0,0 +1,15 @@
+import os
+
+import pytest
+
+from benchmarks.startup_time import APP_FILE, MODULES, REPO_ROOT, heavy_app_imports, measure_module
+
+
+@pytest.mark.parametrize('module', MODULES)
+def test_module_loads_no_heavy_packages(module):
+    assert measure_module(module)[2] == []
+
+
+def test_app_has_no_module_level_heavy_imports():
+    assert heavy_app_imports(os.path.join(REPO_ROOT, APP_FILE)) == []
+
@@ -0,0 +1,81 @@
+import json
+
+import numpy as np
+import pytest
+
+from ml_budget_engines import MeanEngine
+from ml_budget_forecaster import MLBudgetForecaster
+from ml_budget_stats import RunStats, StatsHook, current_rss_mb, peak_rss_mb
+
+pytestmark = pytest.mark.skipif(current_rss_mb() is None, reason="RSS okunamıyor")
+
+
+def test_process_peak_not_below_current():
+    assert peak_rss_mb() >= current_rss_mb()
+
+
+def test_run_peak_is_per_run():
+    # Büyük bir çalıştırma süreç tepesini yükseltir
+    big = RunStats('train', 'test', 1)
+    block = np.ones(200 * 1024 * 1024 // 8)
+    big.add_stage('alloc', 0.0)
+    del block
+    big.finish()
+
+    small = RunStats('train', 'test', 1)
+    small.record_category('a', 'fit', {'fit': 0.1})
+    small.finish()
+
+    assert big.peak_rss_mb - big.start_rss_mb > 150
+    # Sonraki küçük çalıştırma eski tepeyi raporlamaz, süreç tepesi ayrı alanda
+    assert small.peak_rss_mb < big.peak_rss_mb - 150
+    # VmHWM sayfa sayaçları gecikmeli toplandığından küçük sapma olabilir
+    assert small.process_peak_rss_mb >= big.peak_rss_mb - 1
+    assert small.process_peak_rss_mb >= small.peak_rss_mb
+    assert small.start_rss_mb <= small.peak_rss_mb
+
+
+def test_round_trip():
+    stats = RunStats('train', 'test', 1)
+    stats.record_category('a', 'fit', {'fit': 0.1})
+    stats.finish()
+    restored = RunStats.from_dict(stats.to_dict())
+    assert restored.peak_rss_mb == stats.peak_rss_mb
+    assert restored.process_peak_rss_mb == stats.process_peak_rss_mb
+    assert restored.counts() == stats.counts()
+
+
+class RecordingHook(StatsHook):
+    def __init__(self):
+        self.events = []
+
+    def on_run_error(self, stats, error):
+        self.events.append(('run_error', str(error)))
+
+    def on_run_end(self, stats):
+        self.events.append(('run_end', None))
+
+    def on_close(self, stats):
+        self.events.append(('close', None))
+
+
+def test_trace_closed_when_run_fails(tmp_path, make_sales):
+    path = tmp_path / 'trace.jsonl'
+    hook = RecordingHook()
+    forecaster = MLBudgetForecaster(engine=MeanEngine(), hooks=[hook], trace_path=str(path))
+
+    def interrupt(done, total):
+        raise RuntimeError('kesildi')
+
+    with pytest.raises(RuntimeError):
+        forecaster.train_all_categories(make_sales(), progress=interrupt)
+    assert hook.events == [('run_error', 'kesildi'), ('close', None)]
+    # Satırlar diske yazılmış, dosya kapalı
+    events = [json.loads(line)['event'] for line in path.read_text(encoding='utf-8').splitlines()]
+    assert events[0] == 'run_start' and events[-1] == 'run_error'
+
+    hook.events.clear()
+    forecaster.train_all_categories(make_sales())
+    assert hook.events == [('run_end', None), ('close', None)]
+    events = [json.loads(line)['event'] for line in path.read_text(encoding='utf-8').splitlines()]
+    assert events[-1] == 'run_end'
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml_budget_store import ForecastStore, frame_rows
+
+MONTHS = np.arange(1, 13)
+
+
+def _frame(level, months=MONTHS):
+    forecast = level + np.arange(len(months), dtype=float)
+    return pd.DataFrame({
+        'Month': months,
+        'Forecast': forecast,
+        'Lower_Bound': forecast - 5,
+        'Upper_Bound': forecast + 5,
+    })
+
+
+@pytest.fixture
+def store():
+    return ForecastStore.from_frames({'Gıda': _frame(100), 'İçecek': _frame(50, np.arange(4, 13))})
+
+
+def test_frame_round_trip(store):
+    assert list(store) == ['Gıda', 'İçecek']
+    pd.testing.assert_frame_equal(store['Gıda'], _frame(100))
+    # Eksik aylar NaN tutulur, frame'de görünmez
+    assert np.isnan(store.row('İçecek')[:, :3]).all()
+    pd.testing.assert_frame_equal(store['İçecek'], _frame(50, np.arange(4, 13)))
+    np.testing.assert_array_equal(frame_rows(_frame(100), MONTHS), store.row('Gıda'))
+    with pytest.raises(KeyError):
+        store['Yok']
+
+
+def test_to_long_and_totals(store):
+    long = store.to_long()
+    assert len(long) == 2 * len(MONTHS)
+    assert list(long['Category'].cat.categories) == ['Gıda', 'İçecek']
+    first = long[long['Category'] == 'Gıda']
+    np.testing.assert_allclose(first['Forecast'], _frame(100)['Forecast'])
+
+    totals = store.totals()
+    assert totals.loc['Gıda', 'Total_Forecast'] == pytest.approx(_frame(100)['Forecast'].sum())
+    assert totals.loc['İçecek', 'Total_Forecast'] == pytest.approx(_frame(50, np.arange(4, 13))['Forecast'].sum())
+
+
+def test_update_changes_version(store):
+    before = store.version()
+    other = ForecastStore.from_frames({'İçecek': _frame(70), 'Tatlı': _frame(10)}, MONTHS)
+    store.update(other)
+
+    assert list(store) == ['Gıda', 'İçecek', 'Tatlı']
+    pd.testing.assert_frame_equal(store['İçecek'], _frame(70))
+    pd.testing.assert_frame_equal(store['Gıda'], _frame(100))
+    assert store.version() != before
+
+
+def test_reindex_missing_is_nan(store):
+    reindexed = store.reindex(['İçecek', 'Yok'])
+    assert list(reindexed) == ['İçecek', 'Yok']
+    assert np.isnan(reindexed.forecast[1]).all()
+    assert reindexed['Yok'].empty
+
+
+def test_payload_round_trip(store):
+    restored = ForecastStore.from_payload(store.to_payload())
+    assert restored.version() == store.version()
+    assert store.to_payload()['forecast'][1][0] is None
+
+    empty = ForecastStore.from_payload(ForecastStore.empty(MONTHS).to_payload())
+    assert len(empty) == 0
+    assert empty.forecast.shape == (0, len(MONTHS))
@@ -0,0 +1,107 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ml_budget_tuning
+from ml_budget_engines import MeanEngine
+from ml_budget_forecaster import MLBudgetForecaster
+from ml_budget_tuning import HyperparameterTuner, load_tuned_params
+
+# Düz serilerde en iyi ölçek 1; 1.2, 0.8'den iyi (sMAPE 2*0.2/2.2 < 2*0.2/1.8)
+GRID = {'scale': [0.5, 0.8, 1.0, 1.2, 2.0]}
+
+
+class ScaledMeanEngine(MeanEngine):
+    """
+    Ortalama tahminini params['scale'] ile çarpan ucuz, deterministik motor
+    """
+
+    def fit(self, category_data, params, init=None):
+        model = super().fit(category_data, params, init=init)
+        model.scale = params['scale']
+        return model
+
+    def predict(self, model, periods, uncertainty_samples=None):
+        forecast = super().predict(model, periods, uncertainty_samples)
+        return forecast.assign(yhat=forecast['yhat'] * model.scale)
+
+
+@pytest.fixture
+def df():
+    # Gıda ve İçecek 21 ay (12 + 3 tur x 3 ay), Kısa aramaya girmez
+    frames = []
+    for category, level, months in [('Gıda', 100.0, 21), ('İçecek', 40.0, 24), ('Kısa', 10.0, 18)]:
+        frames.append(pd.DataFrame({
+            'MainGroupDesc': category,
+            'ds': pd.date_range('2023-01-01', periods=months, freq='MS'),
+            'y': level,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+@pytest.fixture
+def tuner(tmp_path):
+    return HyperparameterTuner(
+        MLBudgetForecaster(engine=ScaledMeanEngine()), grid=GRID, holdout=3, n_rounds=3,
+        keep_fraction=0.5, min_train=12, store_path=str(tmp_path / 'tuned_params.json')
+    )
+
+
+@pytest.fixture
+def scored(monkeypatch):
+    """
+    Skorlanan (kategori, aday, tur) kayıtları
+    """
+    calls = []
+    score = ml_budget_tuning._score_candidate
+
+    def record(task):
+        category, candidate, _, _, _, test = task
+        calls.append((category, GRID['scale'][candidate], test['ds'].min()))
+        return score(task)
+
+    monkeypatch.setattr(ml_budget_tuning, '_score_candidate', record)
+    return calls
+
+
+def test_successive_halving_keeps_top_fraction(tuner, df, scored):
+    best = tuner.tune(df)
+
+    for category in ['Gıda', 'İçecek']:
+        rungs = {}
+        for name, scale, window in scored:
+            if name == category:
+                rungs.setdefault(window, []).append(scale)
+        # En son pencere önce; her turda ceil(yarısı) en iyi aday kalır
+        assert [sorted(scales) for _, scales in sorted(rungs.items(), reverse=True)] == [
+            [0.5, 0.8, 1.0, 1.2, 2.0], [0.8, 1.0, 1.2], [1.0, 1.2]
+        ]
+    assert {name for name, _, _ in scored} == {'Gıda', 'İçecek'}
+
+    assert best == {'Gıda': {'scale': 1.0}, 'İçecek': {'scale': 1.0}}
+    with open(tuner.store_path, encoding='utf-8') as f:
+        store = json.load(f)
+    assert set(store) == {'Gıda', 'İçecek'}
+    assert store['Gıda'] == {'params': {'scale': 1.0}, 'smape': 0.0, 'rounds': 3, 'holdout': 3}
+    assert load_tuned_params(tuner.store_path) == best
+
+
+def test_tuned_categories_are_skipped(tuner, df, scored):
+    first = tuner.tune(df)
+    scored.clear()
+    assert tuner.tune(df) == first
+    assert scored == []
+
+    tuner.tune(df, force=True)
+    assert len(scored) == 2 * (5 + 3 + 2)
+
+
+def test_candidates(tuner):
+    assert tuner.candidates() == [{'scale': scale} for scale in GRID['scale']]
+    tuner.n_iter = 3
+    sampled = tuner.candidates()
+    assert len(sampled) == 3 and sampled == tuner.candidates()
+    assert all(candidate in [{'scale': scale} for scale in GRID['scale']] for candidate in sampled)
+    assert np.unique([c['scale'] for c in sampled]).size == 3
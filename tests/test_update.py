@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml_budget_engines import MeanEngine
+from ml_budget_forecaster import MLBudgetForecaster
+
+
+class WarmMeanEngine(MeanEngine):
+    """
+    Kategori kategori eğitilen, warm start destekli ortalama motoru; fit çağrılarını kaydeder
+    failing: Bu kategorilerin fit'i hata verir
+    """
+    batched = False
+
+    def __init__(self):
+        super().__init__()
+        self.fits = []
+        self.failing = set()
+
+    def warm_start(self, model):
+        return {'level': model.level}
+
+    def fit(self, category_data, params, init=None):
+        category = category_data.attrs['category']
+        self.fits.append((category, init))
+        if category in self.failing:
+            raise RuntimeError('fit hatası')
+        return super().fit(category_data, params, init=init)
+
+
+@pytest.fixture
+def forecaster(make_sales):
+    engine = WarmMeanEngine()
+    forecaster = MLBudgetForecaster(engine=engine, uncertainty_samples=0, n_jobs=1)
+    # fit'e gelen seriden kategori okunabilsin
+    prepare = forecaster.prepare_all_categories
+
+    def tagged(df):
+        series = prepare(df)
+        for category, frame in series.items():
+            frame.attrs['category'] = category
+        return series
+
+    forecaster.prepare_all_categories = tagged
+    forecaster.train_all_categories(make_sales())
+    engine.fits.clear()
+    return forecaster
+
+
+def _actuals(values, month=10):
+    """
+    Sayfa1 düzeninde yeni ay gerçekleşmeleri: sadece Sales_2025 dolu
+    """
+    return pd.DataFrame({
+        'Month': month,
+        'MainGroupDesc': list(values),
+        'Sales_2024': np.nan,
+        'Sales_2025': list(values.values()),
+    })
+
+
+def test_update_refits_only_changed_categories(forecaster):
+    before = {category: forecaster.forecasts[category]['Forecast'].to_numpy() for category in forecaster.forecasts.categories}
+    level = forecaster.models.get('Gıda').level
+
+    updated = forecaster.update_with_actuals(_actuals({'Gıda': 10_000.0}))
+    assert updated.categories == ['Gıda']
+    assert forecaster.last_stats.kind == 'update'
+    assert list(forecaster.last_stats.categories) == ['Gıda']
+    # Önceki modelin parametreleri warm start olarak motora verilir
+    assert forecaster.engine.fits == [('Gıda', {'level': level})]
+
+    assert forecaster.series['Gıda']['y'].iloc[-1] == 10_000.0
+    assert forecaster.forecasts['Gıda']['Forecast'].iloc[0] > before['Gıda'][0]
+    for category in ('İçecek', 'Temizlik'):
+        np.testing.assert_array_equal(forecaster.forecasts[category]['Forecast'], before[category])
+
+
+def test_unchanged_categories_are_not_refit(forecaster):
+    # İçecek satırı gelir ama gerçekleşmesi boş: serisi değişmez, eğitilmez
+    updated = forecaster.update_with_actuals(_actuals({'Gıda': 500.0, 'İçecek': np.nan}))
+    assert updated.categories == ['Gıda']
+    assert [category for category, _ in forecaster.engine.fits] == ['Gıda']
+
+    # Hiçbir seri değişmezse eğitim yok
+    assert forecaster.update_with_actuals(_actuals({'İçecek': np.nan})).categories == []
+    assert [category for category, _ in forecaster.engine.fits] == ['Gıda']
+
+
+def test_failed_refit_keeps_previous_forecast(forecaster):
+    before = forecaster.forecasts['Temizlik']['Forecast'].to_numpy()
+    forecaster.engine.failing.add('Temizlik')
+
+    updated = forecaster.update_with_actuals(_actuals({'Gıda': 500.0, 'Temizlik': 500.0}))
+    assert updated.categories == ['Gıda']
+    assert forecaster.last_stats.categories['Temizlik']['error'] == 'fit hatası'
+    np.testing.assert_array_equal(forecaster.forecasts['Temizlik']['Forecast'], before)
+    assert sorted(forecaster.forecasts.categories) == ['Gıda', 'Temizlik', 'İçecek']
@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml_budget_forecaster import MLBudgetForecaster, ForecastWindow, LEGACY_WINDOW
+
+
+@pytest.fixture
+def sheet_forecaster(make_sales):
+    df = make_sales(noise=5.0)
+    forecaster = MLBudgetForecaster(engine='seasonal_naive', uncertainty_samples=0)
+    forecaster.train_all_categories(df, n_jobs=1)
+    return forecaster, df
+
+
+def test_comparison_growth_uses_annualized_forecast(sheet_forecaster):
+    forecaster, df = sheet_forecaster
+    comparison = forecaster.compare_with_actuals(df).set_index('Category')
+    assert list(comparison.columns) == [
+        'Sales_2024', 'Sales_2025_Est', 'Forecast_2026', 'Forecast_2026_Annualized',
+        'Growth_24_25_%', 'Growth_25_26_%',
+    ]
+
+    # Sayfa1: 2025'in 9 ayı gözlenmiş, 2026 penceresinde 9 tahminli ay (son aydan 12 adım)
+    months = forecaster.forecasts['Gıda']['Month']
+    assert months.tolist() == list(range(1, 10))
+    actual_2025 = df.groupby('MainGroupDesc')['Sales_2025'].sum()
+    np.testing.assert_allclose(comparison['Sales_2025_Est'], actual_2025[comparison.index] * 12 / 9)
+    np.testing.assert_allclose(comparison['Forecast_2026_Annualized'], comparison['Forecast_2026'] * 12 / 9)
+
+    # Gösterilen büyüme gösterilen kolonlardan hesaplanabilir
+    expected = (comparison['Forecast_2026_Annualized'] / comparison['Sales_2025_Est'] - 1) * 100
+    np.testing.assert_allclose(comparison['Growth_25_26_%'], expected)
+
+
+def test_portfolio_totals_match_comparison(sheet_forecaster):
+    forecaster, df = sheet_forecaster
+    comparison = forecaster.compare_with_actuals(df)
+    totals = forecaster.portfolio_totals(df)
+
+    assert totals['window'] == '2026'
+    assert totals['forecast'] == pytest.approx(comparison['Forecast_2026'].sum())
+    assert totals['forecast_annualized'] == pytest.approx(comparison['Forecast_2026_Annualized'].sum())
+    assert totals['growth'] == pytest.approx(
+        (totals['forecast_annualized'] / totals['sales_last_estimated'] - 1) * 100
+    )
+
+
+def test_comparison_view_shows_annualized_column(sheet_forecaster):
+    from ml_budget_views import ComparisonView
+
+    forecaster, df = sheet_forecaster
+    view = ComparisonView.from_forecaster(forecaster, df)
+    assert view.value_columns == ['2024', '2025', '2026 ML', '2026 ML (yıllık)']
+    assert list(view.table.columns) == ['Kategori', *view.value_columns, 'Büyüme %']
+
+
+@pytest.fixture
+def long_frame():
+    """
+    Uzun düzen: A 2021-01..2024-06, B 2023-03..2024-03 (erken biten), C 2024-01..2024-06 (kısa)
+    """
+    rng = np.random.default_rng(0)
+    parts = []
+    for name, start, end in [('A', '2021-01', '2024-06'), ('B', '2023-03', '2024-03'), ('C', '2024-01', '2024-06')]:
+        ds = pd.date_range(start, end, freq='MS')
+        parts.append(pd.DataFrame({'MainGroupDesc': name, 'ds': ds, 'y': rng.uniform(50, 150, len(ds))}))
+    data = pd.concat(parts, ignore_index=True)
+    data['MainGroupDesc'] = data['MainGroupDesc'].astype('category')
+    return data
+
+
+def test_calendar_year_window():
+    window = ForecastWindow.for_year(2026)
+    assert window.calendar_year
+    assert window.label == '2026'
+    assert window.labels.tolist() == list(range(1, 13))
+    # Pencere sonuna kadar: 2025-09'dan 15 adım
+    assert window.periods(np.datetime64('2025-09')) == 15
+    assert window.positions(np.array(['2025-12', '2026-01', '2026-12', '2027-01'], dtype='datetime64[M]')).tolist() \
+        == [-1, 0, 11, -1]
+    assert ForecastWindow.from_key(window.key()) == window
+
+
+def test_rolling_window_labels():
+    window = ForecastWindow.after(np.datetime64('2024-06'), 12)
+    assert not window.calendar_year
+    assert window.labels[0] == 202407 and window.labels[-1] == 202506
+    assert window.label == '202407_202506'
+    assert window.periods(np.datetime64('2024-03')) == 15
+    assert ForecastWindow.after(np.datetime64('2024-06'), 6) != window
+
+
+def test_sheet_layout_uses_legacy_window(sheet_forecaster):
+    forecaster, df = sheet_forecaster
+    assert forecaster.window == LEGACY_WINDOW
+    # Eski davranış: her seri son ayından 12 adım, sadece 2026 ayları tutulur
+    assert LEGACY_WINDOW.periods(np.datetime64('2025-09')) == 12
+    assert forecaster.forecasts.months.tolist() == list(range(1, 13))
+    series = forecaster.series['Gıda']
+    legacy = forecaster.engine.predict(forecaster.engine.fit(series, {}), 12)
+    legacy = legacy[legacy['ds'].dt.year == 2026]
+    np.testing.assert_allclose(forecaster.forecasts['Gıda']['Forecast'], legacy['yhat'])
+    assert forecaster.forecasts['Gıda']['Month'].tolist() == legacy['ds'].dt.month.tolist()
+
+    # horizon verilirse Sayfa1'de de son gözlenen aydan sonraki pencere
+    horizon = MLBudgetForecaster(engine='seasonal_naive', uncertainty_samples=0, horizon=6)
+    horizon.train_all_categories(df, n_jobs=1)
+    assert horizon.window.label == '202510_202603'
+    assert horizon.forecasts['Gıda']['Month'].tolist() == [202510, 202511, 202512, 202601, 202602, 202603]
+
+
+@pytest.mark.parametrize('horizon, months', [(None, 12), (6, 6), (18, 18)])
+def test_long_data_forecasts_months_after_last_observation(long_frame, horizon, months):
+    forecaster = MLBudgetForecaster(engine='seasonal_naive', uncertainty_samples=0, horizon=horizon)
+    forecaster.train_all_categories(long_frame, n_jobs=1)
+
+    # Portföyün son ayı 2024-06: pencere 2024-07'den başlar
+    expected = ForecastWindow.after(np.datetime64('2024-06'), months).labels.tolist()
+    assert forecaster.window.labels.tolist() == expected
+    # Erken biten seri de pencerenin tamamını doldurur
+    for category in ('A', 'B'):
+        assert forecaster.forecasts[category]['Month'].tolist() == expected
+    comparison = forecaster.compare_with_actuals(long_frame)
+    assert f"Forecast_{forecaster.window.label}_Annualized" in comparison.columns
+    assert 'Sales_2024_Est' in comparison.columns
+
+
+def test_update_retrains_all_when_window_moves(long_frame):
+    forecaster = MLBudgetForecaster(engine='seasonal_naive', uncertainty_samples=0)
+    forecaster.train_all_categories(long_frame, n_jobs=1)
+    before = forecaster.window
+
+    # Pencere içinde kalan düzeltme: sadece değişen seri güncellenir
+    fix = pd.DataFrame({'MainGroupDesc': ['B'], 'ds': [pd.Timestamp('2024-03-01')], 'y': [500.0]})
+    forecaster.update_with_actuals(fix)
+    assert forecaster.window == before
+    assert forecaster.last_stats.kind == 'update'
+    assert list(forecaster.last_stats.categories) == ['B']
+
+    # Yeni ay pencereyi ilerletir: tüm seriler yeni pencereye göre yeniden eğitilir
+    new_month = pd.DataFrame({'MainGroupDesc': ['C'], 'ds': [pd.Timestamp('2024-07-01')], 'y': [90.0]})
+    forecaster.update_with_actuals(new_month)
+    assert forecaster.window.labels[0] == 202408
+    assert forecaster.last_stats.kind == 'train'
+    assert sorted(forecaster.last_stats.categories) == ['A', 'B', 'C']
+    assert forecaster.forecasts['A']['Month'].tolist() == forecaster.window.labels.tolist()